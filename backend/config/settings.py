@@ -9,6 +9,7 @@ DB: MySQL (via PyMySQL) configured by .env (with sqlite fallback for local dev)
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 import os
 import importlib.util
@@ -197,11 +198,12 @@ AUTH_USER_MODEL = "core.User"
 
 # CORS (Nuxt dev server)
 CORS_ALLOWED_ORIGINS = [o.strip() for o in os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000").split(",") if o.strip()]
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 # DRF + JWT + Swagger
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -246,7 +248,17 @@ STATUS_SYNC_THROTTLE_PER_MINUTE = _int_env(
     120,
     0,
 )
+# Shared budget of all status-sync pollers of one tender (per-viewer budget above).
+STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE = _int_env(
+    "STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE",
+    6000,
+    0,
+)
 STATUS_SYNC_LOG_METRICS = _bool_env("STATUS_SYNC_LOG_METRICS", False)
+# Async (ASGI) handling of status sync, bid-history and participant-view reads.
+ASYNC_READ_FAST_PATH = _bool_env("ASYNC_READ_FAST_PATH", True)
+# Upper bound for proposals?view=status&wait=N long polls (ASGI only).
+STATUS_SYNC_LONG_POLL_MAX_SECONDS = _int_env("STATUS_SYNC_LONG_POLL_MAX_SECONDS", 25, 0)
 REALTIME_PROPOSAL_EVENT_COALESCE_MS = _int_env(
     "REALTIME_PROPOSAL_EVENT_COALESCE_MS",
     250,
@@ -257,6 +269,94 @@ REALTIME_PROPOSAL_EVENT_COALESCE_MAX_IDS = _int_env(
     300,
     1,
 )
+# Background sender for channel-layer group_send (0 workers = send inline on the request thread).
+REALTIME_OUTBOUND_QUEUE_SIZE = _int_env("REALTIME_OUTBOUND_QUEUE_SIZE", 1000, 1)
+REALTIME_OUTBOUND_WORKERS = _int_env("REALTIME_OUTBOUND_WORKERS", 2, 0)
+# drop_oldest | merge
+REALTIME_OUTBOUND_OVERFLOW = os.getenv("REALTIME_OUTBOUND_OVERFLOW", "merge").strip().lower()
+# Embed status rows / changed position values in proposal.* events for sockets
+# that connect with ?payload=delta (filtered per viewer by the consumer).
+REALTIME_DELTA_PAYLOADS = _bool_env("REALTIME_DELTA_PAYLOADS", True)
+# Max (kind, tender_id) subscriptions per multiplexed /ws/realtime/ socket.
+REALTIME_MAX_SUBSCRIPTIONS = _int_env("REALTIME_MAX_SUBSCRIPTIONS", 200, 1)
+# Per-connection outbound buffer: merge proposal.* events past the high-water mark,
+# close the socket with code 4409 (client resyncs) once the buffer is full.
+REALTIME_CONSUMER_HIGH_WATER = _int_env("REALTIME_CONSUMER_HIGH_WATER", 50, 1)
+REALTIME_CONSUMER_MAX_BUFFER = _int_env("REALTIME_CONSUMER_MAX_BUFFER", 200, 1)
+# Cached websocket access decisions per (user, kind, tender); 0 disables the cache.
+REALTIME_ACCESS_CACHE_TTL_SECONDS = _int_env("REALTIME_ACCESS_CACHE_TTL_SECONDS", 30, 0)
+# Sequenced replay log for tender websocket streams (?since_seq=N on reconnect).
+# memory: per-process buffer; db: shared outbox tables; off: no sequence numbers.
+REALTIME_EVENT_LOG_BACKEND = os.getenv("REALTIME_EVENT_LOG_BACKEND", "memory").strip().lower()
+REALTIME_EVENT_LOG_SIZE = _int_env("REALTIME_EVENT_LOG_SIZE", 200, 1)
+
+# Shared store for cross-worker realtime state (coalescing buffers etc.).
+# Point it at the same Redis as the channel layer when running several workers.
+REALTIME_SHARED_CACHE_URL = os.getenv("REALTIME_SHARED_CACHE_URL", "").strip()
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if REALTIME_SHARED_CACHE_URL:
+    CACHES["realtime"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REALTIME_SHARED_CACHE_URL,
+    }
+# local: coalesce inside one worker; cache: coalesce globally via REALTIME_PROPOSAL_EVENT_COALESCE_CACHE.
+REALTIME_PROPOSAL_EVENT_COALESCE_BACKEND = (
+    os.getenv("REALTIME_PROPOSAL_EVENT_COALESCE_BACKEND", "").strip().lower()
+    or ("cache" if REALTIME_SHARED_CACHE_URL else "local")
+)
+REALTIME_PROPOSAL_EVENT_COALESCE_CACHE = (
+    os.getenv("REALTIME_PROPOSAL_EVENT_COALESCE_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Shared so that invalidations from any worker reach every consumer process.
+REALTIME_ACCESS_CACHE = (
+    os.getenv("REALTIME_ACCESS_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Validated JWT / user snapshot cache for DRF and websocket auth; 0 disables it.
+# Without a shared cache, invalidation reaches only the local worker (others within the TTL).
+JWT_AUTH_CACHE_TTL_SECONDS = _int_env("JWT_AUTH_CACHE_TTL_SECONDS", 60, 0)
+JWT_AUTH_CACHE = (
+    os.getenv("JWT_AUTH_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Per-tender proposal status snapshot shared by every status-sync poller.
+STATUS_SYNC_CACHE = (
+    os.getenv("STATUS_SYNC_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Request limiter store: local (per worker), cache (RATE_LIMIT_CACHE) or db (RateLimitBucket rows).
+RATE_LIMIT_BACKEND = (
+    os.getenv("RATE_LIMIT_BACKEND", "").strip().lower()
+    or ("cache" if REALTIME_SHARED_CACHE_URL else "local")
+)
+RATE_LIMIT_CACHE = (
+    os.getenv("RATE_LIMIT_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Budgets of TokenBucketThrottle scopes (requests per minute per user or IP); 0 disables a scope.
+RATE_LIMIT_THROTTLE_RATES = {
+    "bid": _int_env("RATE_LIMIT_BID_PER_MINUTE", 120, 0),
+}
+# Owner journal counts cached per filter signature; tender writes invalidate them. 0 disables it.
+JOURNAL_COUNT_CACHE_TTL_SECONDS = _int_env("JOURNAL_COUNT_CACHE_TTL_SECONDS", 300, 0)
+JOURNAL_COUNT_CACHE = (
+    os.getenv("JOURNAL_COUNT_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
+# Name search through the SearchDocument index (MySQL FULLTEXT / SQLite FTS5); 0 falls back to icontains.
+SEARCH_FULLTEXT_INDEX = _bool_env("SEARCH_FULLTEXT_INDEX", True)
+# Idempotency-Key replay for bid and proposal submission endpoints; 0 disables it.
+IDEMPOTENCY_KEY_TTL_SECONDS = _int_env("IDEMPOTENCY_KEY_TTL_SECONDS", 86400, 0)
+# Lifetime of the claim of a running request; it is renewed while the view runs,
+# so this only bounds how long a key stays blocked after a worker died mid-request.
+IDEMPOTENCY_PENDING_TTL_SECONDS = _int_env("IDEMPOTENCY_PENDING_TTL_SECONDS", 60, 1)
+IDEMPOTENCY_CACHE = (
+    os.getenv("IDEMPOTENCY_CACHE", "").strip()
+    or ("realtime" if REALTIME_SHARED_CACHE_URL else "default")
+)
 
 DEFAULT_CHARSET = 'utf-8'
 
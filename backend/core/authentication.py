@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .io_steps import IO, arun_steps, run_steps
+
+logger = logging.getLogger("core.authentication")
+
+AUTH_CACHE_KEY_PREFIX = "jwt-auth-v1"
+
+
+def _auth_cache():
+    return caches[getattr(settings, "JWT_AUTH_CACHE", "default") or "default"]
+
+
+def _auth_cache_ttl() -> int:
+    return int(getattr(settings, "JWT_AUTH_CACHE_TTL_SECONDS", 60) or 0)
+
+
+def _token_cache_key(raw_token) -> str:
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode("utf-8")
+    return f"{AUTH_CACHE_KEY_PREFIX}:t:{hashlib.sha256(raw_token).hexdigest()}"
+
+
+def _user_version_key(user_id) -> str:
+    return f"{AUTH_CACHE_KEY_PREFIX}:uv:{user_id}"
+
+
+def _user_snapshot_key(user_id) -> str:
+    return f"{AUTH_CACHE_KEY_PREFIX}:u:{user_id}"
+
+
+def invalidate_cached_auth_user(user_id) -> None:
+    """Drop the cached user snapshot (is_active, password or membership changed)."""
+    if not user_id or _auth_cache_ttl() <= 0:
+        return
+    cache = _auth_cache()
+    key = _user_version_key(user_id)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+    except Exception:
+        logger.exception("auth cache invalidation failed")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    SimpleJWT authentication with two short-lived caches:
+    validated tokens (signature/expiry checked once per token, never past ``exp``)
+    and user snapshots keyed by user id under a version bumped from
+    ``core.signals`` when the user or their memberships change.
+    Used by DRF and by the websocket middleware (``core.ws_auth``).
+    """
+
+    def _validated_token_steps(self, raw_token):
+        ttl = _auth_cache_ttl()
+        if ttl <= 0:
+            return super().get_validated_token(raw_token)
+        key = _token_cache_key(raw_token)
+        try:
+            cache = _auth_cache()
+            token_class_index = yield IO(cache.get, cache.aget, key)
+        except Exception:
+            logger.exception("auth cache unavailable")
+            return super().get_validated_token(raw_token)
+        token_classes = list(api_settings.AUTH_TOKEN_CLASSES)
+        if token_class_index is not None and 0 <= token_class_index < len(token_classes):
+            # Already verified; decoding without verification skips the signature check.
+            return token_classes[token_class_index](raw_token, verify=False)
+
+        # Signature and expiry checks are CPU only; no I/O happens here.
+        validated_token = super().get_validated_token(raw_token)
+        timeout = ttl
+        expires_at = validated_token.get("exp")
+        if expires_at:
+            timeout = min(ttl, int(expires_at - time.time()))
+        if timeout > 0 and type(validated_token) in token_classes:
+            try:
+                yield IO(cache.set, cache.aset, key, token_classes.index(type(validated_token)), timeout=timeout)
+            except Exception:
+                logger.exception("auth cache unavailable")
+        return validated_token
+
+    def _user_steps(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+        ttl = _auth_cache_ttl()
+        version_key = _user_version_key(user_id)
+        snapshot_key = _user_snapshot_key(user_id)
+        version = None
+        if ttl > 0:
+            try:
+                cache = _auth_cache()
+                cached = yield IO(cache.get_many, cache.aget_many, [version_key, snapshot_key])
+            except Exception:
+                logger.exception("auth cache unavailable")
+            else:
+                version = int(cached.get(version_key) or 0)
+                entry = cached.get(snapshot_key)
+                if entry and entry.get("version") == version:
+                    user = entry["user"]
+                    self._check_cached_user(validated_token, user)
+                    return user
+
+        manager = self.user_model.objects
+        try:
+            user = yield IO(manager.get, manager.aget, **{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from exc
+        self._check_cached_user(validated_token, user)
+        if version is not None:
+            try:
+                yield IO(cache.set, cache.aset, snapshot_key, {"version": version, "user": user}, timeout=ttl)
+            except Exception:
+                logger.exception("auth cache unavailable")
+        return user
+
+    def get_validated_token(self, raw_token):
+        return run_steps(self._validated_token_steps(raw_token))
+
+    def get_user(self, validated_token):
+        return run_steps(self._user_steps(validated_token))
+
+    @staticmethod
+    def _check_cached_user(validated_token, user) -> None:
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate`` for async views: the same caches through the async
+        cache API and the async ORM on a user snapshot miss.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = await self.aget_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_validated_token(self, raw_token):
+        return await arun_steps(self._validated_token_steps(raw_token))
+
+    async def aget_user(self, validated_token):
+        return await arun_steps(self._user_steps(validated_token))
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from urllib.parse import parse_qs
+
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.db.models import Exists, OuterRef
 
 from .models import (
     CompanyUser,
@@ -10,13 +16,122 @@ from .models import (
     TenderProposal,
     SalesTenderProposal,
 )
-from .realtime import tender_group_name
+from .realtime import (
+    AUCTION_LEADERBOARD_EVENT,
+    _merge_payloads_for_event,
+    get_cached_tender_access,
+    get_cached_user_company_ids,
+    get_tender_event_log,
+    store_tender_access,
+    tender_group_name,
+)
 
 
 VISIBLE_PARTICIPATION_STAGES = ["acceptance", "decision", "approval", "completed", "preparation"]
+PUBLIC_CONDUCT_TYPES = ["rfx", "online_auction"]
+TENDER_KINDS = ("procurement", "sales")
+# Close code for a connection that fell too far behind; the client reloads and reconnects.
+RESYNC_CLOSE_CODE = 4409
+# ``?payload=delta`` (or ``"payload": "delta"`` per subscription) opts into proposal deltas.
+DELTA_PAYLOAD_MODE = "delta"
+
+_backpressure_metrics = {
+    "events_merged": 0,
+    "events_dropped": 0,
+    "slow_consumers_closed": 0,
+    "outbox_peak": 0,
+}
+
+
+def get_backpressure_metrics() -> dict[str, int]:
+    return dict(_backpressure_metrics)
+
+
+def reset_backpressure_metrics() -> None:
+    for name in _backpressure_metrics:
+        _backpressure_metrics[name] = 0
+
+
+class BufferedSendMixin:
+    """
+    Per-connection outbound buffer for tender events, drained by one writer task
+    so a slow client never blocks the consumer's channel-layer receive loop.
+
+    Past ``REALTIME_CONSUMER_HIGH_WATER`` queued messages, a new ``proposal.*``
+    or ``leaderboard.updated`` event is merged into a queued one for the same tender and event (its seq is
+    listed in ``merged_seqs``). A connection whose buffer still reaches
+    ``REALTIME_CONSUMER_MAX_BUFFER`` is closed with ``RESYNC_CLOSE_CODE``.
+    """
+
+    def _init_outbox(self):
+        self._outbox = deque()
+        self._outbox_writer = None
+        self._outbox_closed = False
+
+    async def _enqueue_event(self, message: dict):
+        if getattr(self, "_outbox_closed", True):
+            return
+        outbox = self._outbox
+        high_water = int(getattr(settings, "REALTIME_CONSUMER_HIGH_WATER", 50) or 50)
+        max_buffer = max(high_water, int(getattr(settings, "REALTIME_CONSUMER_MAX_BUFFER", 200) or 200))
+        if len(outbox) >= high_water and self._merge_into_outbox(message):
+            _backpressure_metrics["events_merged"] += 1
+            return
+        if len(outbox) >= max_buffer:
+            await self._close_slow_consumer()
+            return
+        outbox.append(message)
+        _backpressure_metrics["outbox_peak"] = max(_backpressure_metrics["outbox_peak"], len(outbox))
+        if self._outbox_writer is None:
+            self._outbox_writer = asyncio.ensure_future(self._drain_outbox())
+
+    def _merge_into_outbox(self, message: dict) -> bool:
+        event = str(message.get("event") or "")
+        if not (event.startswith("proposal.") or event == AUCTION_LEADERBOARD_EVENT):
+            return False
+        target = (message.get("kind"), message.get("tender_id"), event)
+        for queued in reversed(self._outbox):
+            if (queued.get("kind"), queued.get("tender_id"), queued.get("event")) != target:
+                continue
+            queued["payload"] = _merge_payloads_for_event(event, queued.get("payload"), message.get("payload"))
+            queued["sent_at"] = message.get("sent_at") or queued.get("sent_at")
+            incoming_seqs = message.get("merged_seqs") or (
+                [message["seq"]] if message.get("seq") is not None else []
+            )
+            if incoming_seqs:
+                merged_seqs = queued.get("merged_seqs") or (
+                    [queued["seq"]] if queued.get("seq") is not None else []
+                )
+                merged_seqs = sorted(set(merged_seqs) | set(incoming_seqs))
+                queued["merged_seqs"] = merged_seqs
+                queued["seq"] = merged_seqs[-1]
+            return True
+        return False
+
+    async def _drain_outbox(self):
+        try:
+            while self._outbox and not self._outbox_closed:
+                await self.send_json(self._outbox.popleft())
+        finally:
+            self._outbox_writer = None
+
+    async def _close_slow_consumer(self):
+        _backpressure_metrics["events_dropped"] += len(self._outbox) + 1
+        _backpressure_metrics["slow_consumers_closed"] += 1
+        self._outbox.clear()
+        self._outbox_closed = True
+        await self.close(code=RESYNC_CLOSE_CODE)
+
+    def _stop_outbox(self):
+        self._outbox_closed = True
+        if getattr(self, "_outbox", None) is not None:
+            self._outbox.clear()
+        writer = getattr(self, "_outbox_writer", None)
+        if writer is not None:
+            writer.cancel()
 
 
-class TenderRealtimeConsumer(AsyncJsonWebsocketConsumer):
+class TenderRealtimeConsumer(BufferedSendMixin, AsyncJsonWebsocketConsumer):
     async def connect(self):
         user = self.scope.get("user")
         if not user or not user.is_authenticated:
@@ -35,74 +150,405 @@ class TenderRealtimeConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4400)
             return
 
-        has_access = await _user_can_access_tender(user.id, self.kind, self.tender_id)
-        if not has_access:
+        query_string = self.scope.get("query_string", b"")
+        self.delta_mode = _parse_query_value(query_string, "payload") == DELTA_PAYLOAD_MODE
+        audiences = await _load_tender_audiences(user.id, [(self.kind, self.tender_id)])
+        self.audience = audiences.get((self.kind, self.tender_id))
+        if self.audience is None:
             await self.close(code=4403)
             return
 
         self.group_name = tender_group_name(self.kind, self.tender_id)
+        self._init_outbox()
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
-        await self.send_json({"event": "connected", "payload": {"kind": self.kind, "tender_id": self.tender_id}})
+        current_seq = await _current_event_seq(self.kind, self.tender_id)
+        await self.send_json(
+            {
+                "event": "connected",
+                "payload": {"kind": self.kind, "tender_id": self.tender_id, "seq": current_seq},
+            }
+        )
+        since_seq = _coerce_seq(_parse_query_value(query_string, "since_seq"))
+        if since_seq is not None:
+            await self._replay_since(since_seq)
+
+    async def _replay_since(self, since_seq: int):
+        """
+        Send events missed since ``since_seq`` or ask the client to resync.
+        Live events may interleave with the replay; clients drop seq <= last seen.
+        """
+        events, resync_required = await _replay_events(self.kind, self.tender_id, since_seq)
+        if resync_required:
+            current_seq = await _current_event_seq(self.kind, self.tender_id)
+            await self.send_json(
+                {
+                    "event": "resync.required",
+                    "payload": {"since_seq": since_seq, "seq": current_seq},
+                }
+            )
+            return
+        for item in events:
+            await self.send_json(
+                {
+                    "event": item.get("event"),
+                    "payload": self._payload_for_connection(item.get("payload")),
+                    "sent_at": item.get("sent_at"),
+                    "seq": item.get("seq"),
+                    "replayed": True,
+                }
+            )
 
     async def disconnect(self, close_code):
+        self._stop_outbox()
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def receive_json(self, content, **kwargs):
-        if isinstance(content, dict) and content.get("event") == "ping":
+        if not isinstance(content, dict):
+            return
+        if content.get("event") == "ping":
             await self.send_json({"event": "pong"})
+        elif content.get("event") == "replay":
+            since_seq = _coerce_seq(content.get("since_seq"))
+            if since_seq is not None:
+                await self._replay_since(since_seq)
+
+    def _payload_for_connection(self, payload):
+        return _filter_payload_for_audience(
+            payload,
+            delta_mode=getattr(self, "delta_mode", False),
+            audience=self.audience,
+        )
 
     async def tender_event(self, event):
+        message = {
+            "event": event.get("event"),
+            "payload": self._payload_for_connection(event.get("payload")),
+            "sent_at": event.get("sent_at"),
+        }
+        if event.get("seq") is not None:
+            message["seq"] = event.get("seq")
+        if event.get("merged_seqs"):
+            message["merged_seqs"] = list(event["merged_seqs"])
+        await self._enqueue_event(message)
+
+
+class UserRealtimeConsumer(BufferedSendMixin, AsyncJsonWebsocketConsumer):
+    """
+    One socket per user for many tenders (``/ws/realtime/``).
+
+    Client messages:
+    ``{"event": "subscribe", "tenders": [{"kind", "tender_id", "since_seq"?, "payload"?}]}``,
+    ``{"event": "unsubscribe", "tenders": [{"kind", "tender_id"}]}``,
+    ``{"event": "replay", "kind", "tender_id", "since_seq"}`` and ``ping``.
+    Every subscribe batch is authorised with a fixed number of queries; tender
+    events are forwarded with ``kind`` and ``tender_id`` so the client can route them.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.user_id = user.id
+        # (kind, tender_id) -> {"audience": ..., "delta_mode": bool}
+        self.subscriptions = {}
+        self._init_outbox()
+        await self.accept()
+        await self.send_json({"event": "connected", "payload": {"subscriptions": []}})
+
+    async def disconnect(self, close_code):
+        self._stop_outbox()
+        for kind, tender_id in list(getattr(self, "subscriptions", {})):
+            await self.channel_layer.group_discard(tender_group_name(kind, tender_id), self.channel_name)
+        self.subscriptions = {}
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict):
+            return
+        event = content.get("event")
+        if event == "ping":
+            await self.send_json({"event": "pong"})
+        elif event == "subscribe":
+            await self._subscribe(content.get("tenders"))
+        elif event == "unsubscribe":
+            await self._unsubscribe(content.get("tenders"))
+        elif event == "replay":
+            key = _parse_tender_key(content)
+            since_seq = _coerce_seq(content.get("since_seq"))
+            if key in self.subscriptions and since_seq is not None:
+                await self._replay_since(key, since_seq)
+
+    async def _subscribe(self, raw_items):
+        requested = {}
+        for item in raw_items if isinstance(raw_items, list) else []:
+            key = _parse_tender_key(item)
+            if key is not None:
+                requested[key] = item
+        limit = int(getattr(settings, "REALTIME_MAX_SUBSCRIPTIONS", 200) or 200)
+        new_keys = [key for key in requested if key not in self.subscriptions]
+        room = max(0, limit - len(self.subscriptions))
+        over_limit = new_keys[room:]
+        new_keys = new_keys[:room]
+
+        audiences = await _load_tender_audiences(self.user_id, new_keys) if new_keys else {}
+        subscribed = []
+        denied = [{"kind": kind, "tender_id": tender_id, "reason": "limit"} for kind, tender_id in over_limit]
+        for key, item in requested.items():
+            if key in over_limit:
+                continue
+            if key not in self.subscriptions:
+                audience = audiences.get(key)
+                if audience is None:
+                    denied.append({"kind": key[0], "tender_id": key[1], "reason": "forbidden"})
+                    continue
+                await self.channel_layer.group_add(tender_group_name(*key), self.channel_name)
+            self.subscriptions[key] = {
+                "audience": audiences.get(key) or self.subscriptions[key]["audience"],
+                "delta_mode": item.get("payload") == DELTA_PAYLOAD_MODE,
+            }
+            subscribed.append(key)
+
+        current_seqs = await _current_event_seqs(subscribed)
         await self.send_json(
             {
-                "event": event.get("event"),
-                "payload": event.get("payload") or {},
-                "sent_at": event.get("sent_at"),
+                "event": "subscribed",
+                "payload": {
+                    "tenders": [
+                        {"kind": kind, "tender_id": tender_id, "seq": current_seqs.get((kind, tender_id), 0)}
+                        for kind, tender_id in subscribed
+                    ],
+                    "denied": denied,
+                },
             }
         )
+        for key in subscribed:
+            since_seq = _coerce_seq(requested[key].get("since_seq"))
+            if since_seq is not None:
+                await self._replay_since(key, since_seq)
+
+    async def _unsubscribe(self, raw_items):
+        removed = []
+        for item in raw_items if isinstance(raw_items, list) else []:
+            key = _parse_tender_key(item)
+            if key is None or self.subscriptions.pop(key, None) is None:
+                continue
+            await self.channel_layer.group_discard(tender_group_name(*key), self.channel_name)
+            removed.append({"kind": key[0], "tender_id": key[1]})
+        await self.send_json({"event": "unsubscribed", "payload": {"tenders": removed}})
+
+    async def _replay_since(self, key, since_seq: int):
+        kind, tender_id = key
+        events, resync_required = await _replay_events(kind, tender_id, since_seq)
+        if resync_required:
+            current_seq = await _current_event_seq(kind, tender_id)
+            await self.send_json(
+                {
+                    "event": "resync.required",
+                    "kind": kind,
+                    "tender_id": tender_id,
+                    "payload": {"since_seq": since_seq, "seq": current_seq},
+                }
+            )
+            return
+        for item in events:
+            await self.send_json(
+                {
+                    "event": item.get("event"),
+                    "kind": kind,
+                    "tender_id": tender_id,
+                    "payload": self._payload_for_subscription(key, item.get("payload")),
+                    "sent_at": item.get("sent_at"),
+                    "seq": item.get("seq"),
+                    "replayed": True,
+                }
+            )
+
+    def _payload_for_subscription(self, key, payload):
+        subscription = self.subscriptions.get(key) or {}
+        return _filter_payload_for_audience(
+            payload,
+            delta_mode=subscription.get("delta_mode", False),
+            audience=subscription.get("audience"),
+        )
+
+    async def tender_event(self, event):
+        key = (event.get("kind"), event.get("tender_id"))
+        if key not in self.subscriptions:
+            return
+        message = {
+            "event": event.get("event"),
+            "kind": key[0],
+            "tender_id": key[1],
+            "payload": self._payload_for_subscription(key, event.get("payload")),
+            "sent_at": event.get("sent_at"),
+        }
+        if event.get("seq") is not None:
+            message["seq"] = event.get("seq")
+        if event.get("merged_seqs"):
+            message["merged_seqs"] = list(event["merged_seqs"])
+        await self._enqueue_event(message)
+
+
+def _filter_payload_for_audience(payload, *, delta_mode: bool, audience: dict | None):
+    """
+    Strip ``deltas`` for sockets that did not opt in (``payload=delta``) and
+    keep only the rows this viewer may see: owners get every proposal,
+    participants only their own companies' proposals.
+    """
+    payload = dict(payload or {})
+    audience = audience or {"is_owner": False, "company_ids": frozenset()}
+    if isinstance(payload.get("positions"), list):
+        payload["positions"] = _leaderboard_positions_for_audience(payload["positions"], audience)
+    deltas = payload.pop("deltas", None)
+    if not delta_mode or deltas is None:
+        return payload
+    payload["deltas"] = [
+        delta
+        for delta in deltas
+        if audience["is_owner"] or delta.get("supplier_company_id") in audience["company_ids"]
+    ]
+    payload["delta_complete"] = True
+    return payload
+
+
+def _leaderboard_positions_for_audience(positions, audience: dict) -> list:
+    """
+    ``leaderboard.updated`` rows: owners keep the full ``ranks`` list,
+    everyone gets ``my_rank`` (best rank among their own companies, or None).
+    """
+    rows = []
+    for position in positions:
+        row = dict(position)
+        ranks = row.pop("ranks", None) or []
+        own_ranks = [item["rank"] for item in ranks if item.get("supplier_company_id") in audience["company_ids"]]
+        row["my_rank"] = min(own_ranks) if own_ranks else None
+        if audience["is_owner"]:
+            row["ranks"] = ranks
+        rows.append(row)
+    return rows
+
+
+def _parse_tender_key(item) -> tuple[str, int] | None:
+    if not isinstance(item, dict):
+        return None
+    kind = str(item.get("kind") or "").strip()
+    if kind not in TENDER_KINDS:
+        return None
+    try:
+        tender_id = int(item.get("tender_id"))
+    except (TypeError, ValueError):
+        return None
+    return (kind, tender_id) if tender_id > 0 else None
+
+
+def _coerce_seq(raw_value) -> int | None:
+    try:
+        value = int(raw_value)
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def _parse_query_value(query_string: bytes, name: str) -> str | None:
+    return (parse_qs(query_string.decode("utf-8", errors="ignore")).get(name) or [None])[0]
+
+
+@database_sync_to_async
+def _current_event_seq(kind: str, tender_id: int) -> int:
+    event_log = get_tender_event_log()
+    if event_log is None:
+        return 0
+    return event_log.current_seq(kind, tender_id)
 
 
 @database_sync_to_async
-def _user_can_access_tender(user_id: int, kind: str, tender_id: int) -> bool:
-    company_ids = list(
-        CompanyUser.objects.filter(
+def _current_event_seqs(keys) -> dict:
+    event_log = get_tender_event_log()
+    if event_log is None:
+        return {}
+    return {(kind, tender_id): event_log.current_seq(kind, tender_id) for kind, tender_id in keys}
+
+
+@database_sync_to_async
+def _replay_events(kind: str, tender_id: int, since_seq: int):
+    event_log = get_tender_event_log()
+    if event_log is None:
+        return [], True
+    return event_log.replay(kind, tender_id, since_seq)
+
+
+def _user_company_ids(user_id: int) -> frozenset:
+    return get_cached_user_company_ids(
+        user_id,
+        lambda: CompanyUser.objects.filter(
             user_id=user_id,
             status=CompanyUser.Status.APPROVED,
-        ).values_list("company_id", flat=True)
+        ).values_list("company_id", flat=True),
     )
-    if not company_ids:
-        return False
 
-    if kind == "procurement":
-        tender = ProcurementTender.objects.filter(id=tender_id).values("company_id").first()
-        if not tender:
-            return False
-        if tender["company_id"] in company_ids:
-            return True
-        if TenderProposal.objects.filter(
-            tender_id=tender_id,
-            supplier_company_id__in=company_ids,
-        ).exists():
-            return True
-        return ProcurementTender.objects.filter(
-            id=tender_id,
-            conduct_type__in=["rfx", "online_auction"],
-            stage__in=VISIBLE_PARTICIPATION_STAGES,
-        ).exclude(company_id__in=company_ids).exists()
-
-    tender = SalesTender.objects.filter(id=tender_id).values("company_id").first()
-    if not tender:
-        return False
-    if tender["company_id"] in company_ids:
-        return True
-    if SalesTenderProposal.objects.filter(
-        tender_id=tender_id,
-        supplier_company_id__in=company_ids,
-    ).exists():
-        return True
-    return SalesTender.objects.filter(
-        id=tender_id,
-        conduct_type__in=["rfx", "online_auction"],
-        stage__in=VISIBLE_PARTICIPATION_STAGES,
-    ).exclude(company_id__in=company_ids).exists()
+
+def _query_tender_access(user_id: int, keys) -> dict:
+    """
+    Access decision for ``(kind, tender_id)`` pairs in one query per tender kind:
+    owner, participant (has a proposal) or a public tender in a visible stage,
+    all only for users with an approved company membership.
+    Returns ``{"is_owner": bool}`` for accessible pairs and ``None`` otherwise.
+    """
+    memberships = CompanyUser.objects.filter(user_id=user_id, status=CompanyUser.Status.APPROVED)
+    access = {key: None for key in keys}
+    for kind, tender_model, proposal_model in (
+        ("procurement", ProcurementTender, TenderProposal),
+        ("sales", SalesTender, SalesTenderProposal),
+    ):
+        tender_ids = {tender_id for key_kind, tender_id in keys if key_kind == kind}
+        if not tender_ids:
+            continue
+        rows = (
+            tender_model.objects.filter(id__in=tender_ids)
+            .order_by()
+            .annotate(
+                is_owner=Exists(memberships.filter(company_id=OuterRef("company_id"))),
+                is_participant=Exists(
+                    proposal_model.objects.filter(
+                        tender_id=OuterRef("pk"),
+                        supplier_company_id__in=memberships.values("company_id"),
+                    )
+                ),
+                has_membership=Exists(memberships),
+            )
+            .values_list("id", "is_owner", "is_participant", "has_membership", "conduct_type", "stage")
+        )
+        for tender_id, is_owner, is_participant, has_membership, conduct_type, stage in rows:
+            is_public = conduct_type in PUBLIC_CONDUCT_TYPES and stage in VISIBLE_PARTICIPATION_STAGES
+            if has_membership and (is_owner or is_participant or is_public):
+                access[(kind, tender_id)] = {"is_owner": bool(is_owner)}
+    return access
+
+
+def _resolve_tender_access(user_id: int, keys) -> dict:
+    """Cached access check: only pairs without a current cache entry hit the database."""
+    keys = list(dict.fromkeys(keys))
+    access, versions = get_cached_tender_access(user_id, keys)
+    misses = [key for key in keys if key not in access]
+    if misses:
+        fresh = _query_tender_access(user_id, misses)
+        store_tender_access(user_id, fresh, versions)
+        access.update(fresh)
+    return {key: item for key, item in access.items() if item is not None}
+
+
+@database_sync_to_async
+def _load_tender_audiences(user_id: int, keys, *, with_company_ids: bool = True) -> dict:
+    """
+    Audiences of the accessible ``(kind, tender_id)`` pairs; missing pairs are
+    forbidden. ``company_ids`` (used to filter proposal deltas) is only loaded
+    when asked for.
+    """
+    access = _resolve_tender_access(user_id, keys)
+    company_ids = _user_company_ids(user_id) if with_company_ids and access else frozenset()
+    return {
+        key: {"is_owner": item["is_owner"], "company_ids": company_ids}
+        for key, item in access.items()
+    }
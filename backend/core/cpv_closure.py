@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from django.db import transaction
+
+# CPV trees are at most a handful of levels deep; the guard only stops broken parent cycles.
+MAX_CPV_DEPTH = 30
+
+
+def _is_root_parent_code(parent_code: str) -> bool:
+    return not parent_code or parent_code == "0"
+
+
+def _clean_ids(cpv_ids) -> list[int]:
+    return sorted({int(cpv_id) for cpv_id in cpv_ids or () if cpv_id})
+
+
+def _load_hierarchy() -> list[tuple[int, str, str]]:
+    from .models import CpvDictionary
+
+    return [
+        (int(cpv_id), (level_code or "").strip(), (parent_code or "").strip())
+        for cpv_id, level_code, parent_code in CpvDictionary.objects.values_list(
+            "id", "cpv_level_code", "cpv_parent_code"
+        )
+    ]
+
+
+def compute_cpv_closure(rows) -> list[tuple[int, int, int]]:
+    """
+    ``(ancestor_id, descendant_id, depth)`` for every node of ``rows``
+    (``(id, cpv_level_code, cpv_parent_code)``), including the node itself.
+    """
+    id_by_level_code = {level_code: cpv_id for cpv_id, level_code, _ in rows if level_code}
+    parent_code_by_id = {cpv_id: parent_code for cpv_id, _, parent_code in rows}
+    pairs = []
+    for cpv_id, _, parent_code in rows:
+        pairs.append((cpv_id, cpv_id, 0))
+        seen = {cpv_id}
+        depth = 0
+        while not _is_root_parent_code(parent_code) and depth < MAX_CPV_DEPTH:
+            ancestor_id = id_by_level_code.get(parent_code)
+            if ancestor_id is None or ancestor_id in seen:
+                break
+            depth += 1
+            seen.add(ancestor_id)
+            pairs.append((ancestor_id, cpv_id, depth))
+            parent_code = parent_code_by_id.get(ancestor_id, "")
+    return pairs
+
+
+def rebuild_cpv_closure(*, batch_size: int = 5000) -> int:
+    """Replace the closure table with one computed from the current ``cpv_dictionary``."""
+    from .models import CpvClosure
+
+    pairs = compute_cpv_closure(_load_hierarchy())
+    with transaction.atomic():
+        CpvClosure.objects.all().delete()
+        for start in range(0, len(pairs), batch_size):
+            CpvClosure.objects.bulk_create(
+                [
+                    CpvClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+                    for ancestor_id, descendant_id, depth in pairs[start:start + batch_size]
+                ]
+            )
+    return len(pairs)
+
+
+def cpv_closure_ready() -> bool:
+    from .models import CpvClosure
+
+    return CpvClosure.objects.exists()
+
+
+def _related_ids_in_memory(ids: list[int], *, descendants: bool) -> set[int]:
+    # Used until rebuild_cpv_closure has run: one scan of the dictionary instead of a query per level.
+    wanted = set(ids)
+    related = set()
+    for ancestor_id, descendant_id, _ in compute_cpv_closure(_load_hierarchy()):
+        if descendants and ancestor_id in wanted:
+            related.add(descendant_id)
+        elif not descendants and descendant_id in wanted:
+            related.add(ancestor_id)
+    return related
+
+
+def expand_cpv_ids_with_descendants(cpv_ids) -> list[int]:
+    """Existing ids of ``cpv_ids`` plus every descendant, with one closure query."""
+    from .models import CpvClosure
+
+    ids = _clean_ids(cpv_ids)
+    if not ids:
+        return []
+    if not cpv_closure_ready():
+        return sorted(_related_ids_in_memory(ids, descendants=True))
+    return list(
+        CpvClosure.objects.filter(ancestor_id__in=ids).values_list("descendant_id", flat=True).distinct()
+    )
+
+
+def cpv_ids_with_ancestors(cpv_ids):
+    """
+    Existing ids of ``cpv_ids`` plus every ancestor, as a ``values("ancestor_id")``
+    subquery for ``id__in`` when the closure is built, otherwise as a set.
+    """
+    from .models import CpvClosure
+
+    ids = _clean_ids(cpv_ids)
+    if not ids:
+        return []
+    if not cpv_closure_ready():
+        return _related_ids_in_memory(ids, descendants=False)
+    return CpvClosure.objects.filter(descendant_id__in=ids).values("ancestor_id")
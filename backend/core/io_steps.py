@@ -0,0 +1,59 @@
+"""
+One code path for the sync and async variants of a cached read.
+
+The logic is written once as a generator that yields :class:`IO` steps for
+every cache, ORM or rate-limiter call; :func:`run_steps` performs them with
+the blocking call and :func:`arun_steps` awaits the async one. Exceptions
+raised by a call are thrown back into the generator, so its ``try`` blocks
+behave the same on both paths.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Generator
+
+
+class IO:
+    __slots__ = ("sync_call", "async_call", "args", "kwargs")
+
+    def __init__(self, sync_call: Callable[..., Any], async_call: Callable[..., Any], /, *args, **kwargs):
+        self.sync_call = sync_call
+        self.async_call = async_call
+        self.args = args
+        self.kwargs = kwargs
+
+
+Steps = Generator[IO, Any, Any]
+
+
+def run_steps(steps: Steps) -> Any:
+    try:
+        step = next(steps)
+        while True:
+            try:
+                result = step.sync_call(*step.args, **step.kwargs)
+            except Exception as exc:
+                step = steps.throw(exc)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_steps(steps: Steps) -> Any:
+    try:
+        step = next(steps)
+        while True:
+            try:
+                result = await step.async_call(*step.args, **step.kwargs)
+            except Exception as exc:
+                step = steps.throw(exc)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def alist(queryset) -> list:
+    """``list(queryset)`` through the async ORM iterator."""
+    return [item async for item in queryset]
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger("core.journal_summary")
+
+TENDER_TYPE_PROCUREMENT = "procurement"
+TENDER_TYPE_SALES = "sales"
+
+_AMOUNT_QUANTUM = Decimal("0.0001")
+_AMOUNT_FIELD = DecimalField(max_digits=24, decimal_places=4)
+
+JOURNAL_SUMMARY_FIELDS = (
+    "winners_count",
+    "total_amount",
+    "market_total_amount",
+    "has_submitted_position_prices",
+    "has_next_tour",
+)
+
+
+def _journal_models(tender_type: str):
+    from .models import (
+        ProcurementTender,
+        ProcurementTenderPosition,
+        SalesTender,
+        SalesTenderPosition,
+        SalesTenderProposalPosition,
+        TenderProposalPosition,
+    )
+
+    if tender_type == TENDER_TYPE_SALES:
+        return SalesTender, SalesTenderPosition, SalesTenderProposalPosition
+    return ProcurementTender, ProcurementTenderPosition, TenderProposalPosition
+
+
+def _clean_ids(tender_ids) -> list[int]:
+    return sorted({int(tender_id) for tender_id in tender_ids or () if tender_id})
+
+
+def _empty_metrics() -> dict:
+    return {
+        "winners_count": 0,
+        "total_amount": Decimal("0"),
+        "market_total_amount": Decimal("0"),
+        "has_submitted_position_prices": False,
+        "has_next_tour": False,
+    }
+
+
+def compute_tender_journal_metrics(tender_type: str, tender_ids) -> dict[int, dict]:
+    """
+    Journal figures for ``tender_ids`` with a fixed number of grouped queries:
+    winners per tender, quantity x winner price, quantity x average submitted
+    price per position, and whether a next tour exists.
+    """
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return {}
+    tender_model, position_model, value_model = _journal_models(tender_type)
+    metrics = {tender_id: _empty_metrics() for tender_id in ids}
+
+    for tender_id, winners_count in (
+        position_model.objects.filter(tender_id__in=ids, winner_proposal__isnull=False)
+        .values("tender_id")
+        .annotate(winners_count=Count("id"))
+        .values_list("tender_id", "winners_count")
+    ):
+        metrics[int(tender_id)]["winners_count"] = int(winners_count or 0)
+
+    line_total = ExpressionWrapper(
+        Coalesce(F("tender_position__quantity"), Value(Decimal("0")))
+        * Coalesce(F("price"), Value(Decimal("0"))),
+        output_field=_AMOUNT_FIELD,
+    )
+    for tender_id, total in (
+        value_model.objects.filter(
+            tender_position__tender_id__in=ids,
+            tender_position__winner_proposal_id=F("proposal_id"),
+        )
+        .values("tender_position__tender_id")
+        .annotate(total=Sum(line_total, output_field=_AMOUNT_FIELD))
+        .values_list("tender_position__tender_id", "total")
+    ):
+        metrics[int(tender_id)]["total_amount"] = Decimal(str(total or 0)).quantize(_AMOUNT_QUANTUM)
+
+    market_totals: dict[int, Decimal] = {}
+    for tender_id, quantity, avg_price in (
+        value_model.objects.filter(
+            tender_position__tender_id__in=ids,
+            proposal__submitted_at__isnull=False,
+            price__isnull=False,
+        )
+        .values("tender_position_id", "tender_position__tender_id", "tender_position__quantity")
+        .annotate(avg_price=Avg("price"))
+        .values_list("tender_position__tender_id", "tender_position__quantity", "avg_price")
+    ):
+        line = Decimal(str(quantity or 0)) * Decimal(str(avg_price or 0))
+        market_totals[int(tender_id)] = market_totals.get(int(tender_id), Decimal("0")) + line
+    for tender_id, total in market_totals.items():
+        metrics[tender_id]["has_submitted_position_prices"] = True
+        metrics[tender_id]["market_total_amount"] = total.quantize(_AMOUNT_QUANTUM)
+
+    for parent_id in (
+        tender_model.objects.filter(parent_id__in=ids).values_list("parent_id", flat=True).distinct()
+    ):
+        metrics[int(parent_id)]["has_next_tour"] = True
+    return metrics
+
+
+def mark_tender_journal_summaries_stale(tender_type: str, tender_ids) -> None:
+    """
+    Flag summaries as stale inside the caller's transaction. The version bump
+    stops a refresh that read older rows from overwriting the flag.
+    """
+    from .models import TenderJournalSummary
+
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return
+    TenderJournalSummary.objects.filter(tender_type=tender_type, tender_id__in=ids).update(
+        is_stale=True,
+        version=F("version") + 1,
+    )
+
+
+def refresh_tender_journal_summaries(tender_type: str, tender_ids) -> dict:
+    """
+    Recompute and store summaries for ``tender_ids``; rows of deleted tenders
+    are dropped. A row whose version changed while computing stays stale and is
+    picked up by the next refresh or journal read. Returns summaries by tender id.
+    """
+    from .models import TenderJournalSummary
+
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return {}
+    tender_model, _, _ = _journal_models(tender_type)
+    existing_ids = set(tender_model.objects.filter(id__in=ids).values_list("id", flat=True))
+    gone_ids = [tender_id for tender_id in ids if tender_id not in existing_ids]
+    if gone_ids:
+        TenderJournalSummary.objects.filter(tender_type=tender_type, tender_id__in=gone_ids).delete()
+    if not existing_ids:
+        return {}
+
+    TenderJournalSummary.objects.bulk_create(
+        [TenderJournalSummary(tender_type=tender_type, tender_id=tender_id) for tender_id in sorted(existing_ids)],
+        ignore_conflicts=True,
+    )
+    versions = dict(
+        TenderJournalSummary.objects.filter(tender_type=tender_type, tender_id__in=existing_ids).values_list(
+            "tender_id", "version"
+        )
+    )
+    metrics = compute_tender_journal_metrics(tender_type, existing_ids)
+    refreshed_at = timezone.now()
+    summaries = {}
+    for tender_id in sorted(existing_ids):
+        values = metrics[tender_id]
+        TenderJournalSummary.objects.filter(
+            tender_type=tender_type,
+            tender_id=tender_id,
+            version=versions.get(tender_id, 0),
+        ).update(is_stale=False, refreshed_at=refreshed_at, **values)
+        summaries[tender_id] = TenderJournalSummary(
+            tender_type=tender_type,
+            tender_id=tender_id,
+            version=versions.get(tender_id, 0),
+            is_stale=False,
+            refreshed_at=refreshed_at,
+            **values,
+        )
+    return summaries
+
+
+def schedule_tender_journal_summary_refresh(tender_type: str, tender_ids) -> None:
+    """Mark the summaries stale now and recompute them once the transaction commits."""
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return
+    mark_tender_journal_summaries_stale(tender_type, ids)
+    transaction.on_commit(lambda: refresh_tender_journal_summaries(tender_type, ids))
+
+
+def load_tender_journal_summaries(tender_type: str, tender_ids) -> dict:
+    """
+    Summaries for a journal page: fresh rows are read as stored, missing or
+    stale ones are recomputed first, so the cost follows the page size.
+    """
+    from .models import TenderJournalSummary
+
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return {}
+    summaries = {
+        int(summary.tender_id): summary
+        for summary in TenderJournalSummary.objects.filter(
+            tender_type=tender_type,
+            tender_id__in=ids,
+            is_stale=False,
+        )
+    }
+    missing_ids = [tender_id for tender_id in ids if tender_id not in summaries]
+    if missing_ids:
+        summaries.update(refresh_tender_journal_summaries(tender_type, missing_ids))
+    return summaries
+
+
+def attach_tender_journal_summaries(rows, *, tender_type: str) -> None:
+    """Copy the summary columns onto tender rows as the journal serializers expect them."""
+    summaries = load_tender_journal_summaries(tender_type, [row.pk for row in rows])
+    for row in rows:
+        summary = summaries.get(int(row.pk))
+        values = (
+            {field: getattr(summary, field) for field in JOURNAL_SUMMARY_FIELDS}
+            if summary is not None
+            else _empty_metrics()
+        )
+        for field, value in values.items():
+            setattr(row, field, value)
+
+
+JOURNAL_COUNT_CACHE_KEY_PREFIX = "journal-count-v1"
+# Version key bumped by writes to any company's tenders; used for superuser scopes.
+_ALL_COMPANIES = "all"
+
+
+def _journal_count_cache():
+    return caches[getattr(settings, "JOURNAL_COUNT_CACHE", "default") or "default"]
+
+
+def _journal_count_cache_ttl() -> int:
+    return int(getattr(settings, "JOURNAL_COUNT_CACHE_TTL_SECONDS", 300) or 0)
+
+
+def _journal_count_version_key(tender_type: str, company_id) -> str:
+    return f"{JOURNAL_COUNT_CACHE_KEY_PREFIX}:v:{tender_type}:{company_id}"
+
+
+def _journal_count_version_keys(tender_type: str, company_ids) -> list[str]:
+    if company_ids is None:
+        return [_journal_count_version_key(tender_type, _ALL_COMPANIES)]
+    return [_journal_count_version_key(tender_type, company_id) for company_id in _clean_ids(company_ids)]
+
+
+def _journal_count_entry_key(tender_type: str, company_ids, signature: dict) -> str:
+    scope = _ALL_COMPANIES if company_ids is None else ",".join(str(item) for item in _clean_ids(company_ids))
+    raw = json.dumps({"scope": scope, "filters": signature}, sort_keys=True, separators=(",", ":"))
+    return f"{JOURNAL_COUNT_CACHE_KEY_PREFIX}:d:{tender_type}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def _bump_version(cache, key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def invalidate_journal_counts(tender_type: str, company_id) -> None:
+    """Drop cached journal counts that include tenders of ``company_id``."""
+    if not company_id or _journal_count_cache_ttl() <= 0:
+        return
+    cache = _journal_count_cache()
+    try:
+        _bump_version(cache, _journal_count_version_key(tender_type, int(company_id)))
+        _bump_version(cache, _journal_count_version_key(tender_type, _ALL_COMPANIES))
+    except Exception:
+        logger.exception("journal count cache invalidation failed")
+
+
+def get_cached_journal_count(tender_type: str, *, company_ids, signature: dict) -> tuple[int | None, tuple]:
+    """
+    Return ``(count, versions)`` for a journal filter signature. ``company_ids``
+    is the visible company scope (``None`` for every company). Versions are
+    read before the caller counts, so a write that races with the count makes
+    the stored entry stale instead of wrong.
+    """
+    if _journal_count_cache_ttl() <= 0:
+        return None, ()
+    version_keys = _journal_count_version_keys(tender_type, company_ids)
+    entry_key = _journal_count_entry_key(tender_type, company_ids, signature)
+    try:
+        cached = _journal_count_cache().get_many(version_keys + [entry_key])
+    except Exception:
+        logger.exception("journal count cache unavailable")
+        return None, ()
+    versions = tuple(int(cached.get(key) or 0) for key in version_keys)
+    entry = cached.get(entry_key)
+    if entry and tuple(entry.get("versions") or ()) == versions:
+        return int(entry["count"]), versions
+    return None, versions
+
+
+def store_journal_count(tender_type: str, *, company_ids, signature: dict, count: int, versions: tuple) -> None:
+    ttl = _journal_count_cache_ttl()
+    if ttl <= 0:
+        return
+    try:
+        _journal_count_cache().set(
+            _journal_count_entry_key(tender_type, company_ids, signature),
+            {"versions": list(versions), "count": int(count)},
+            timeout=ttl,
+        )
+    except Exception:
+        logger.exception("journal count cache unavailable")
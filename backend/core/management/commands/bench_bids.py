@@ -0,0 +1,347 @@
+import itertools
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import realtime, views
+from core.models import (
+    Company,
+    CompanyUser,
+    CpvDictionary,
+    Currency,
+    Nomenclature,
+    ProcurementTender,
+    ProcurementTenderPosition,
+    Role,
+    SalesTender,
+    SalesTenderPosition,
+    SalesTenderProposal,
+    TenderAuctionPositionState,
+    TenderBidHistory,
+    TenderProposal,
+    UnitOfMeasure,
+    User,
+)
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "bench_bids_baseline.json"
+START_PRICE = Decimal("1000000")
+# Ключові параметри прогону: базова лінія порівнюється лише з тим самим набором.
+PARAM_NAMES = ("kind", "positions", "suppliers", "rounds", "batch", "concurrency")
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed an online auction and drive concurrent bids through the DRF position-values "
+        "endpoint; report latency percentiles, queries per bid and realtime events"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=["procurement", "sales"], default="procurement")
+        parser.add_argument("--positions", type=int, default=20, help="Auction positions (N)")
+        parser.add_argument("--suppliers", type=int, default=10, help="Bidding suppliers (M)")
+        parser.add_argument("--rounds", type=int, default=20, help="Bid requests per supplier")
+        parser.add_argument("--batch", type=int, default=1, help="Positions priced in one bid request")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Worker threads sending bids (SQLite serialises writers; use MySQL for > 1)",
+        )
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+        parser.add_argument("--check", action="store_true", help="Fail when the run regresses the baseline")
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=1.0,
+            help="Allowed p95 growth over the baseline for --check (1.0 = +100%%)",
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded tender and accounts")
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in PARAM_NAMES}
+        for name in ("positions", "suppliers", "rounds", "batch", "concurrency"):
+            if params[name] < 1:
+                raise CommandError(f"--{name} must be >= 1")
+        params["batch"] = min(params["batch"], params["positions"])
+        if CpvDictionary._meta.db_table not in connection.introspection.table_names():
+            raise CommandError(
+                f"Table {CpvDictionary._meta.db_table} is missing; load it with import/import_cpv_to_sql.py first"
+            )
+        is_sales = params["kind"] == "sales"
+        if connection.vendor == "sqlite" and params["concurrency"] > 1:
+            self.stdout.write(
+                self.style.WARNING("SQLite serialises writers: expect 'database is locked' errors above --concurrency 1")
+            )
+
+        seeded = self._seed(is_sales=is_sales, positions=params["positions"], suppliers=params["suppliers"])
+        try:
+            result = self._run(is_sales=is_sales, seeded=seeded, params=params)
+        finally:
+            if not options["keep"]:
+                self._cleanup(is_sales=is_sales, seeded=seeded)
+
+        vendor = connection.vendor
+        self._report(vendor=vendor, params=params, result=result)
+        self._compare_baseline(vendor=vendor, params=params, result=result, options=options)
+
+    def _seed(self, *, is_sales, positions, suppliers):
+        tender_model = SalesTender if is_sales else ProcurementTender
+        position_model = SalesTenderPosition if is_sales else ProcurementTenderPosition
+        proposal_model = SalesTenderProposal if is_sales else TenderProposal
+        run_id = uuid.uuid4().hex[:10]
+        currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+        unit, _ = UnitOfMeasure.objects.get_or_create(name_ua="шт")
+        owner_company = Company.objects.create(edrpou=f"b{run_id}", name=f"Bench owner {run_id}")
+        tender = tender_model.objects.create(
+            company=owner_company,
+            name=f"Bench auction {run_id}",
+            currency=currency,
+            conduct_type="online_auction",
+            stage="acceptance",
+        )
+        tender_positions = [
+            position_model.objects.create(
+                tender=tender,
+                nomenclature=Nomenclature.objects.create(
+                    company=owner_company, name=f"Bench item {run_id}-{index}", unit=unit
+                ),
+                start_price=START_PRICE,
+                min_bid_step=1,
+                max_bid_step=START_PRICE / 2,
+            )
+            for index in range(positions)
+        ]
+        companies = [owner_company]
+        users = []
+        bidders = []
+        for index in range(suppliers):
+            company = Company.objects.create(edrpou=f"s{run_id}{index}", name=f"Bench supplier {run_id}-{index}")
+            user = User.objects.create_user(email=f"bench-{run_id}-{index}@example.com", password=None)
+            CompanyUser.objects.create(
+                user=user,
+                company=company,
+                role=Role.objects.create(company=company, name=f"Bench {run_id}-{index}"),
+                status=CompanyUser.Status.APPROVED,
+            )
+            proposal = proposal_model.objects.create(
+                tender=tender, supplier_company=company, created_by=user
+            )
+            token = str(RefreshToken.for_user(user).access_token)
+            companies.append(company)
+            users.append(user)
+            bidders.append((token, proposal))
+        return {
+            "tender": tender,
+            "positions": tender_positions,
+            "bidders": bidders,
+            "companies": companies,
+            "users": users,
+        }
+
+    def _cleanup(self, *, is_sales, seeded):
+        tender = seeded["tender"]
+        tender_kind = "sales" if is_sales else "procurement"
+        TenderBidHistory.objects.filter(tender_type=tender_kind, tender_id=tender.id).delete()
+        TenderAuctionPositionState.objects.filter(tender_type=tender_kind, tender_id=tender.id).delete()
+        tender.delete()
+        User.objects.filter(id__in=[user.id for user in seeded["users"]]).delete()
+        for company in seeded["companies"]:
+            company.delete()
+
+    def _run(self, *, is_sales, seeded, params):
+        tender = seeded["tender"]
+        positions = seeded["positions"]
+        prefix = "sales-tenders" if is_sales else "procurement-tenders"
+        host = next(
+            (h for h in settings.ALLOWED_HOSTS if "*" not in h and not h.startswith(".")),
+            "localhost",
+        )
+        # Ціни видаються по черзі для кожної позиції; конкурентна ставка, що
+        # закомітилась пізніше за кращу, відхиляється як в реальному аукціоні.
+        price_lock = threading.Lock()
+        price_steps = {position.id: itertools.count(1) for position in positions}
+
+        def next_price(position_id):
+            with price_lock:
+                step = next(price_steps[position_id])
+            return START_PRICE + step if is_sales else START_PRICE - step
+
+        stats_lock = threading.Lock()
+        latencies_ms = []
+        query_counts = []
+        statuses = {}
+        published = {}
+        sent = {}
+        original_publish = views.publish_tender_event
+        original_send = realtime._send_tender_event
+
+        def counting_publish(kind, tender_id, event, payload):
+            with stats_lock:
+                published[event] = published.get(event, 0) + 1
+            return original_publish(kind, tender_id, event, payload)
+
+        def counting_send(kind, tender_id, event, payload):
+            with stats_lock:
+                sent[event] = sent.get(event, 0) + 1
+            return original_send(kind, tender_id, event, payload)
+
+        def run_bidder(bidder_index):
+            token, proposal = seeded["bidders"][bidder_index]
+            client = APIClient(HTTP_HOST=host, HTTP_AUTHORIZATION=f"Bearer {token}")
+            url = f"/api/{prefix}/{tender.id}/proposals/{proposal.id}/position-values/"
+            # Різні постачальники починають з різних позицій — менше зіткнень на одній.
+            offset = bidder_index * params["batch"]
+            try:
+                for round_index in range(params["rounds"]):
+                    start = offset + round_index * params["batch"]
+                    batch = [positions[(start + i) % len(positions)] for i in range(params["batch"])]
+                    body = {
+                        "position_values": [
+                            {"tender_position_id": position.id, "price": str(next_price(position.id))}
+                            for position in batch
+                        ]
+                    }
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        try:
+                            response = client.post(url, body, format="json")
+                            status_code = response.status_code
+                        except Exception:
+                            status_code = "error"
+                        elapsed_ms = (time.perf_counter() - started) * 1000
+                    with stats_lock:
+                        latencies_ms.append(elapsed_ms)
+                        query_counts.append(len(captured))
+                        statuses[status_code] = statuses.get(status_code, 0) + 1
+            finally:
+                if params["concurrency"] > 1:
+                    connection.close()
+
+        realtime.reset_coalesce_metrics()
+        with mock.patch.object(views, "publish_tender_event", counting_publish), mock.patch.object(
+            realtime, "_send_tender_event", counting_send
+        ):
+            started = time.perf_counter()
+            if params["concurrency"] > 1:
+                with ThreadPoolExecutor(max_workers=params["concurrency"]) as pool:
+                    list(pool.map(run_bidder, range(len(seeded["bidders"]))))
+            else:
+                for bidder_index in range(len(seeded["bidders"])):
+                    run_bidder(bidder_index)
+            elapsed_s = time.perf_counter() - started
+            # Дочекатися відкладених (згрупованих) proposal.* подій та фонової відправки.
+            flush_deadline = time.monotonic() + 5 + realtime._coalesce_window_ms() / 1000
+            while realtime.get_coalesce_metrics()["pending_flushes"] and time.monotonic() < flush_deadline:
+                time.sleep(0.05)
+            realtime.get_outbound_sender().drain(timeout=5)
+
+        requests_total = len(latencies_ms)
+        bids_total = requests_total * params["batch"]
+        accepted = statuses.get(200, 0)
+        return {
+            "requests": requests_total,
+            "accepted": accepted,
+            "rejected": sum(count for code, count in statuses.items() if isinstance(code, int) and 400 <= code < 500),
+            "errors": sum(count for code, count in statuses.items() if code == "error" or (isinstance(code, int) and code >= 500)),
+            "elapsed_s": round(elapsed_s, 3),
+            "requests_per_second": round(requests_total / elapsed_s, 1) if elapsed_s else 0.0,
+            "bids_per_second": round(accepted * params["batch"] / elapsed_s, 1) if elapsed_s else 0.0,
+            "p50_ms": round(_percentile(latencies_ms, 0.50), 2),
+            "p95_ms": round(_percentile(latencies_ms, 0.95), 2),
+            "p99_ms": round(_percentile(latencies_ms, 0.99), 2),
+            "queries_per_request": round(sum(query_counts) / requests_total, 2) if requests_total else 0.0,
+            "queries_per_bid": round(sum(query_counts) / bids_total, 2) if bids_total else 0.0,
+            "events_published": sum(published.values()),
+            "events_published_per_accepted": round(sum(published.values()) / accepted, 2) if accepted else 0.0,
+            "events_sent": sum(sent.values()),
+            "events_published_by_type": dict(sorted(published.items())),
+            "events_sent_by_type": dict(sorted(sent.items())),
+        }
+
+    def _report(self, *, vendor, params, result):
+        self.stdout.write(
+            f"db={vendor} " + " ".join(f"{name}={params[name]}" for name in PARAM_NAMES)
+        )
+        self.stdout.write(
+            f"requests={result['requests']} accepted={result['accepted']} "
+            f"rejected={result['rejected']} errors={result['errors']} elapsed={result['elapsed_s']}s"
+        )
+        self.stdout.write(
+            f"throughput {result['requests_per_second']:>9.1f} req/s {result['bids_per_second']:>9.1f} accepted bids/s"
+        )
+        self.stdout.write(
+            f"latency    p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms"
+        )
+        self.stdout.write(
+            f"queries    {result['queries_per_request']:>8.2f} per request {result['queries_per_bid']:>8.2f} per bid"
+        )
+        self.stdout.write(
+            f"realtime   {result['events_published']} published {result['events_sent']} sent after coalescing"
+        )
+        for event, count in result["events_sent_by_type"].items():
+            self.stdout.write(
+                f"           {event:<36} {result['events_published_by_type'].get(event, 0):>6} -> {count}"
+            )
+
+    def _compare_baseline(self, *, vendor, params, result, options):
+        baseline_path = Path(options["baseline"])
+        baselines = {}
+        if baseline_path.exists():
+            baselines = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if options["save_baseline"]:
+            baselines[vendor] = {"params": params, "result": result}
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Baseline for {vendor} saved to {baseline_path}"))
+            return
+        baseline = baselines.get(vendor)
+        if not baseline:
+            self.stdout.write(f"No {vendor} baseline in {baseline_path}")
+            return
+        if baseline["params"] != params:
+            self.stdout.write(
+                f"Baseline params differ ({baseline['params']}); comparison skipped"
+            )
+            return
+        expected = baseline["result"]
+        regressions = []
+        # Запити та події на ставку не залежать від машини, латентність — залежить.
+        # Кількість надісланих подій після групування залежить від таймінгу, тому лише звітується.
+        for metric in ("queries_per_bid", "events_published_per_accepted"):
+            if result[metric] > expected[metric]:
+                regressions.append(f"{metric} {expected[metric]} -> {result[metric]}")
+        p95_limit = expected["p95_ms"] * (1 + options["latency_tolerance"])
+        if result["p95_ms"] > p95_limit:
+            regressions.append(f"p95_ms {expected['p95_ms']} -> {result['p95_ms']} (limit {p95_limit:.2f})")
+        if result["errors"]:
+            regressions.append(f"errors {result['errors']}")
+        for metric in ("queries_per_bid", "events_published_per_accepted", "p95_ms"):
+            self.stdout.write(f"baseline   {metric:<30} {expected[metric]:>10} now {result[metric]:>10}")
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+            return
+        message = "Regressions against the baseline: " + "; ".join(regressions)
+        if options["check"]:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import views
+from core.models import (
+    Company,
+    CompanyUser,
+    CpvDictionary,
+    Currency,
+    Nomenclature,
+    ProcurementTender,
+    ProcurementTenderPosition,
+    Role,
+    TenderBidHistory,
+    TenderProposal,
+    UnitOfMeasure,
+    User,
+)
+
+ENDPOINTS = ("status", "bid-history", "participant-view")
+MODES = ("sync", "async")
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent read requests for status sync, bid-history and participant-view "
+        "through the ASGI application and compare the sync DRF actions with the async fast path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=[*ENDPOINTS, "all"], default="all")
+        parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint, mode and level")
+        parser.add_argument(
+            "--concurrency",
+            default="1,16,64",
+            help="Comma-separated in-flight request levels to compare",
+        )
+        parser.add_argument("--suppliers", type=int, default=10, help="Seeded proposals (M)")
+        parser.add_argument("--bids", type=int, default=200, help="Seeded bid history rows")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded tender and accounts")
+
+    def handle(self, *args, **options):
+        try:
+            levels = sorted({int(value) for value in str(options["concurrency"]).split(",") if value.strip()})
+        except ValueError as exc:
+            raise CommandError("--concurrency must be a comma-separated list of integers") from exc
+        if not levels or levels[0] < 1 or options["requests"] < 1 or options["suppliers"] < 1:
+            raise CommandError("--requests, --suppliers and every --concurrency level must be >= 1")
+        if CpvDictionary._meta.db_table not in connection.introspection.table_names():
+            raise CommandError(
+                f"Table {CpvDictionary._meta.db_table} is missing; load it with import/import_cpv_to_sql.py first"
+            )
+        endpoints = ENDPOINTS if options["endpoint"] == "all" else (options["endpoint"],)
+
+        seeded = self._seed(suppliers=options["suppliers"], bids=options["bids"])
+        try:
+            results = asyncio.run(
+                self._run(seeded=seeded, endpoints=endpoints, levels=levels, total=options["requests"])
+            )
+        finally:
+            if not options["keep"]:
+                self._cleanup(seeded)
+        self._report(vendor=connection.vendor, results=results)
+
+    def _seed(self, *, suppliers, bids):
+        run_id = uuid.uuid4().hex[:10]
+        currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+        unit, _ = UnitOfMeasure.objects.get_or_create(name_ua="шт")
+        owner_company = Company.objects.create(edrpou=f"r{run_id}", name=f"Bench owner {run_id}")
+        owner = User.objects.create_user(email=f"bench-read-owner-{run_id}@example.com", password=None)
+        CompanyUser.objects.create(
+            user=owner,
+            company=owner_company,
+            role=Role.objects.create(company=owner_company, name=f"Bench read {run_id}"),
+            status=CompanyUser.Status.APPROVED,
+        )
+        tender = ProcurementTender.objects.create(
+            company=owner_company,
+            name=f"Bench reads {run_id}",
+            currency=currency,
+            conduct_type="online_auction",
+            stage="acceptance",
+        )
+        position = ProcurementTenderPosition.objects.create(
+            tender=tender,
+            nomenclature=Nomenclature.objects.create(
+                company=owner_company, name=f"Bench read item {run_id}", unit=unit
+            ),
+            start_price=Decimal("1000000"),
+            min_bid_step=1,
+            max_bid_step=Decimal("500000"),
+        )
+        companies = [owner_company]
+        users = [owner]
+        proposals = []
+        for index in range(suppliers):
+            company = Company.objects.create(edrpou=f"q{run_id}{index}", name=f"Bench reader {run_id}-{index}")
+            user = User.objects.create_user(email=f"bench-read-{run_id}-{index}@example.com", password=None)
+            CompanyUser.objects.create(
+                user=user,
+                company=company,
+                role=Role.objects.create(company=company, name=f"Bench read {run_id}-{index}"),
+                status=CompanyUser.Status.APPROVED,
+            )
+            proposals.append(
+                TenderProposal.objects.create(tender=tender, supplier_company=company, created_by=user)
+            )
+            companies.append(company)
+            users.append(user)
+        TenderBidHistory.objects.bulk_create(
+            [
+                TenderBidHistory(
+                    tender_type="procurement",
+                    tender_id=tender.id,
+                    proposal_id=proposals[index % len(proposals)].id,
+                    tender_position_id=position.id,
+                    supplier_company_id=proposals[index % len(proposals)].supplier_company_id,
+                    price=Decimal("1000000") - index - 1,
+                    created_by=users[1 + index % len(proposals)],
+                )
+                for index in range(bids)
+            ]
+        )
+        return {
+            "tender": tender,
+            "position": position,
+            "owner_token": str(RefreshToken.for_user(owner).access_token),
+            "supplier_token": str(RefreshToken.for_user(users[1]).access_token),
+            "companies": companies,
+            "users": users,
+        }
+
+    def _cleanup(self, seeded):
+        tender = seeded["tender"]
+        TenderBidHistory.objects.filter(tender_type="procurement", tender_id=tender.id).delete()
+        tender.delete()
+        User.objects.filter(id__in=[user.id for user in seeded["users"]]).delete()
+        for company in seeded["companies"]:
+            company.delete()
+
+    def _request_for(self, endpoint, seeded):
+        tender_id = seeded["tender"].id
+        if endpoint == "status":
+            return f"/api/procurement-tenders/{tender_id}/proposals/", "view=status", seeded["owner_token"]
+        if endpoint == "bid-history":
+            return (
+                f"/api/procurement-tenders/{tender_id}/bid-history/",
+                f"tender_position_id={seeded['position'].id}&cursor_mode=1&page_size=50",
+                seeded["owner_token"],
+            )
+        return f"/api/procurement-tenders/{tender_id}/participant-view/", "", seeded["supplier_token"]
+
+    async def _run(self, *, seeded, endpoints, levels, total):
+        application = get_asgi_application()
+        host = next(
+            (h for h in settings.ALLOWED_HOSTS if "*" not in h and not h.startswith(".")),
+            "localhost",
+        )
+        results = []
+        for endpoint in endpoints:
+            path, query, token = self._request_for(endpoint, seeded)
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode("ascii"),
+                "query_string": query.encode("ascii"),
+                "headers": [
+                    (b"host", host.encode("ascii")),
+                    (b"authorization", f"Bearer {token}".encode("ascii")),
+                ],
+                "client": ("127.0.0.1", 40000),
+                "server": (host, 80),
+            }
+            for level in levels:
+                for mode in MODES:
+                    # Той самий ASGI-стек; fast path вимикається так само, як ASYNC_READ_FAST_PATH=0.
+                    # Ліміти лишаються в ланцюжку, але з бюджетом, якого вистачає на прогін.
+                    with mock.patch.object(views, "ASYNC_READ_FAST_PATH", mode == "async"), mock.patch.object(
+                        views, "STATUS_SYNC_THROTTLE_PER_MINUTE", 10**9
+                    ), mock.patch.object(
+                        views, "STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE", 10**9
+                    ), mock.patch.object(SimpleRateThrottle, "get_rate", return_value="1000000000/min"):
+                        result = await self._drive(application, scope, level=level, total=total)
+                    results.append({"endpoint": endpoint, "mode": mode, "concurrency": level, **result})
+        return results
+
+    async def _drive(self, application, scope, *, level, total):
+        latencies_ms = []
+        statuses = {}
+        peak_threads = threading.active_count()
+        remaining = iter(range(total))
+
+        async def one_request():
+            communicator = ApplicationCommunicator(application, dict(scope))
+            await communicator.send_input({"type": "http.request", "body": b"", "more_body": False})
+            started = time.perf_counter()
+            start = await communicator.receive_output(timeout=60)
+            while True:
+                message = await communicator.receive_output(timeout=60)
+                if message["type"] == "http.response.body" and not message.get("more_body"):
+                    break
+            await communicator.wait(timeout=60)
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+            statuses[start["status"]] = statuses.get(start["status"], 0) + 1
+
+        async def worker():
+            nonlocal peak_threads
+            for _ in remaining:
+                await one_request()
+                peak_threads = max(peak_threads, threading.active_count())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(level)))
+        elapsed_s = time.perf_counter() - started
+        return {
+            "requests": len(latencies_ms),
+            "errors": sum(count for code, count in statuses.items() if code != 200),
+            "requests_per_second": round(len(latencies_ms) / elapsed_s, 1) if elapsed_s else 0.0,
+            "p50_ms": round(_percentile(latencies_ms, 0.50), 2),
+            "p95_ms": round(_percentile(latencies_ms, 0.95), 2),
+            "peak_threads": peak_threads,
+        }
+
+    def _report(self, *, vendor, results):
+        self.stdout.write(f"db={vendor}")
+        self.stdout.write(
+            f"{'endpoint':<18} {'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'threads':>8} {'errors':>7}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['endpoint']:<18} {row['mode']:<6} {row['concurrency']:>5} "
+                f"{row['requests_per_second']:>9.1f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                f"{row['peak_threads']:>8} {row['errors']:>7}"
+            )
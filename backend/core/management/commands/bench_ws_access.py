@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.consumers import _resolve_tender_access, _user_company_ids
+from core.models import CompanyUser, ProcurementTender, SalesTender
+from core.realtime import invalidate_user_tender_access
+
+
+class Command(BaseCommand):
+    help = "Measure queries and time per websocket access check (cold and cached)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=int, required=True)
+        parser.add_argument("--kind", choices=["procurement", "sales"], default="procurement")
+        parser.add_argument("--tenders", type=int, default=30, help="How many tenders to check")
+        parser.add_argument("--rounds", type=int, default=20, help="Repetitions for timing")
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+        kind = options["kind"]
+        if not CompanyUser.objects.filter(user_id=user_id).exists():
+            raise CommandError(f"User {user_id} has no company memberships")
+        tender_model = ProcurementTender if kind == "procurement" else SalesTender
+        tender_ids = list(
+            tender_model.objects.order_by("-id").values_list("id", flat=True)[: options["tenders"]]
+        )
+        if not tender_ids:
+            raise CommandError(f"No {kind} tenders to check")
+        keys = [(kind, tender_id) for tender_id in tender_ids]
+        rounds = max(1, options["rounds"])
+
+        def measure(label, check, *, cold, per=1):
+            queries = 0
+            started = time.perf_counter()
+            for _ in range(rounds):
+                if cold:
+                    invalidate_user_tender_access(user_id)
+                with CaptureQueriesContext(connection) as captured:
+                    check()
+                queries += len(captured)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / (rounds * per)
+            self.stdout.write(f"{label:<40} {queries / (rounds * per):>8.2f} queries {elapsed_ms:>9.3f} ms")
+
+        self.stdout.write(f"user={user_id} kind={kind} tenders={len(keys)} rounds={rounds}")
+        def connect_each():
+            for key in keys:
+                _resolve_tender_access(user_id, [key])
+
+        measure("per connect, cold", connect_each, cold=True, per=len(keys))
+        measure("per connect, cached", connect_each, cold=False, per=len(keys))
+        measure("subscribe batch, cold", lambda: _resolve_tender_access(user_id, keys), cold=True)
+        measure(
+            "subscribe batch + company ids, cold",
+            lambda: (_resolve_tender_access(user_id, keys), _user_company_ids(user_id)),
+            cold=True,
+        )
+        self.stdout.write("Previous per-connect check: up to 5 queries, never cached.")
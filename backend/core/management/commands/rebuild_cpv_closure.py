@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cpv_closure import rebuild_cpv_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the CpvClosure ancestor/descendant table; run after every CPV dictionary import"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        pairs = rebuild_cpv_closure(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"cpv closure: {pairs} ancestor/descendant pairs"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.journal_summary import TENDER_TYPE_PROCUREMENT, TENDER_TYPE_SALES
+from core.participation_state import rebuild_participation_states
+
+
+class Command(BaseCommand):
+    help = "Rebuild TenderParticipationState rows used by the participation tender lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tender-type",
+            choices=[TENDER_TYPE_PROCUREMENT, TENDER_TYPE_SALES, "all"],
+            default="all",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        tender_types = (
+            (TENDER_TYPE_PROCUREMENT, TENDER_TYPE_SALES)
+            if options["tender_type"] == "all"
+            else (options["tender_type"],)
+        )
+        for tender_type in tender_types:
+            written, removed = rebuild_participation_states(tender_type, batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"{tender_type}: updated {written} rows, removed {removed} orphaned")
+            )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import (
+    SEARCH_ENTITY_NOMENCLATURE,
+    SEARCH_ENTITY_PROCUREMENT_TENDER,
+    SEARCH_ENTITY_SALES_TENDER,
+    rebuild_search_index,
+    search_backend,
+)
+
+ENTITY_TYPES = (
+    SEARCH_ENTITY_PROCUREMENT_TENDER,
+    SEARCH_ENTITY_SALES_TENDER,
+    SEARCH_ENTITY_NOMENCLATURE,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild SearchDocument rows used by tender and nomenclature name search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entity", choices=[*ENTITY_TYPES, "all"], default="all")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+        entity_types = ENTITY_TYPES if options["entity"] == "all" else (options["entity"],)
+        counts = rebuild_search_index(entity_types, batch_size=options["batch_size"])
+        self.stdout.write(f"backend={search_backend() or 'icontains'}")
+        for entity_type, indexed in counts.items():
+            self.stdout.write(self.style.SUCCESS(f"{entity_type}: indexed {indexed}"))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.journal_summary import (
+    TENDER_TYPE_PROCUREMENT,
+    TENDER_TYPE_SALES,
+    refresh_tender_journal_summaries,
+)
+from core.models import ProcurementTender, SalesTender, TenderJournalSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild TenderJournalSummary rows used by the owner tender journal"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tender-type",
+            choices=[TENDER_TYPE_PROCUREMENT, TENDER_TYPE_SALES, "all"],
+            default="all",
+        )
+        parser.add_argument("--company", type=int, default=0, help="Only tenders of this company id")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only recompute rows that are missing or marked stale",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be >= 1")
+        tender_types = (
+            (TENDER_TYPE_PROCUREMENT, TENDER_TYPE_SALES)
+            if options["tender_type"] == "all"
+            else (options["tender_type"],)
+        )
+        for tender_type in tender_types:
+            tender_model = SalesTender if tender_type == TENDER_TYPE_SALES else ProcurementTender
+            qs = tender_model.objects.order_by("id")
+            if options["company"]:
+                qs = qs.filter(company_id=options["company"])
+            if options["stale_only"]:
+                fresh_ids = TenderJournalSummary.objects.filter(
+                    tender_type=tender_type,
+                    is_stale=False,
+                ).values("tender_id")
+                qs = qs.exclude(id__in=fresh_ids)
+
+            refreshed = 0
+            last_id = 0
+            while True:
+                ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+                if not ids:
+                    break
+                refreshed += len(refresh_tender_journal_summaries(tender_type, ids))
+                last_id = ids[-1]
+
+            removed = 0
+            if not options["company"]:
+                removed, _ = (
+                    TenderJournalSummary.objects.filter(tender_type=tender_type)
+                    .exclude(tender_id__in=tender_model.objects.values("id"))
+                    .delete()
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"{tender_type}: refreshed {refreshed} summaries, removed {removed} orphaned")
+            )
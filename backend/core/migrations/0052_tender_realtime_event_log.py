@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_warehouse_unified_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderRealtimeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_type', models.CharField(choices=[('procurement', 'Закупівля'), ('sales', 'Продаж')], max_length=16)),
+                ('tender_id', models.PositiveIntegerField()),
+                ('seq', models.PositiveBigIntegerField()),
+                ('event', models.CharField(max_length=64)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('sent_at', models.CharField(blank=True, default='', max_length=40)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Realtime-подія тендера',
+                'verbose_name_plural': 'Realtime-події тендерів',
+                'ordering': ['tender_type', 'tender_id', 'seq'],
+                'unique_together': {('tender_type', 'tender_id', 'seq')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TenderRealtimeStream',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_type', models.CharField(choices=[('procurement', 'Закупівля'), ('sales', 'Продаж')], max_length=16)),
+                ('tender_id', models.PositiveIntegerField()),
+                ('last_seq', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Потік realtime-подій тендера',
+                'verbose_name_plural': 'Потоки realtime-подій тендерів',
+                'unique_together': {('tender_type', 'tender_id')},
+            },
+        ),
+    ]
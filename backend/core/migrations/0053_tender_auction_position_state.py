@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0052_tender_realtime_event_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderAuctionPositionState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_type', models.CharField(choices=[('procurement', 'Закупівля'), ('sales', 'Продаж')], max_length=16)),
+                ('tender_id', models.PositiveIntegerField(db_index=True)),
+                ('tender_position_id', models.PositiveIntegerField()),
+                ('best_price', models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True)),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Стан аукціону по позиції',
+                'verbose_name_plural': 'Стани аукціону по позиціях',
+                'unique_together': {('tender_type', 'tender_position_id')},
+            },
+        ),
+    ]
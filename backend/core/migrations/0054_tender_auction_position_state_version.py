@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0053_tender_auction_position_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenderauctionpositionstate',
+            name='best_proposal_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tenderauctionpositionstate',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Зростає з кожною прийнятою ставкою; рядок блокується під час валідації ставки.'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0054_tender_auction_position_state_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salestenderproposalposition',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Зростає з кожною зміною; запис зі застарілою версією відхиляється (409).'),
+        ),
+        migrations.AddField(
+            model_name='tenderproposalposition',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Зростає з кожною зміною; запис зі застарілою версією відхиляється (409).'),
+        ),
+    ]
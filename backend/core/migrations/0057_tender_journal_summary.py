@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0056_rate_limit_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderJournalSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_type', models.CharField(choices=[('procurement', 'Закупівля'), ('sales', 'Продаж')], max_length=16)),
+                ('tender_id', models.PositiveIntegerField()),
+                ('winners_count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('market_total_amount', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('has_submitted_position_prices', models.BooleanField(default=False)),
+                ('has_next_tour', models.BooleanField(default=False)),
+                ('is_stale', models.BooleanField(default=True)),
+                ('version', models.PositiveIntegerField(default=0, help_text='Зростає з кожною зміною тендера; перерахунок зі старою версією не записується.')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Підсумок тендера для журналу',
+                'verbose_name_plural': 'Підсумки тендерів для журналу',
+                'unique_together': {('tender_type', 'tender_id')},
+            },
+        ),
+    ]
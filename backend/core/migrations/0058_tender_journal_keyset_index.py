@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0057_tender_journal_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='procurementtender',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='ptender_company_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salestender',
+            index=models.Index(fields=['company', 'updated_at', 'id'], name='stender_company_upd_idx'),
+        ),
+    ]
@@ -0,0 +1,151 @@
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copies of core.search as of this migration, so later changes there do not alter it.
+DOCUMENT_TABLE = "core_searchdocument"
+FTS5_TABLE = "core_searchdocument_fts"
+
+_CYRILLIC_TO_LATIN = {
+    "а": "a",
+    "б": "b",
+    "в": "v",
+    "г": "h",
+    "ґ": "g",
+    "д": "d",
+    "е": "e",
+    "є": "ye",
+    "ж": "zh",
+    "з": "z",
+    "и": "y",
+    "і": "i",
+    "ї": "yi",
+    "й": "y",
+    "к": "k",
+    "л": "l",
+    "м": "m",
+    "н": "n",
+    "о": "o",
+    "п": "p",
+    "р": "r",
+    "с": "s",
+    "т": "t",
+    "у": "u",
+    "ф": "f",
+    "х": "kh",
+    "ц": "ts",
+    "ч": "ch",
+    "ш": "sh",
+    "щ": "shch",
+    "ь": "",
+    "ю": "yu",
+    "я": "ya",
+    "ё": "yo",
+    "ъ": "",
+    "ы": "y",
+    "э": "e",
+}
+_APOSTROPHES_RE = re.compile("['`’ʼʹ]")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_search_text(value):
+    text = unicodedata.normalize("NFKC", str(value or "")).lower()
+    text = _APOSTROPHES_RE.sub("", text)
+    text = "".join(_CYRILLIC_TO_LATIN.get(ch, ch) for ch in text)
+    text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def create_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE {DOCUMENT_TABLE} ADD FULLTEXT INDEX core_search_text_ft (search_text)"
+        )
+        return
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+            # Без FTS5 пошук працює по search_text через LIKE.
+            return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS5_TABLE} USING fts5("
+        f"search_text, content='{DOCUMENT_TABLE}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS5_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS5_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS5_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS5_TABLE}({FTS5_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS5_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN "
+        f"INSERT INTO {FTS5_TABLE}({FTS5_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {FTS5_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    for trigger in ("ai", "ad", "au"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS5_TABLE}_{trigger}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS5_TABLE}")
+
+
+def backfill_search_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    sources = (
+        ("procurement_tender", apps.get_model("core", "ProcurementTender")),
+        ("sales_tender", apps.get_model("core", "SalesTender")),
+        ("nomenclature", apps.get_model("core", "Nomenclature")),
+    )
+    for entity_type, model in sources:
+        batch = []
+        for entity_id, name in model.objects.order_by("id").values_list("id", "name").iterator(chunk_size=2000):
+            batch.append(
+                SearchDocument(
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    search_text=normalize_search_text(name),
+                )
+            )
+            if len(batch) >= 2000:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0058_tender_journal_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('procurement_tender', 'Тендер на закупівлю'), ('sales_tender', 'Тендер на продаж'), ('nomenclature', 'Номенклатура')], max_length=32)),
+                ('entity_id', models.PositiveIntegerField()),
+                ('search_text', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'verbose_name': 'Документ пошукового індексу',
+                'verbose_name_plural': 'Документи пошукового індексу',
+                'unique_together': {('entity_type', 'entity_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_participation_states(apps, schema_editor):
+    TenderParticipationState = apps.get_model("core", "TenderParticipationState")
+    sources = (
+        ("procurement", "TenderProposal", "TenderProposalPosition", "ProcurementTenderPosition"),
+        ("sales", "SalesTenderProposal", "SalesTenderProposalPosition", "SalesTenderPosition"),
+    )
+    for tender_type, proposal_name, value_name, position_name in sources:
+        value_model = apps.get_model("core", value_name)
+        position_model = apps.get_model("core", position_name)
+        with_values = set(value_model.objects.values_list("proposal_id", flat=True).distinct())
+        winners = set(
+            position_model.objects.filter(winner_proposal__isnull=False)
+            .values_list("winner_proposal_id", flat=True)
+            .distinct()
+        )
+        batch = []
+        for proposal_id, tender_id, company_id, submitted_at in (
+            apps.get_model("core", proposal_name)
+            .objects.order_by("id")
+            .values_list("id", "tender_id", "supplier_company_id", "submitted_at")
+            .iterator(chunk_size=2000)
+        ):
+            batch.append(
+                TenderParticipationState(
+                    tender_type=tender_type,
+                    tender_id=tender_id,
+                    supplier_company_id=company_id,
+                    has_proposal=True,
+                    is_submitted=submitted_at is not None,
+                    has_position_values=proposal_id in with_values,
+                    is_winner=proposal_id in winners,
+                )
+            )
+            if len(batch) >= 2000:
+                TenderParticipationState.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            TenderParticipationState.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0059_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderParticipationState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_type', models.CharField(choices=[('procurement', 'Закупівля'), ('sales', 'Продаж')], max_length=16)),
+                ('tender_id', models.PositiveIntegerField()),
+                ('has_proposal', models.BooleanField(default=True)),
+                ('is_submitted', models.BooleanField(default=False)),
+                ('has_position_values', models.BooleanField(default=False)),
+                ('is_winner', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('supplier_company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tender_participation_states', to='core.company')),
+            ],
+            options={
+                'verbose_name': 'Стан участі в тендері',
+                'verbose_name_plural': 'Стани участі в тендерах',
+                'indexes': [models.Index(fields=['supplier_company', 'tender_type', 'tender_id'], name='tps_company_tender_idx')],
+                'unique_together': {('tender_type', 'tender_id', 'supplier_company')},
+            },
+        ),
+        migrations.RunPython(backfill_participation_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+
+# Frozen copy of core.cpv_closure.compute_cpv_closure as of this migration.
+MAX_CPV_DEPTH = 30
+
+
+def compute_cpv_closure(rows):
+    id_by_level_code = {level_code: cpv_id for cpv_id, level_code, _ in rows if level_code}
+    parent_code_by_id = {cpv_id: parent_code for cpv_id, _, parent_code in rows}
+    pairs = []
+    for cpv_id, _, parent_code in rows:
+        pairs.append((cpv_id, cpv_id, 0))
+        seen = {cpv_id}
+        depth = 0
+        while parent_code and parent_code != "0" and depth < MAX_CPV_DEPTH:
+            ancestor_id = id_by_level_code.get(parent_code)
+            if ancestor_id is None or ancestor_id in seen:
+                break
+            depth += 1
+            seen.add(ancestor_id)
+            pairs.append((ancestor_id, cpv_id, depth))
+            parent_code = parent_code_by_id.get(ancestor_id, "")
+    return pairs
+
+
+def build_cpv_closure(apps, schema_editor):
+    CpvDictionary = apps.get_model("core", "CpvDictionary")
+    CpvClosure = apps.get_model("core", "CpvClosure")
+    if CpvDictionary._meta.db_table not in schema_editor.connection.introspection.table_names():
+        # Довідник ще не імпортовано; після імпорту запустіть rebuild_cpv_closure.
+        return
+    rows = [
+        (int(cpv_id), (level_code or "").strip(), (parent_code or "").strip())
+        for cpv_id, level_code, parent_code in CpvDictionary.objects.values_list(
+            "id", "cpv_level_code", "cpv_parent_code"
+        )
+    ]
+    CpvClosure.objects.bulk_create(
+        [
+            CpvClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+            for ancestor_id, descendant_id, depth in compute_cpv_closure(rows)
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0060_tender_participation_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CpvClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor_id', models.PositiveIntegerField()),
+                ('descendant_id', models.PositiveIntegerField()),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': "Зв'язок ієрархії CPV",
+                'verbose_name_plural': 'Замикання ієрархії CPV',
+                'indexes': [models.Index(fields=['descendant_id', 'ancestor_id'], name='cpv_closure_desc_idx')],
+                'unique_together': {('ancestor_id', 'descendant_id')},
+            },
+        ),
+        migrations.RunPython(build_cpv_closure, migrations.RunPython.noop),
+    ]
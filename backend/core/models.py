@@ -332,6 +332,111 @@ class TenderBidHistory(models.Model):
         ]
 
 
+class TenderAuctionPositionState(models.Model):
+    """
+    Поточний стан онлайн-аукціону по позиції: краща ціна, її пропозиція та
+    кількість ставок. Валідація ставки працює з цим рядком замість перебору цін.
+    """
+
+    tender_type = models.CharField(max_length=16, choices=TenderBidHistory.TenderType.choices)
+    tender_id = models.PositiveIntegerField(db_index=True)
+    tender_position_id = models.PositiveIntegerField()
+    best_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    best_proposal_id = models.PositiveIntegerField(null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Зростає з кожною прийнятою ставкою; рядок блокується під час валідації ставки.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Стан аукціону по позиції"
+        verbose_name_plural = "Стани аукціону по позиціях"
+        unique_together = (("tender_type", "tender_position_id"),)
+
+
+class SearchDocument(models.Model):
+    """
+    Тіньовий індекс пошуку за назвами: нормалізований (латиницею) текст назви.
+    У MySQL по search_text є FULLTEXT-індекс, у SQLite — таблиця FTS5 з тригерами.
+    """
+
+    class EntityType(models.TextChoices):
+        PROCUREMENT_TENDER = "procurement_tender", "Тендер на закупівлю"
+        SALES_TENDER = "sales_tender", "Тендер на продаж"
+        NOMENCLATURE = "nomenclature", "Номенклатура"
+
+    entity_type = models.CharField(max_length=32, choices=EntityType.choices)
+    entity_id = models.PositiveIntegerField()
+    search_text = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Документ пошукового індексу"
+        verbose_name_plural = "Документи пошукового індексу"
+        unique_together = (("entity_type", "entity_id"),)
+
+
+class TenderJournalSummary(models.Model):
+    """
+    Підсумки тендера для журналу замовника (переможці, сума, ринкова сума,
+    наявність поданих цін і наступного туру). Записи тендера позначають рядок
+    застарілим (is_stale, version + 1) у своїй транзакції, після коміту рядок
+    перераховується; журнал перераховує застарілі рядки сторінки під час читання.
+    """
+
+    tender_type = models.CharField(max_length=16, choices=TenderBidHistory.TenderType.choices)
+    tender_id = models.PositiveIntegerField()
+    winners_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+    market_total_amount = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+    has_submitted_position_prices = models.BooleanField(default=False)
+    has_next_tour = models.BooleanField(default=False)
+    is_stale = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Зростає з кожною зміною тендера; перерахунок зі старою версією не записується.",
+    )
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Підсумок тендера для журналу"
+        verbose_name_plural = "Підсумки тендерів для журналу"
+        unique_together = (("tender_type", "tender_id"),)
+
+
+class TenderParticipationState(models.Model):
+    """
+    Стан участі компанії-контрагента в тендері (є КП, подано, є ціни по позиціях,
+    є перемога) для списків участі. Оновлюється в транзакції підтвердження участі,
+    подачі/відкликання КП, введення цін і фіксації переможців.
+    """
+
+    tender_type = models.CharField(max_length=16, choices=TenderBidHistory.TenderType.choices)
+    tender_id = models.PositiveIntegerField()
+    supplier_company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="tender_participation_states",
+    )
+    has_proposal = models.BooleanField(default=True)
+    is_submitted = models.BooleanField(default=False)
+    has_position_values = models.BooleanField(default=False)
+    is_winner = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Стан участі в тендері"
+        verbose_name_plural = "Стани участі в тендерах"
+        unique_together = (("tender_type", "tender_id", "supplier_company"),)
+        indexes = [
+            models.Index(
+                fields=["supplier_company", "tender_type", "tender_id"],
+                name="tps_company_tender_idx",
+            ),
+        ]
+
+
 class TenderProposalChangeLog(models.Model):
     """Актуальний звіт змін КП, які вносив замовник на етапі вибору рішення."""
 
@@ -375,6 +480,57 @@ class TenderProposalChangeLog(models.Model):
         ]
 
 
+class TenderRealtimeStream(models.Model):
+    """Лічильник послідовності realtime-подій тендера (seq для відновлення потоку)."""
+
+    class TenderType(models.TextChoices):
+        PROCUREMENT = "procurement", "Закупівля"
+        SALES = "sales", "Продаж"
+
+    tender_type = models.CharField(max_length=16, choices=TenderType.choices)
+    tender_id = models.PositiveIntegerField()
+    last_seq = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Потік realtime-подій тендера"
+        verbose_name_plural = "Потоки realtime-подій тендерів"
+        unique_together = (("tender_type", "tender_id"),)
+
+
+class TenderRealtimeEvent(models.Model):
+    """Outbox realtime-подій тендера для повторної доставки клієнтам за ?since_seq."""
+
+    class TenderType(models.TextChoices):
+        PROCUREMENT = "procurement", "Закупівля"
+        SALES = "sales", "Продаж"
+
+    tender_type = models.CharField(max_length=16, choices=TenderType.choices)
+    tender_id = models.PositiveIntegerField()
+    seq = models.PositiveBigIntegerField()
+    event = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    sent_at = models.CharField(max_length=40, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Realtime-подія тендера"
+        verbose_name_plural = "Realtime-події тендерів"
+        ordering = ["tender_type", "tender_id", "seq"]
+        unique_together = (("tender_type", "tender_id", "seq"),)
+
+
+class RateLimitBucket(models.Model):
+    """Стан token bucket для ліміту запитів (бекенд RATE_LIMIT_BACKEND=db)."""
+
+    key = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField(db_index=True)
+
+    class Meta:
+        verbose_name = "Лічильник ліміту запитів"
+        verbose_name_plural = "Лічильники лімітів запитів"
+
+
 class Branch(models.Model):
     """
     Філіал компанії (дерево).
@@ -478,6 +634,25 @@ class CpvDictionary(models.Model):
         return f"{self.cpv_code} - {self.name_ua}"
 
 
+class CpvClosure(models.Model):
+    """
+    Замикання ієрархії CPV: усі пари предок-нащадок (вузол є власним предком
+    з depth=0). Перебудовується командою rebuild_cpv_closure після імпорту CPV.
+    """
+
+    ancestor_id = models.PositiveIntegerField()
+    descendant_id = models.PositiveIntegerField()
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Зв'язок ієрархії CPV"
+        verbose_name_plural = "Замикання ієрархії CPV"
+        unique_together = (("ancestor_id", "descendant_id"),)
+        indexes = [
+            models.Index(fields=["descendant_id", "ancestor_id"], name="cpv_closure_desc_idx"),
+        ]
+
+
 class CountryBusinessNumber(models.Model):
     country_code = models.CharField(max_length=20, blank=True, default="")
     number_code = models.CharField(max_length=50, primary_key=True)
@@ -1204,6 +1379,10 @@ class ProcurementTender(models.Model):
         verbose_name_plural = "Тендери на закупівлю"
         ordering = ["-created_at"]
         unique_together = (("company", "number", "tour_number"),)
+        indexes = [
+            # Журнал замовника: сторінки за курсором (-updated_at, -id) в межах компанії.
+            models.Index(fields=["company", "updated_at", "id"], name="ptender_company_upd_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.pk and self.company_id and self.number is None:
@@ -1479,6 +1658,10 @@ class TenderProposalPosition(models.Model):
     )
     # Значення інших критеріїв: { "criterion_id": value (str/number/bool) }
     criterion_values = models.JSONField(default=dict, blank=True)
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Зростає з кожною зміною; запис зі застарілою версією відхиляється (409).",
+    )
 
     class Meta:
         verbose_name = "Позиція пропозиції"
@@ -1691,6 +1874,9 @@ class SalesTender(models.Model):
         verbose_name_plural = "Тендери на продаж"
         ordering = ["-created_at"]
         unique_together = (("company", "number", "tour_number"),)
+        indexes = [
+            models.Index(fields=["company", "updated_at", "id"], name="stender_company_upd_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.pk and self.company_id and self.number is None:
@@ -1930,6 +2116,10 @@ class SalesTenderProposalPosition(models.Model):
         max_digits=18, decimal_places=4, null=True, blank=True,
     )
     criterion_values = models.JSONField(default=dict, blank=True)
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Зростає з кожною зміною; запис зі застарілою версією відхиляється (409).",
+    )
 
     class Meta:
         verbose_name = "Позиція пропозиції (продаж)"
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from django.utils import timezone
+
+from .journal_summary import TENDER_TYPE_SALES
+
+PARTICIPATION_FLAGS = ("has_proposal", "is_submitted", "has_position_values", "is_winner")
+
+# Row attributes the participation lists read, keyed by state flag.
+_ROW_ATTRIBUTES = {
+    "has_proposal": "current_user_has_proposal",
+    "is_submitted": "current_user_has_submitted_proposal",
+    "has_position_values": "current_user_has_position_proposal",
+    "is_winner": "current_user_has_win",
+}
+
+
+def _participation_models(tender_type: str):
+    from .models import (
+        ProcurementTenderPosition,
+        SalesTenderPosition,
+        SalesTenderProposal,
+        SalesTenderProposalPosition,
+        TenderProposal,
+        TenderProposalPosition,
+    )
+
+    if tender_type == TENDER_TYPE_SALES:
+        return SalesTenderProposal, SalesTenderProposalPosition, SalesTenderPosition
+    return TenderProposal, TenderProposalPosition, ProcurementTenderPosition
+
+
+def _clean_ids(ids) -> list[int]:
+    return sorted({int(item) for item in ids or () if item})
+
+
+def compute_participation_states(tender_type: str, tender_ids, *, supplier_company_ids=None) -> dict:
+    """
+    Flags per ``(tender_id, supplier_company_id)`` for every proposal of
+    ``tender_ids``, read with three queries whatever the number of proposals.
+    """
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return {}
+    proposal_model, value_model, position_model = _participation_models(tender_type)
+    proposals_qs = proposal_model.objects.filter(tender_id__in=ids)
+    if supplier_company_ids is not None:
+        proposals_qs = proposals_qs.filter(supplier_company_id__in=_clean_ids(supplier_company_ids))
+    proposals = list(proposals_qs.values_list("id", "tender_id", "supplier_company_id", "submitted_at"))
+    if not proposals:
+        return {}
+    proposal_ids = [row[0] for row in proposals]
+    with_values = set(
+        value_model.objects.filter(proposal_id__in=proposal_ids).values_list("proposal_id", flat=True).distinct()
+    )
+    winners = set(
+        position_model.objects.filter(winner_proposal_id__in=proposal_ids)
+        .values_list("winner_proposal_id", flat=True)
+        .distinct()
+    )
+    return {
+        (int(tender_id), int(company_id)): {
+            "has_proposal": True,
+            "is_submitted": submitted_at is not None,
+            "has_position_values": proposal_id in with_values,
+            "is_winner": proposal_id in winners,
+        }
+        for proposal_id, tender_id, company_id, submitted_at in proposals
+    }
+
+
+def refresh_tender_participation_states(tender_type: str, tender_ids, *, supplier_company_ids=None) -> int:
+    """
+    Recompute the participation rows of ``tender_ids`` (optionally only for
+    ``supplier_company_ids``) inside the caller's transaction. Rows without a
+    proposal are dropped. Returns the number of rows written.
+    """
+    from .models import TenderParticipationState
+
+    ids = _clean_ids(tender_ids)
+    if not ids:
+        return 0
+    states = compute_participation_states(tender_type, ids, supplier_company_ids=supplier_company_ids)
+    existing_qs = TenderParticipationState.objects.filter(tender_type=tender_type, tender_id__in=ids)
+    if supplier_company_ids is not None:
+        existing_qs = existing_qs.filter(supplier_company_id__in=_clean_ids(supplier_company_ids))
+    existing = {
+        (int(row.tender_id), int(row.supplier_company_id)): row
+        for row in existing_qs.only("id", "tender_id", "supplier_company_id", *PARTICIPATION_FLAGS)
+    }
+
+    gone_pks = [row.pk for key, row in existing.items() if key not in states]
+    if gone_pks:
+        TenderParticipationState.objects.filter(pk__in=gone_pks).delete()
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for (tender_id, company_id), flags in states.items():
+        row = existing.get((tender_id, company_id))
+        if row is None:
+            to_create.append(
+                TenderParticipationState(
+                    tender_type=tender_type,
+                    tender_id=tender_id,
+                    supplier_company_id=company_id,
+                    updated_at=now,
+                    **flags,
+                )
+            )
+            continue
+        if any(getattr(row, flag) != value for flag, value in flags.items()):
+            for flag, value in flags.items():
+                setattr(row, flag, value)
+            row.updated_at = now
+            to_update.append(row)
+    if to_create:
+        TenderParticipationState.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_update:
+        TenderParticipationState.objects.bulk_update(to_update, [*PARTICIPATION_FLAGS, "updated_at"])
+    return len(to_create) + len(to_update)
+
+
+def mark_participation_position_values(tender_type: str, tender_id: int, supplier_company_id: int) -> None:
+    """
+    Price entry only ever turns ``has_position_values`` on, so the hot bid
+    path sets it with one conditional update instead of a full refresh.
+    """
+    from .models import TenderParticipationState
+
+    if not tender_id or not supplier_company_id:
+        return
+    TenderParticipationState.objects.filter(
+        tender_type=tender_type,
+        tender_id=tender_id,
+        supplier_company_id=supplier_company_id,
+        has_position_values=False,
+    ).update(has_position_values=True, updated_at=timezone.now())
+
+
+def drop_tender_participation_states(tender_type: str, tender_ids) -> None:
+    from .models import TenderParticipationState
+
+    ids = _clean_ids(tender_ids)
+    if ids:
+        TenderParticipationState.objects.filter(tender_type=tender_type, tender_id__in=ids).delete()
+
+
+def participating_tender_ids(tender_type: str, company_ids, **flags):
+    """
+    ``tender_id`` values where one of ``company_ids`` has every given flag set,
+    for ``id__in`` filters served by the company index.
+    """
+    from .models import TenderParticipationState
+
+    return TenderParticipationState.objects.filter(
+        tender_type=tender_type,
+        supplier_company_id__in=_clean_ids(company_ids),
+        **flags,
+    ).values("tender_id")
+
+
+def attach_participation_flags(rows, *, tender_type: str, company_ids) -> None:
+    """Set the ``current_user_has_*`` attributes on a page of tenders with one query."""
+    from .models import TenderParticipationState
+
+    flags_by_tender: dict[int, dict] = {}
+    tender_ids = _clean_ids(row.pk for row in rows)
+    company_ids = _clean_ids(company_ids)
+    if tender_ids and company_ids:
+        for state in TenderParticipationState.objects.filter(
+            tender_type=tender_type,
+            tender_id__in=tender_ids,
+            supplier_company_id__in=company_ids,
+        ).only("tender_id", *PARTICIPATION_FLAGS):
+            merged = flags_by_tender.setdefault(int(state.tender_id), dict.fromkeys(PARTICIPATION_FLAGS, False))
+            for flag in PARTICIPATION_FLAGS:
+                merged[flag] = merged[flag] or bool(getattr(state, flag))
+    for row in rows:
+        flags = flags_by_tender.get(int(row.pk), {})
+        for flag, attribute in _ROW_ATTRIBUTES.items():
+            setattr(row, attribute, bool(flags.get(flag, False)))
+
+
+def rebuild_participation_states(tender_type: str, *, batch_size: int = 500) -> tuple[int, int]:
+    """Refresh every tender with proposals and drop rows of tenders left without any; returns (written, removed)."""
+    from .models import TenderParticipationState
+
+    proposal_model, _, _ = _participation_models(tender_type)
+    written = 0
+    last_id = 0
+    while True:
+        ids = list(
+            proposal_model.objects.filter(tender_id__gt=last_id)
+            .order_by("tender_id")
+            .values_list("tender_id", flat=True)
+            .distinct()[:batch_size]
+        )
+        if not ids:
+            break
+        written += refresh_tender_participation_states(tender_type, ids)
+        last_id = ids[-1]
+    removed, _ = (
+        TenderParticipationState.objects.filter(tender_type=tender_type)
+        .exclude(tender_id__in=proposal_model.objects.values("tender_id"))
+        .delete()
+    )
+    return written, removed
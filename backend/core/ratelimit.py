@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger("core.ratelimit")
+
+RATE_LIMIT_BACKEND_LOCAL = "local"
+RATE_LIMIT_BACKEND_CACHE = "cache"
+RATE_LIMIT_BACKEND_DB = "db"
+
+_stores_lock = threading.Lock()
+_stores: dict[tuple[str, str], object] = {}
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+
+
+class LocalTokenBucketStore:
+    """
+    Per-process token buckets behind one lock (atomic inside the worker).
+    Buckets are evicted LRU beyond ``max_keys``; with several workers every
+    process enforces its own budget, so use ``cache`` or ``db`` there.
+    """
+
+    def __init__(self, *, max_keys: int = 50000):
+        self.max_keys = max(1, int(max_keys))
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, *, limit: int, period: float, cost: int = 1) -> RateLimitDecision:
+        rate = limit / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return _token_bucket_decision(allowed, tokens, limit=limit, rate=rate, cost=cost)
+
+
+class DatabaseTokenBucketStore:
+    """
+    Token buckets in ``RateLimitBucket`` rows, updated under ``select_for_update``,
+    so every worker shares one budget without a Redis deployment.
+    """
+
+    prune_every = 1000
+
+    def __init__(self):
+        self._calls = 0
+        self._calls_lock = threading.Lock()
+
+    def consume(self, key: str, *, limit: int, period: float, cost: int = 1) -> RateLimitDecision:
+        from django.db import transaction
+
+        from .models import RateLimitBucket
+
+        rate = limit / period
+        now = time.time()
+        with transaction.atomic():
+            RateLimitBucket.objects.get_or_create(
+                key=key, defaults={"tokens": float(limit), "updated_at": now}
+            )
+            bucket = RateLimitBucket.objects.select_for_update().get(key=key)
+            tokens = min(float(limit), bucket.tokens + max(0.0, now - bucket.updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            bucket.tokens = tokens
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+        self._maybe_prune(now, period)
+        return _token_bucket_decision(allowed, tokens, limit=limit, rate=rate, cost=cost)
+
+    def _maybe_prune(self, now: float, period: float) -> None:
+        with self._calls_lock:
+            self._calls += 1
+            if self._calls % self.prune_every:
+                return
+        from .models import RateLimitBucket
+
+        # A bucket idle for a full period is refilled anyway; dropping it changes nothing.
+        RateLimitBucket.objects.filter(updated_at__lt=now - max(period, 3600.0)).delete()
+
+
+class CacheSlidingWindowStore:
+    """
+    Sliding-window counter on a shared Django cache (Redis in production).
+
+    Only atomic ``add``/``incr``/``decr`` are used: the request count of the
+    current window is incremented, the previous window is weighted by its
+    remaining overlap, and a rejected request gives its increment back. This
+    avoids the double burst of fixed minute buckets at window boundaries.
+    """
+
+    key_prefix = "ratelimit-v1"
+
+    def __init__(self, cache_alias: str = "default"):
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def consume(self, key: str, *, limit: int, period: float, cost: int = 1) -> RateLimitDecision:
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f"{self.key_prefix}:{key}:{window}"
+        ttl = int(math.ceil(period * 2)) + 1
+        self.cache.add(current_key, 0, ttl)
+        try:
+            current = int(self.cache.incr(current_key, cost))
+        except ValueError:
+            # The counter expired between add and incr.
+            self.cache.add(current_key, 0, ttl)
+            current = int(self.cache.incr(current_key, cost))
+        previous = int(self.cache.get(f"{self.key_prefix}:{key}:{window - 1}") or 0)
+        weighted = previous * (1.0 - elapsed / period) + current
+        if weighted <= limit:
+            return RateLimitDecision(True, limit, max(0, int(limit - weighted)), 0)
+        try:
+            self.cache.decr(current_key, cost)
+        except ValueError:
+            pass
+        if previous > 0:
+            # Time until enough of the previous window slides out.
+            overflow = weighted - limit
+            retry_after = min(period - elapsed, overflow * period / previous)
+        else:
+            retry_after = period - elapsed
+        return RateLimitDecision(False, limit, 0, max(1, int(math.ceil(retry_after))))
+
+
+def _token_bucket_decision(allowed: bool, tokens: float, *, limit: int, rate: float, cost: int) -> RateLimitDecision:
+    retry_after = 0 if allowed else max(1, int(math.ceil((cost - tokens) / rate)))
+    return RateLimitDecision(allowed, limit, max(0, int(tokens)), retry_after)
+
+
+def _rate_limit_backend() -> str:
+    return str(
+        getattr(settings, "RATE_LIMIT_BACKEND", RATE_LIMIT_BACKEND_LOCAL) or RATE_LIMIT_BACKEND_LOCAL
+    ).strip().lower()
+
+
+def get_rate_limit_store():
+    backend = _rate_limit_backend()
+    cache_alias = str(getattr(settings, "RATE_LIMIT_CACHE", "default") or "default")
+    registry_key = (backend, cache_alias if backend == RATE_LIMIT_BACKEND_CACHE else "")
+    with _stores_lock:
+        store = _stores.get(registry_key)
+        if store is None:
+            if backend == RATE_LIMIT_BACKEND_CACHE:
+                store = CacheSlidingWindowStore(cache_alias=cache_alias)
+            elif backend == RATE_LIMIT_BACKEND_DB:
+                store = DatabaseTokenBucketStore()
+            else:
+                store = LocalTokenBucketStore()
+            _stores[registry_key] = store
+    return store
+
+
+def consume_rate_limit(key: str, *, limit: int, period: float = 60.0, cost: int = 1) -> RateLimitDecision | None:
+    """
+    Spend ``cost`` from the ``limit``-per-``period`` budget of ``key``.
+    Returns ``None`` when the limit is disabled (``limit <= 0``); a store outage
+    fails open, because throttling must not take the endpoint down with it.
+    """
+    if limit <= 0:
+        return None
+    try:
+        return get_rate_limit_store().consume(key, limit=int(limit), period=float(period), cost=int(cost))
+    except Exception:
+        logger.exception("rate limit store unavailable")
+        return None
+
+
+async def aconsume_rate_limit(
+    key: str, *, limit: int, period: float = 60.0, cost: int = 1
+) -> RateLimitDecision | None:
+    """:func:`consume_rate_limit` for async views; only the local store runs inline."""
+    if limit <= 0:
+        return None
+    try:
+        store = get_rate_limit_store()
+        if isinstance(store, LocalTokenBucketStore):
+            return store.consume(key, limit=int(limit), period=float(period), cost=int(cost))
+        return await sync_to_async(store.consume)(key, limit=int(limit), period=float(period), cost=int(cost))
+    except Exception:
+        logger.exception("rate limit store unavailable")
+        return None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle on top of :func:`consume_rate_limit` for other hot endpoints.
+    Subclasses set ``scope``; the budget comes from
+    ``settings.RATE_LIMIT_THROTTLE_RATES[scope]`` (requests per ``period`` seconds).
+    """
+
+    scope = ""
+    period = 60.0
+
+    def get_limit(self) -> int:
+        rates = getattr(settings, "RATE_LIMIT_THROTTLE_RATES", {}) or {}
+        return int(rates.get(self.scope) or 0)
+
+    def get_ident(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{super().get_ident(request)}"
+
+    def allow_request(self, request, view):
+        decision = consume_rate_limit(
+            f"throttle:{self.scope}:{self.get_ident(request)}",
+            limit=self.get_limit(),
+            period=self.period,
+        )
+        self._retry_after = decision.retry_after if decision else None
+        return decision is None or decision.allowed
+
+    def wait(self):
+        return self._retry_after
+
+
+class BidSubmitThrottle(TokenBucketThrottle):
+    """Bid submissions (``proposals/<id>/position-values``) per user."""
+
+    scope = "bid"
@@ -1,63 +1,910 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
+import logging
 import threading
-from typing import Any
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.core.cache import caches
 from django.utils import timezone
 
+from .io_steps import IO, Steps, arun_steps, run_steps
+
 try:
     from channels.layers import get_channel_layer
 except Exception:  # pragma: no cover - optional dependency in local environments
     get_channel_layer = None
 
-_proposal_event_lock = threading.Lock()
-_proposal_event_buffers: dict[str, dict[str, Any]] = {}
+logger = logging.getLogger("core.realtime")
+
+COALESCE_BACKEND_LOCAL = "local"
+COALESCE_BACKEND_CACHE = "cache"
+
+AUCTION_LEADERBOARD_EVENT = "leaderboard.updated"
+
+EVENT_LOG_BACKEND_MEMORY = "memory"
+EVENT_LOG_BACKEND_DB = "db"
+
+_coalescers_lock = threading.Lock()
+_coalescers: dict[tuple[str, str], Any] = {}
+_event_logs_lock = threading.Lock()
+_event_logs: dict[tuple[str, int], Any] = {}
+_outbound_senders_lock = threading.Lock()
+_outbound_senders: dict[tuple[int, int, str], Any] = {}
+_event_waiters_lock = threading.Lock()
+_event_waiters: dict[tuple[str, int], set[tuple[Any, Any]]] = {}
+_coalesce_metrics_lock = threading.Lock()
+_coalesce_metrics: dict[str, float] = {
+    "buffers_flushed": 0,
+    "ids_merged": 0,
+    "flush_lag_samples": 0,
+    "flush_lag_ms_total": 0.0,
+    "flush_lag_ms_max": 0.0,
+}
 
 
 def tender_group_name(kind: str, tender_id: int) -> str:
     return f"tender_rt_{kind}_{tender_id}"
 
 
-def _send_tender_event(kind: str, tender_id: int, event: str, payload: dict[str, Any]) -> None:
+def _build_tender_event_message(event: str, payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "type": "tender.event",
+        "event": event,
+        "payload": payload,
+        "sent_at": timezone.now().isoformat(),
+    }
+
+
+def _deliver_tender_event(kind: str, tender_id: int, message: dict[str, Any]) -> bool:
     try:
         if get_channel_layer is None:
-            return
+            return False
         channel_layer = get_channel_layer()
         if channel_layer is None:
-            return
-        async_to_sync(channel_layer.group_send)(
-            tender_group_name(kind, tender_id),
-            {
-                "type": "tender.event",
-                "event": event,
-                "payload": payload,
-                "sent_at": timezone.now().isoformat(),
-            },
-        )
+            return False
+        async_to_sync(channel_layer.group_send)(tender_group_name(kind, tender_id), message)
+        return True
     except Exception:
         # Realtime delivery must not break tender bidding flow.
-        return
+        return False
+
+
+def _merge_unique_ids(current: Any, incoming: Any) -> list[Any]:
+    merged = list(current or [])
+    seen = set(merged)
+    for value in incoming or []:
+        if value not in seen:
+            seen.add(value)
+            merged.append(value)
+    return merged
+
+
+def _merge_deltas(current: Any, incoming: Any) -> list[dict[str, Any]]:
+    """
+    Merge per-proposal delta rows (see ``deltas`` in proposal events): later
+    values win, position values are merged by ``tender_position_id``.
+    """
+    merged: dict[Any, dict[str, Any]] = {}
+    for delta in [*(current or []), *(incoming or [])]:
+        if not isinstance(delta, dict):
+            continue
+        proposal_id = delta.get("proposal_id")
+        existing = merged.get(proposal_id)
+        if existing is None:
+            merged[proposal_id] = dict(delta)
+            continue
+        for key, value in delta.items():
+            if key == "position_values":
+                rows = {
+                    row.get("tender_position_id"): row
+                    for row in existing.get("position_values") or []
+                }
+                for row in value or []:
+                    rows[row.get("tender_position_id")] = row
+                existing["position_values"] = list(rows.values())
+            else:
+                existing[key] = value
+    return list(merged.values())
+
+
+def _merge_event_payloads(current: dict[str, Any], incoming: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(current or {})
+    incoming = incoming or {}
+    current_ids = merged.get("proposal_ids") or (
+        [merged["proposal_id"]] if merged.get("proposal_id") else []
+    )
+    incoming_ids = incoming.get("proposal_ids") or (
+        [incoming["proposal_id"]] if incoming.get("proposal_id") else []
+    )
+    proposal_ids = _merge_unique_ids(current_ids, incoming_ids)
+    if proposal_ids:
+        merged["proposal_ids"] = proposal_ids
+        merged["proposal_id"] = proposal_ids[0]
+    if "position_ids" in merged or "position_ids" in incoming:
+        merged["position_ids"] = sorted(
+            _merge_unique_ids(merged.get("position_ids"), incoming.get("position_ids"))
+        )
+    if "deltas" in merged or "deltas" in incoming:
+        merged["deltas"] = _merge_deltas(merged.get("deltas"), incoming.get("deltas"))
+    if len(proposal_ids) > 1:
+        merged.pop("submitted_at", None)
+    for key, value in incoming.items():
+        merged.setdefault(key, value)
+    return merged
+
+
+def _merge_leaderboard_payloads(current: dict[str, Any], incoming: dict[str, Any]) -> dict[str, Any]:
+    """Merge ``leaderboard.updated`` payloads: the latest row per position wins."""
+    merged = dict(current or {})
+    rows = {row.get("position_id"): row for row in merged.get("positions") or []}
+    for row in (incoming or {}).get("positions") or []:
+        rows[row.get("position_id")] = row
+    merged["positions"] = [rows[key] for key in sorted(rows, key=lambda value: (value is None, value))]
+    return merged
+
+
+def _merge_payloads_for_event(event: str, current: dict[str, Any], incoming: dict[str, Any]) -> dict[str, Any]:
+    if event == AUCTION_LEADERBOARD_EVENT:
+        return _merge_leaderboard_payloads(current, incoming)
+    return _merge_event_payloads(current, incoming)
+
+
+class OutboundEventSender:
+    """
+    Bounded in-process queue plus a small pool of sender threads in front of
+    ``channel_layer.group_send``, so a slow channel layer never blocks the
+    request thread that published the event.
+
+    Messages are sharded by ``(kind, tender_id)`` to a fixed worker, so events
+    of one tender leave in seq order even with several workers.
+
+    When the queue is full the overflow policy applies:
+    ``drop_oldest`` discards the oldest queued message; ``merge`` folds the new
+    message into a queued one for the same tender and event (falling back to
+    ``drop_oldest`` when there is nothing to merge with). Messages that carry a
+    ``seq`` are never discarded: they are folded with their seq listed in
+    ``merged_seqs`` (as the consumer outbox does) or queued past the limit.
+    """
+
+    OVERFLOW_DROP_OLDEST = "drop_oldest"
+    OVERFLOW_MERGE = "merge"
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1000,
+        workers: int = 2,
+        overflow_policy: str = OVERFLOW_MERGE,
+        deliver: Callable[[str, int, dict[str, Any]], bool] | None = None,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.workers = max(0, int(workers))
+        self.overflow_policy = (
+            overflow_policy
+            if overflow_policy in {self.OVERFLOW_DROP_OLDEST, self.OVERFLOW_MERGE}
+            else self.OVERFLOW_MERGE
+        )
+        self._deliver = deliver or _deliver_tender_event
+        self._cond = threading.Condition()
+        self._queues: list[deque[dict[str, Any]]] = [deque() for _ in range(max(1, self.workers))]
+        self._size = 0
+        self._in_flight = 0
+        self._threads: dict[int, threading.Thread] = {}
+        self._metrics: dict[str, float] = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "dropped": 0,
+            "merged": 0,
+            "overflowed": 0,
+            "max_depth": 0,
+            "send_latency_samples": 0,
+            "send_latency_ms_total": 0.0,
+            "send_latency_ms_max": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _ensure_workers(self) -> None:
+        for index in range(self.workers):
+            thread = self._threads.get(index)
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(
+                target=self._run,
+                args=(index,),
+                name=f"realtime-sender-{index + 1}",
+                daemon=True,
+            )
+            self._threads[index] = thread
+            thread.start()
+
+    def _shard(self, kind: str, tender_id: int) -> deque[dict[str, Any]]:
+        return self._queues[hash((kind, int(tender_id))) % len(self._queues)]
+
+    def _merge_into_queued(self, item: dict[str, Any]) -> bool:
+        # Same tender means same shard, so only that queue can hold a match.
+        for queued in reversed(self._shard(item["kind"], item["tender_id"])):
+            if (
+                queued["kind"] == item["kind"]
+                and queued["tender_id"] == item["tender_id"]
+                and queued["message"].get("event") == item["message"].get("event")
+            ):
+                queued_message = queued["message"]
+                incoming = item["message"]
+                queued_message["payload"] = _merge_payloads_for_event(
+                    str(incoming.get("event") or ""),
+                    queued_message.get("payload") or {},
+                    incoming.get("payload") or {},
+                )
+                incoming_seqs = incoming.get("merged_seqs") or (
+                    [incoming["seq"]] if incoming.get("seq") is not None else []
+                )
+                if incoming_seqs:
+                    merged_seqs = queued_message.get("merged_seqs") or (
+                        [queued_message["seq"]] if queued_message.get("seq") is not None else []
+                    )
+                    merged_seqs = sorted(set(merged_seqs) | set(incoming_seqs))
+                    queued_message["merged_seqs"] = merged_seqs
+                    queued_message["seq"] = merged_seqs[-1]
+                return True
+        return False
+
+    def _drop_oldest_unsequenced(self) -> bool:
+        oldest = None
+        for queue in self._queues:
+            for queued in queue:
+                if queued["message"].get("seq") is None:
+                    if oldest is None or queued["enqueued_at"] < oldest[1]["enqueued_at"]:
+                        oldest = (queue, queued)
+                    break
+        if oldest is None:
+            return False
+        oldest[0].remove(oldest[1])
+        self._size -= 1
+        return True
+
+    def _make_room(self, item: dict[str, Any]) -> bool:
+        """Apply the overflow policy; ``False`` means ``item`` was merged and must not be queued."""
+        sequenced = item["message"].get("seq") is not None
+        if (self.overflow_policy == self.OVERFLOW_MERGE or sequenced) and self._merge_into_queued(item):
+            self._metrics["merged"] += 1
+            return False
+        if self._drop_oldest_unsequenced():
+            self._metrics["dropped"] += 1
+            return True
+        if not sequenced:
+            self._metrics["dropped"] += 1
+            return False
+        self._metrics["overflowed"] += 1
+        return True
+
+    def submit(self, kind: str, tender_id: int, message: dict[str, Any]) -> bool:
+        if not self.enabled:
+            return False
+        item = {
+            "kind": kind,
+            "tender_id": int(tender_id),
+            "message": message,
+            "enqueued_at": time.monotonic(),
+        }
+        with self._cond:
+            self._metrics["enqueued"] += 1
+            if self._size >= self.max_size and not self._make_room(item):
+                return True
+            self._shard(kind, tender_id).append(item)
+            self._size += 1
+            self._metrics["max_depth"] = max(self._metrics["max_depth"], self._size)
+            self._ensure_workers()
+            self._cond.notify_all()
+        return True
+
+    def _run(self, index: int = 0) -> None:
+        queue = self._queues[index]
+        while True:
+            with self._cond:
+                while not queue:
+                    self._cond.wait()
+                item = queue.popleft()
+                self._size -= 1
+                self._in_flight += 1
+            delivered = False
+            try:
+                delivered = bool(self._deliver(item["kind"], item["tender_id"], item["message"]))
+            except Exception:
+                logger.exception("realtime outbound send failed")
+            latency_ms = (time.monotonic() - item["enqueued_at"]) * 1000.0
+            with self._cond:
+                self._in_flight -= 1
+                self._metrics["sent" if delivered else "failed"] += 1
+                self._metrics["send_latency_samples"] += 1
+                self._metrics["send_latency_ms_total"] += latency_ms
+                self._metrics["send_latency_ms_max"] = max(
+                    self._metrics["send_latency_ms_max"], latency_ms
+                )
+                self._cond.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._size or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def metrics(self) -> dict[str, float]:
+        with self._cond:
+            snapshot = dict(self._metrics)
+            snapshot["depth"] = self._size
+            snapshot["in_flight"] = self._in_flight
+        samples = int(snapshot["send_latency_samples"] or 0)
+        snapshot["send_latency_ms_avg"] = (
+            snapshot["send_latency_ms_total"] / samples if samples else 0.0
+        )
+        return snapshot
+
+
+def get_outbound_sender() -> OutboundEventSender:
+    config = (
+        int(getattr(settings, "REALTIME_OUTBOUND_QUEUE_SIZE", 1000) or 1000),
+        int(getattr(settings, "REALTIME_OUTBOUND_WORKERS", 2) or 0),
+        str(
+            getattr(settings, "REALTIME_OUTBOUND_OVERFLOW", OutboundEventSender.OVERFLOW_MERGE)
+            or OutboundEventSender.OVERFLOW_MERGE
+        ).strip().lower(),
+    )
+    with _outbound_senders_lock:
+        sender = _outbound_senders.get(config)
+        if sender is None:
+            sender = OutboundEventSender(
+                max_size=config[0],
+                workers=config[1],
+                overflow_policy=config[2],
+            )
+            _outbound_senders[config] = sender
+    return sender
+
+
+def get_outbound_metrics() -> dict[str, float]:
+    return get_outbound_sender().metrics()
+
+
+class InMemoryTenderEventLog:
+    """
+    Per-process sequence counters and bounded replay buffers per tender group.
+    Streams are evicted LRU beyond ``max_streams``; with several workers the
+    sequence is only consistent inside one process, so use the ``db`` log there.
+    """
+
+    def __init__(self, *, max_events: int = 200, max_streams: int = 2000):
+        self.max_events = max(1, int(max_events))
+        self.max_streams = max(1, int(max_streams))
+        self._lock = threading.Lock()
+        self._streams: OrderedDict[tuple[str, int], dict[str, Any]] = OrderedDict()
+
+    def append(self, kind: str, tender_id: int, message: dict[str, Any]) -> int:
+        key = (kind, int(tender_id))
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = {"seq": 0, "events": deque(maxlen=self.max_events)}
+                self._streams[key] = stream
+                while len(self._streams) > self.max_streams:
+                    self._streams.popitem(last=False)
+            else:
+                self._streams.move_to_end(key)
+            stream["seq"] += 1
+            seq = int(stream["seq"])
+            stream["events"].append(
+                {
+                    "seq": seq,
+                    "event": message.get("event"),
+                    "payload": message.get("payload") or {},
+                    "sent_at": message.get("sent_at"),
+                }
+            )
+        return seq
 
+    def current_seq(self, kind: str, tender_id: int) -> int:
+        with self._lock:
+            stream = self._streams.get((kind, int(tender_id)))
+            return int(stream["seq"]) if stream else 0
 
-def _flush_coalesced_proposal_event(buffer_key: str) -> None:
-    with _proposal_event_lock:
-        buffer = _proposal_event_buffers.pop(buffer_key, None)
-    if not buffer:
+    def replay(self, kind: str, tender_id: int, since_seq: int) -> tuple[list[dict[str, Any]], bool]:
+        with self._lock:
+            stream = self._streams.get((kind, int(tender_id)))
+            current = int(stream["seq"]) if stream else 0
+            events = list(stream["events"]) if stream else []
+        return _select_replay_events(events, current, since_seq)
+
+
+class DatabaseTenderEventLog:
+    """
+    Outbox-backed log: sequence counters live in ``TenderRealtimeStream`` and
+    events in ``TenderRealtimeEvent``, so every worker shares one sequence and
+    a reconnecting client can be served by any process.
+    """
+
+    prune_every = 50
+
+    def __init__(self, *, max_events: int = 200):
+        self.max_events = max(1, int(max_events))
+
+    def append(self, kind: str, tender_id: int, message: dict[str, Any]) -> int:
+        from django.db import transaction
+
+        from .models import TenderRealtimeEvent, TenderRealtimeStream
+
+        with transaction.atomic():
+            TenderRealtimeStream.objects.get_or_create(tender_type=kind, tender_id=int(tender_id))
+            stream = TenderRealtimeStream.objects.select_for_update().get(
+                tender_type=kind, tender_id=int(tender_id)
+            )
+            seq = int(stream.last_seq) + 1
+            stream.last_seq = seq
+            stream.save(update_fields=["last_seq"])
+            TenderRealtimeEvent.objects.create(
+                tender_type=kind,
+                tender_id=int(tender_id),
+                seq=seq,
+                event=str(message.get("event") or "")[:64],
+                payload=message.get("payload") or {},
+                sent_at=str(message.get("sent_at") or "")[:40],
+            )
+            if seq % self.prune_every == 0:
+                TenderRealtimeEvent.objects.filter(
+                    tender_type=kind,
+                    tender_id=int(tender_id),
+                    seq__lte=seq - self.max_events,
+                ).delete()
+        return seq
+
+    def current_seq(self, kind: str, tender_id: int) -> int:
+        from .models import TenderRealtimeStream
+
+        value = (
+            TenderRealtimeStream.objects.filter(tender_type=kind, tender_id=int(tender_id))
+            .values_list("last_seq", flat=True)
+            .first()
+        )
+        return int(value or 0)
+
+    def replay(self, kind: str, tender_id: int, since_seq: int) -> tuple[list[dict[str, Any]], bool]:
+        from .models import TenderRealtimeEvent
+
+        current = self.current_seq(kind, tender_id)
+        if since_seq >= current:
+            return [], since_seq > current
+        rows = list(
+            TenderRealtimeEvent.objects.filter(
+                tender_type=kind,
+                tender_id=int(tender_id),
+                seq__gt=max(0, current - self.max_events),
+            )
+            .order_by("seq")
+            .values("seq", "event", "payload", "sent_at")
+        )
+        return _select_replay_events(rows, current, since_seq)
+
+
+def _select_replay_events(
+    events: list[dict[str, Any]],
+    current_seq: int,
+    since_seq: int,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Return ``(missed_events, resync_required)`` for a client that saw ``since_seq``."""
+    if since_seq == current_seq:
+        return [], False
+    if since_seq > current_seq:
+        # The stream was reset (restart/eviction): the client's position is unknown.
+        return [], True
+    missed = [event for event in events if int(event["seq"]) > since_seq]
+    if not missed or int(missed[0]["seq"]) != since_seq + 1:
+        return [], True
+    return missed, False
+
+
+def get_tender_event_log():
+    backend = str(
+        getattr(settings, "REALTIME_EVENT_LOG_BACKEND", EVENT_LOG_BACKEND_MEMORY) or ""
+    ).strip().lower()
+    if backend not in {EVENT_LOG_BACKEND_MEMORY, EVENT_LOG_BACKEND_DB}:
+        return None
+    max_events = int(getattr(settings, "REALTIME_EVENT_LOG_SIZE", 200) or 200)
+    registry_key = (backend, max_events)
+    with _event_logs_lock:
+        event_log = _event_logs.get(registry_key)
+        if event_log is None:
+            if backend == EVENT_LOG_BACKEND_DB:
+                event_log = DatabaseTenderEventLog(max_events=max_events)
+            else:
+                event_log = InMemoryTenderEventLog(max_events=max_events)
+            _event_logs[registry_key] = event_log
+    return event_log
+
+
+def _sequence_tender_event(kind: str, tender_id: int, message: dict[str, Any]) -> None:
+    event_log = get_tender_event_log()
+    if event_log is None:
         return
-    proposal_ids = list(buffer.get("proposal_ids") or [])
-    payload = dict(buffer.get("payload") or {})
+    try:
+        message["seq"] = event_log.append(kind, int(tender_id), message)
+    except Exception:
+        logger.exception("realtime event log append failed")
+
+
+def _send_tender_event(kind: str, tender_id: int, event: str, payload: dict[str, Any]) -> None:
+    message = _build_tender_event_message(event, payload)
+    # Multiplexed user sockets receive several tenders' groups on one channel.
+    message["kind"] = kind
+    message["tender_id"] = int(tender_id)
+    _sequence_tender_event(kind, tender_id, message)
+    try:
+        if get_outbound_sender().submit(kind, tender_id, message):
+            return
+    except Exception:
+        logger.exception("realtime outbound queue unavailable")
+    _deliver_tender_event(kind, tender_id, message)
+
+
+def _build_coalesced_payload(payload: dict[str, Any], proposal_ids: list[int]) -> dict[str, Any]:
+    merged = dict(payload or {})
     if proposal_ids:
-        payload["proposal_ids"] = proposal_ids
-        payload["proposal_id"] = proposal_ids[0]
-        payload.pop("submitted_at", None)
-    _send_tender_event(
-        kind=str(buffer.get("kind") or ""),
-        tender_id=int(buffer.get("tender_id") or 0),
-        event=str(buffer.get("event") or ""),
-        payload=payload,
+        merged["proposal_ids"] = proposal_ids
+        merged["proposal_id"] = proposal_ids[0]
+        merged.pop("submitted_at", None)
+    return merged
+
+
+def _coalesce_window_ms() -> int:
+    return int(getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_MS", 0) or 0)
+
+
+def _coalesce_max_ids() -> int:
+    return max(
+        1, int(getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_MAX_IDS", 300) or 300)
+    )
+
+
+def _record_coalesce_metric(name: str, value: float = 1) -> None:
+    with _coalesce_metrics_lock:
+        _coalesce_metrics[name] = _coalesce_metrics.get(name, 0) + value
+
+
+def _record_flush_lag(lag_ms: float) -> None:
+    with _coalesce_metrics_lock:
+        _coalesce_metrics["flush_lag_samples"] += 1
+        _coalesce_metrics["flush_lag_ms_total"] += lag_ms
+        _coalesce_metrics["flush_lag_ms_max"] = max(_coalesce_metrics["flush_lag_ms_max"], lag_ms)
+
+
+def get_coalesce_metrics() -> dict[str, float]:
+    with _coalesce_metrics_lock:
+        snapshot = dict(_coalesce_metrics)
+    samples = int(snapshot.get("flush_lag_samples") or 0)
+    snapshot["flush_lag_ms_avg"] = (
+        snapshot["flush_lag_ms_total"] / samples if samples else 0.0
     )
+    snapshot["pending_flushes"] = _deadline_flusher.pending()
+    return snapshot
+
+
+def reset_coalesce_metrics() -> None:
+    with _coalesce_metrics_lock:
+        for name in _coalesce_metrics:
+            _coalesce_metrics[name] = 0
+
+
+class DeadlineFlusher:
+    """
+    Single long-lived daemon thread that runs coalescing flushes from a deadline
+    heap, instead of starting one ``threading.Timer`` thread per buffer.
+    Cancellation is lazy: a flush callback that finds nothing to send is a no-op
+    and returns a falsy value, so it is not counted in the flush-lag metrics.
+    """
+
+    def __init__(self, name: str = "realtime-coalesce-flusher"):
+        self._name = name
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, Callable[..., Any], tuple[Any, ...]]] = []
+        self._counter = itertools.count()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, delay_s: float, callback: Callable[..., Any], *args: Any) -> None:
+        deadline = time.monotonic() + max(0.0, float(delay_s))
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._counter), callback, args))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _next_due(self):
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait_s = self._heap[0][0] - time.monotonic()
+                if wait_s <= 0:
+                    return heapq.heappop(self._heap)
+                self._cond.wait(wait_s)
+
+    def _run(self) -> None:
+        while True:
+            deadline, _, callback, args = self._next_due()
+            lag_ms = max(0.0, (time.monotonic() - deadline) * 1000.0)
+            try:
+                flushed = callback(*args)
+            except Exception:
+                logger.exception("realtime coalesce flush failed")
+                continue
+            if flushed:
+                _record_flush_lag(lag_ms)
+
+
+_deadline_flusher = DeadlineFlusher()
+
+
+class LocalProposalEventCoalescer:
+    """
+    Per-process coalescer: merges proposal ids only inside the current worker.
+    Used for single-process deployments and as the stand-in for tests.
+    """
+
+    def __init__(self, flusher: DeadlineFlusher | None = None):
+        self._lock = threading.Lock()
+        self._buffers: dict[str, dict[str, Any]] = {}
+        self._tokens = itertools.count(1)
+        self._flusher = flusher or _deadline_flusher
+
+    def flush(self, buffer_key: str, token: int | None = None) -> bool:
+        with self._lock:
+            buffer = self._buffers.get(buffer_key)
+            if not buffer or (token is not None and buffer.get("token") != token):
+                return False
+            self._buffers.pop(buffer_key, None)
+        _record_coalesce_metric("buffers_flushed")
+        _send_tender_event(
+            kind=str(buffer.get("kind") or ""),
+            tender_id=int(buffer.get("tender_id") or 0),
+            event=str(buffer.get("event") or ""),
+            payload=_build_coalesced_payload(
+                buffer.get("payload") or {},
+                list(buffer.get("proposal_ids") or []),
+            ),
+        )
+        return True
+
+    def queue(
+        self,
+        kind: str,
+        tender_id: int,
+        event: str,
+        proposal_id: int,
+        payload: dict[str, Any],
+        *,
+        window_ms: int,
+        max_ids: int,
+    ) -> None:
+        buffer_key = f"{kind}:{tender_id}:{event}"
+        should_flush_now = False
+        with self._lock:
+            buffer = self._buffers.get(buffer_key)
+            if buffer is None:
+                token = next(self._tokens)
+                self._buffers[buffer_key] = {
+                    "kind": kind,
+                    "tender_id": int(tender_id),
+                    "event": event,
+                    "payload": dict(payload),
+                    "proposal_ids": [proposal_id],
+                    "proposal_ids_set": {proposal_id},
+                    "token": token,
+                }
+                self._flusher.schedule(max(0.01, window_ms / 1000.0), self.flush, buffer_key, token)
+                return
+            _record_coalesce_metric("ids_merged")
+            buffer["payload"] = _merge_event_payloads(buffer["payload"], payload)
+            proposal_ids_set = buffer.get("proposal_ids_set")
+            if proposal_id not in proposal_ids_set:
+                proposal_ids_set.add(proposal_id)
+                buffer["proposal_ids"].append(proposal_id)
+            if len(buffer["proposal_ids"]) >= max_ids:
+                token = buffer.get("token")
+                should_flush_now = True
+        if should_flush_now:
+            self.flush(buffer_key, token)
+
+
+class SharedProposalEventCoalescer:
+    """
+    Cross-process coalescer on top of a shared Django cache (Redis in production).
+
+    Every worker appends proposal ids into the same per ``(kind, tender, event)``
+    buffer, so one window produces one group_send regardless of worker count.
+    Only atomic cache primitives are used (``add``/``incr``/``get_many``):
+
+    * the buffer lives under a generation number; the worker that opens a
+      generation (first ``incr`` of its counter) schedules the window flush;
+    * the flush deadline is stored next to the buffer (first ``add`` wins), so
+      when the opener died before flushing, any later appender that sees the
+      deadline passed claims the flush itself;
+    * every append stores its payload in its own slot (``incr(<gen>:p)``) and
+      the flush merges them in order, so position ids and deltas are kept;
+    * an ``add(<gen>:id:<proposal_id>)`` marker de-duplicates ids, so
+      ``max_ids`` counts distinct proposals like the local coalescer;
+    * a flush claims the generation with ``add(<gen>:flushed)`` and bumps the
+      stream generation, so exactly one worker sends it;
+    * an appender re-checks the ``flushed`` marker after writing its slot and
+      retries in the next generation when it lost the race, so ids are never
+      dropped (at worst delivered twice, which clients treat idempotently).
+    """
+
+    key_prefix = "rt-coalesce-v1"
+    max_append_attempts = 3
+
+    def __init__(self, cache_alias: str = "default", flusher: DeadlineFlusher | None = None):
+        self.cache_alias = cache_alias
+        self._flusher = flusher or _deadline_flusher
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _stream_key(self, kind: str, tender_id: int, event: str) -> str:
+        return f"{self.key_prefix}:{kind}:{int(tender_id)}:{event}"
+
+    @staticmethod
+    def _buffer_ttl(window_ms: int) -> int:
+        return max(5, int(window_ms * 4 / 1000) + 5)
+
+    def _current_generation(self, stream_key: str) -> int:
+        gen_key = f"{stream_key}:gen"
+        self.cache.add(gen_key, 0, 3600)
+        try:
+            return int(self.cache.get(gen_key) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _advance_generation(self, stream_key: str) -> None:
+        gen_key = f"{stream_key}:gen"
+        try:
+            self.cache.incr(gen_key)
+        except ValueError:
+            self.cache.add(gen_key, 1, 3600)
+
+    def _schedule_flush(self, stream_key: str, generation: int, meta: dict[str, Any], window_ms: int) -> None:
+        self._flusher.schedule(max(0.01, window_ms / 1000.0), self.flush, stream_key, generation, meta)
+
+    def _flush_overdue(self, buffer_key: str) -> bool:
+        try:
+            deadline = float(self.cache.get(f"{buffer_key}:deadline"))
+        except (TypeError, ValueError):
+            return False
+        return time.time() >= deadline
+
+    def flush(self, stream_key: str, generation: int, meta: dict[str, Any]) -> bool:
+        buffer_key = f"{stream_key}:{generation}"
+        ttl = self._buffer_ttl(int(meta.get("window_ms") or 0))
+        if not self.cache.add(f"{buffer_key}:flushed", 1, ttl):
+            return False
+        self._advance_generation(stream_key)
+        try:
+            count = int(self.cache.get(f"{buffer_key}:p") or 0)
+        except (TypeError, ValueError):
+            count = 0
+        slot_keys = [f"{buffer_key}:p:{seq}" for seq in range(1, count + 1)]
+        slots = self.cache.get_many(slot_keys) if slot_keys else {}
+        payload: dict[str, Any] = {}
+        proposal_ids: list[int] = []
+        for slot_key in slot_keys:
+            slot_payload = slots.get(slot_key)
+            if not slot_payload:
+                continue
+            payload = _merge_event_payloads(payload, slot_payload)
+            proposal_ids = _merge_unique_ids(proposal_ids, [slot_payload.get("proposal_id")])
+        proposal_ids = [proposal_id for proposal_id in proposal_ids if proposal_id]
+        self.cache.delete_many(
+            [
+                f"{buffer_key}:n",
+                f"{buffer_key}:p",
+                f"{buffer_key}:deadline",
+                *slot_keys,
+                *(f"{buffer_key}:id:{proposal_id}" for proposal_id in proposal_ids),
+            ]
+        )
+        if not proposal_ids:
+            return True
+        _record_coalesce_metric("buffers_flushed")
+        _send_tender_event(
+            kind=str(meta.get("kind") or ""),
+            tender_id=int(meta.get("tender_id") or 0),
+            event=str(meta.get("event") or ""),
+            payload=_build_coalesced_payload(payload, proposal_ids),
+        )
+        return True
+
+    def queue(
+        self,
+        kind: str,
+        tender_id: int,
+        event: str,
+        proposal_id: int,
+        payload: dict[str, Any],
+        *,
+        window_ms: int,
+        max_ids: int,
+    ) -> None:
+        stream_key = self._stream_key(kind, tender_id, event)
+        ttl = self._buffer_ttl(window_ms)
+        meta = {
+            "kind": kind,
+            "tender_id": int(tender_id),
+            "event": event,
+            "window_ms": int(window_ms),
+        }
+        slot_payload = dict(payload)
+        slot_payload["proposal_id"] = int(proposal_id)
+        for _ in range(self.max_append_attempts):
+            generation = self._current_generation(stream_key)
+            buffer_key = f"{stream_key}:{generation}"
+            self.cache.add(f"{buffer_key}:n", 0, ttl)
+            self.cache.add(f"{buffer_key}:p", 0, ttl)
+            self.cache.add(f"{buffer_key}:deadline", time.time() + window_ms / 1000.0, ttl)
+            is_new_id = self.cache.add(f"{buffer_key}:id:{int(proposal_id)}", 1, ttl)
+            try:
+                slot_seq = int(self.cache.incr(f"{buffer_key}:p"))
+                seq = int(self.cache.incr(f"{buffer_key}:n")) if is_new_id else 0
+            except ValueError:
+                continue
+            self.cache.set(f"{buffer_key}:p:{slot_seq}", slot_payload, ttl)
+            if self.cache.get(f"{buffer_key}:flushed") is not None:
+                # The generation was flushed between our incr and slot write.
+                continue
+            if seq == 1:
+                self._schedule_flush(stream_key, generation, meta, window_ms)
+            else:
+                _record_coalesce_metric("ids_merged")
+            # flush() claims the generation with add(":flushed"), so only one
+            # late appender sends it when the scheduling worker is gone.
+            if seq >= max_ids or self._flush_overdue(buffer_key):
+                self.flush(stream_key, generation, meta)
+            return
+        _send_tender_event(kind, tender_id, event, _build_coalesced_payload(payload, [int(proposal_id)]))
+
+
+def get_proposal_event_coalescer():
+    backend = str(
+        getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_BACKEND", COALESCE_BACKEND_LOCAL)
+        or COALESCE_BACKEND_LOCAL
+    ).strip().lower()
+    cache_alias = str(getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_CACHE", "default") or "default")
+    registry_key = (backend, cache_alias if backend == COALESCE_BACKEND_CACHE else "")
+    with _coalescers_lock:
+        coalescer = _coalescers.get(registry_key)
+        if coalescer is None:
+            if backend == COALESCE_BACKEND_CACHE:
+                coalescer = SharedProposalEventCoalescer(cache_alias=cache_alias)
+            else:
+                coalescer = LocalProposalEventCoalescer()
+            _coalescers[registry_key] = coalescer
+    return coalescer
 
 
 def _queue_coalesced_proposal_event(
@@ -66,53 +913,322 @@ def _queue_coalesced_proposal_event(
     event: str,
     payload: dict[str, Any],
 ) -> bool:
-    window_ms = int(getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_MS", 0) or 0)
+    window_ms = _coalesce_window_ms()
     if window_ms <= 0:
         return False
     proposal_id = int(payload.get("proposal_id") or 0)
     if proposal_id <= 0:
         return False
-    max_ids = max(
-        1, int(getattr(settings, "REALTIME_PROPOSAL_EVENT_COALESCE_MAX_IDS", 300) or 300)
-    )
-    buffer_key = f"{kind}:{tender_id}:{event}"
-    should_flush_now = False
-    with _proposal_event_lock:
-        buffer = _proposal_event_buffers.get(buffer_key)
-        if buffer is None:
-            timer = threading.Timer(
-                max(0.01, window_ms / 1000.0),
-                _flush_coalesced_proposal_event,
-                args=(buffer_key,),
-            )
-            timer.daemon = True
-            _proposal_event_buffers[buffer_key] = {
-                "kind": kind,
-                "tender_id": int(tender_id),
-                "event": event,
-                "payload": dict(payload),
-                "proposal_ids": [proposal_id],
-                "proposal_ids_set": {proposal_id},
-                "timer": timer,
-            }
-            timer.start()
-            return True
-        proposal_ids_set = buffer.get("proposal_ids_set")
-        if proposal_id not in proposal_ids_set:
-            proposal_ids_set.add(proposal_id)
-            buffer["proposal_ids"].append(proposal_id)
-        if len(buffer["proposal_ids"]) >= max_ids:
-            timer = buffer.get("timer")
-            if timer is not None:
-                timer.cancel()
-            should_flush_now = True
-    if should_flush_now:
-        _flush_coalesced_proposal_event(buffer_key)
+    try:
+        get_proposal_event_coalescer().queue(
+            kind,
+            int(tender_id),
+            event,
+            proposal_id,
+            payload,
+            window_ms=window_ms,
+            max_ids=_coalesce_max_ids(),
+        )
+    except Exception:
+        # Shared store outage: fall back to an immediate, uncoalesced send.
+        return False
     return True
 
 
+def _wake_tender_event_waiters(kind: str, tender_id: int) -> None:
+    with _event_waiters_lock:
+        waiters = list(_event_waiters.get((kind, int(tender_id)), ()))
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The waiting request's loop is already closed.
+            pass
+
+
 def publish_tender_event(kind: str, tender_id: int, event: str, payload: dict[str, Any]) -> None:
+    _wake_tender_event_waiters(kind, tender_id)
     if event.startswith("proposal."):
         if _queue_coalesced_proposal_event(kind, tender_id, event, payload):
             return
     _send_tender_event(kind, tender_id, event, payload)
+
+
+ACCESS_CACHE_KEY_PREFIX = "rt-access-v1"
+
+
+def _access_cache():
+    return caches[getattr(settings, "REALTIME_ACCESS_CACHE", "default") or "default"]
+
+
+def _access_cache_ttl() -> int:
+    return int(getattr(settings, "REALTIME_ACCESS_CACHE_TTL_SECONDS", 30) or 0)
+
+
+def _user_access_version_key(user_id: int) -> str:
+    return f"{ACCESS_CACHE_KEY_PREFIX}:uv:{user_id}"
+
+
+def _tender_access_version_key(kind: str, tender_id: int) -> str:
+    return f"{ACCESS_CACHE_KEY_PREFIX}:tv:{kind}:{tender_id}"
+
+
+def _access_entry_key(user_id: int, kind: str, tender_id: int) -> str:
+    return f"{ACCESS_CACHE_KEY_PREFIX}:d:{user_id}:{kind}:{tender_id}"
+
+
+def _user_companies_key(user_id: int) -> str:
+    return f"{ACCESS_CACHE_KEY_PREFIX}:c:{user_id}"
+
+
+def _bump_version(cache, key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def _bump_access_version(key: str) -> None:
+    _bump_version(_access_cache(), key)
+
+
+def invalidate_user_tender_access(user_id: int) -> None:
+    """Drop cached websocket access decisions of one user (membership changed)."""
+    if not user_id or _access_cache_ttl() <= 0:
+        return
+    try:
+        _bump_access_version(_user_access_version_key(user_id))
+    except Exception:
+        logger.exception("realtime access cache invalidation failed")
+
+
+def invalidate_tender_access(kind: str, tender_id: int) -> None:
+    """Drop cached websocket access decisions for one tender (proposals, invitations, stage)."""
+    if not tender_id or _access_cache_ttl() <= 0:
+        return
+    try:
+        _bump_access_version(_tender_access_version_key(kind, tender_id))
+    except Exception:
+        logger.exception("realtime access cache invalidation failed")
+
+
+def get_cached_tender_access(
+    user_id: int, keys: list[tuple[str, int]]
+) -> tuple[dict[tuple[str, int], Any], dict[str, int]]:
+    """
+    Return ``(hits, versions)``: cached access entries for ``(kind, tender_id)``
+    pairs whose user/tender versions are still current, and the version
+    snapshot to pass to :func:`store_tender_access` for the misses.
+
+    Versions are read before the database is queried, so an invalidation that
+    races with the query makes the stored entry stale instead of wrong.
+    """
+    if _access_cache_ttl() <= 0 or not keys:
+        return {}, {}
+    user_version_key = _user_access_version_key(user_id)
+    version_keys = [user_version_key] + [
+        _tender_access_version_key(kind, tender_id) for kind, tender_id in keys
+    ]
+    entry_keys = [_access_entry_key(user_id, kind, tender_id) for kind, tender_id in keys]
+    try:
+        cached = _access_cache().get_many(version_keys + entry_keys)
+    except Exception:
+        logger.exception("realtime access cache unavailable")
+        return {}, {}
+    versions = {key: int(cached.get(key) or 0) for key in version_keys}
+    hits = {}
+    for kind, tender_id in keys:
+        entry = cached.get(_access_entry_key(user_id, kind, tender_id))
+        if not entry:
+            continue
+        if entry.get("versions") != (
+            versions[user_version_key],
+            versions[_tender_access_version_key(kind, tender_id)],
+        ):
+            continue
+        hits[(kind, tender_id)] = entry.get("access")
+    return hits, versions
+
+
+def store_tender_access(
+    user_id: int, values: dict[tuple[str, int], Any], versions: dict[str, int]
+) -> None:
+    ttl = _access_cache_ttl()
+    if ttl <= 0 or not values:
+        return
+    user_version = versions.get(_user_access_version_key(user_id), 0)
+    entries = {
+        _access_entry_key(user_id, kind, tender_id): {
+            "versions": (user_version, versions.get(_tender_access_version_key(kind, tender_id), 0)),
+            "access": access,
+        }
+        for (kind, tender_id), access in values.items()
+    }
+    try:
+        _access_cache().set_many(entries, timeout=ttl)
+    except Exception:
+        logger.exception("realtime access cache unavailable")
+
+
+def _cached_user_company_ids_steps(user_id: int, load: IO) -> Steps:
+    if _access_cache_ttl() <= 0:
+        return frozenset((yield load))
+    cache = _access_cache()
+    version_key = _user_access_version_key(user_id)
+    companies_key = _user_companies_key(user_id)
+    try:
+        cached = yield IO(cache.get_many, cache.aget_many, [version_key, companies_key])
+    except Exception:
+        logger.exception("realtime access cache unavailable")
+        return frozenset((yield load))
+    version = int(cached.get(version_key) or 0)
+    entry = cached.get(companies_key)
+    if entry and entry.get("version") == version:
+        return entry["company_ids"]
+    company_ids = frozenset((yield load))
+    try:
+        yield IO(
+            cache.set,
+            cache.aset,
+            companies_key,
+            {"version": version, "company_ids": company_ids},
+            timeout=_access_cache_ttl(),
+        )
+    except Exception:
+        logger.exception("realtime access cache unavailable")
+    return company_ids
+
+
+def get_cached_user_company_ids(user_id: int, loader: Callable[[], Any]) -> frozenset:
+    """Approved company ids of a user, cached under the user's access version."""
+    return run_steps(_cached_user_company_ids_steps(user_id, IO(loader, loader)))
+
+
+async def aget_cached_user_company_ids(user_id: int, loader: Callable[[], Any]) -> frozenset:
+    """:func:`get_cached_user_company_ids` for async views; ``loader`` is a coroutine function."""
+    return await arun_steps(_cached_user_company_ids_steps(user_id, IO(loader, loader)))
+
+
+STATUS_SYNC_CACHE_KEY_PREFIX = "status-sync-v3"
+
+
+def _status_sync_cache():
+    return caches[getattr(settings, "STATUS_SYNC_CACHE", "default") or "default"]
+
+
+def _status_sync_cache_ttl() -> int:
+    return int(getattr(settings, "STATUS_SYNC_CACHE_TTL_SECONDS", 2) or 0)
+
+
+def _status_sync_version_key(kind: str, tender_id: int) -> str:
+    return f"{STATUS_SYNC_CACHE_KEY_PREFIX}:v:{kind}:{tender_id}"
+
+
+def _status_sync_snapshot_key(kind: str, tender_id: int, version: int) -> str:
+    return f"{STATUS_SYNC_CACHE_KEY_PREFIX}:s:{kind}:{tender_id}:{version}"
+
+
+def invalidate_status_sync_snapshot(kind: str, tender_id: int) -> None:
+    """Drop the shared status-sync snapshot of a tender (a proposal was saved or deleted)."""
+    if not tender_id or _status_sync_cache_ttl() <= 0:
+        return
+    try:
+        _bump_version(_status_sync_cache(), _status_sync_version_key(kind, int(tender_id)))
+    except Exception:
+        logger.exception("status sync cache invalidation failed")
+
+
+def status_sync_snapshot_steps(kind: str, tender_id: int) -> Steps:
+    """
+    Steps (see :mod:`core.io_steps`) returning ``(rows, version)``: the cached
+    status rows of every proposal of the tender (``None`` on a miss) and the
+    version to pass to :func:`store_status_sync_snapshot_steps`. ``version`` is
+    ``None`` when caching is off.
+    """
+    if _status_sync_cache_ttl() <= 0:
+        return None, None
+    version_key = _status_sync_version_key(kind, int(tender_id))
+    try:
+        cache = _status_sync_cache()
+        version = int((yield IO(cache.get, cache.aget, version_key)) or 0)
+        rows = yield IO(cache.get, cache.aget, _status_sync_snapshot_key(kind, int(tender_id), version))
+        return rows, version
+    except Exception:
+        logger.exception("status sync cache unavailable")
+        return None, None
+
+
+def store_status_sync_snapshot_steps(kind: str, tender_id: int, version: int | None, rows: Any) -> Steps:
+    ttl = _status_sync_cache_ttl()
+    if ttl <= 0 or version is None:
+        return
+    try:
+        cache = _status_sync_cache()
+        yield IO(cache.set, cache.aset, _status_sync_snapshot_key(kind, int(tender_id), version), rows, timeout=ttl)
+    except Exception:
+        logger.exception("status sync cache unavailable")
+
+
+class TenderEventWaiter:
+    """
+    Park an async request until the next event of one tender (status-sync long polls).
+
+    Waiters of this process are woken directly by :func:`publish_tender_event`;
+    with a channel layer the waiter also joins the tender group, so events
+    published by other workers wake it too. Enter before reading the state the
+    caller compares against, otherwise an event in between is missed.
+    """
+
+    def __init__(self, kind: str, tender_id: int):
+        self.key = (kind, int(tender_id))
+        self._event: asyncio.Event | None = None
+        self._loop = None
+        self._channel_layer = None
+        self._channel_name = None
+
+    async def __aenter__(self) -> "TenderEventWaiter":
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        with _event_waiters_lock:
+            _event_waiters.setdefault(self.key, set()).add((self._loop, self._event))
+        channel_layer = get_channel_layer() if get_channel_layer is not None else None
+        if channel_layer is not None:
+            try:
+                self._channel_name = await channel_layer.new_channel("tender-wait.")
+                await channel_layer.group_add(tender_group_name(*self.key), self._channel_name)
+                self._channel_layer = channel_layer
+            except Exception:
+                logger.exception("realtime channel layer unavailable for long poll")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        with _event_waiters_lock:
+            waiters = _event_waiters.get(self.key)
+            if waiters is not None:
+                waiters.discard((self._loop, self._event))
+                if not waiters:
+                    _event_waiters.pop(self.key, None)
+        if self._channel_layer is not None:
+            try:
+                await self._channel_layer.group_discard(tender_group_name(*self.key), self._channel_name)
+            except Exception:
+                logger.exception("realtime channel layer group discard failed")
+
+    async def wait(self, timeout: float) -> bool:
+        """Return ``True`` when a tender event arrived within ``timeout`` seconds."""
+        if self._event.is_set():
+            self._event.clear()
+            return True
+        if timeout <= 0:
+            return False
+        tasks = [asyncio.ensure_future(self._event.wait())]
+        if self._channel_layer is not None:
+            tasks.append(asyncio.ensure_future(self._channel_layer.receive(self._channel_name)))
+        done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._event.clear()
+        return any(not task.cancelled() and task.exception() is None for task in done)
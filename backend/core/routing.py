@@ -1,6 +1,6 @@
 from django.urls import re_path
 
-from .consumers import TenderRealtimeConsumer
+from .consumers import TenderRealtimeConsumer, UserRealtimeConsumer
 
 
 websocket_urlpatterns = [
@@ -8,4 +8,5 @@ websocket_urlpatterns = [
         r"^ws/tenders/(?P<kind>procurement|sales)/(?P<tender_id>\d+)/$",
         TenderRealtimeConsumer.as_asgi(),
     ),
+    re_path(r"^ws/realtime/$", UserRealtimeConsumer.as_asgi()),
 ]
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger("core.search")
+
+SEARCH_ENTITY_PROCUREMENT_TENDER = "procurement_tender"
+SEARCH_ENTITY_SALES_TENDER = "sales_tender"
+SEARCH_ENTITY_NOMENCLATURE = "nomenclature"
+
+SEARCH_BACKEND_MYSQL = "mysql"
+SEARCH_BACKEND_FTS5 = "fts5"
+SEARCH_BACKEND_LIKE = "like"
+
+FTS5_TABLE = "core_searchdocument_fts"
+DOCUMENT_TABLE = "core_searchdocument"
+# InnoDB default innodb_ft_min_token_size; shorter tokens are matched with LIKE.
+MYSQL_FULLTEXT_MIN_TOKEN = 3
+MAX_QUERY_TOKENS = 8
+
+# Ukrainian national transliteration (plus Russian letters), applied after lowercasing,
+# so "кабель", "Кабель" and "kabel" share one indexed form.
+_CYRILLIC_TO_LATIN = {
+    "а": "a",
+    "б": "b",
+    "в": "v",
+    "г": "h",
+    "ґ": "g",
+    "д": "d",
+    "е": "e",
+    "є": "ye",
+    "ж": "zh",
+    "з": "z",
+    "и": "y",
+    "і": "i",
+    "ї": "yi",
+    "й": "y",
+    "к": "k",
+    "л": "l",
+    "м": "m",
+    "н": "n",
+    "о": "o",
+    "п": "p",
+    "р": "r",
+    "с": "s",
+    "т": "t",
+    "у": "u",
+    "ф": "f",
+    "х": "kh",
+    "ц": "ts",
+    "ч": "ch",
+    "ш": "sh",
+    "щ": "shch",
+    "ь": "",
+    "ю": "yu",
+    "я": "ya",
+    "ё": "yo",
+    "ъ": "",
+    "ы": "y",
+    "э": "e",
+}
+_APOSTROPHES_RE = re.compile("['`’ʼʹ]")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_fts5_tables: dict[str, bool] = {}
+
+
+def normalize_search_text(value) -> str:
+    """Lowercased, transliterated, accent-free words of ``value`` joined by single spaces."""
+    text = unicodedata.normalize("NFKC", str(value or "")).lower()
+    text = _APOSTROPHES_RE.sub("", text)
+    text = "".join(_CYRILLIC_TO_LATIN.get(ch, ch) for ch in text)
+    text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def search_tokens(value) -> list[str]:
+    return list(dict.fromkeys(normalize_search_text(value).split()))[:MAX_QUERY_TOKENS]
+
+
+def _fts5_table_exists() -> bool:
+    name = str(connection.settings_dict.get("NAME") or "")
+    exists = _fts5_tables.get(name)
+    if exists is None:
+        exists = FTS5_TABLE in connection.introspection.table_names()
+        _fts5_tables[name] = exists
+    return exists
+
+
+def search_backend() -> str | None:
+    """Index flavour for the current database; ``None`` keeps the plain ``icontains`` search."""
+    if not getattr(settings, "SEARCH_FULLTEXT_INDEX", True):
+        return None
+    if connection.vendor == "mysql":
+        return SEARCH_BACKEND_MYSQL
+    if connection.vendor == "sqlite" and _fts5_table_exists():
+        return SEARCH_BACKEND_FTS5
+    return SEARCH_BACKEND_LIKE
+
+
+def _word_prefix_like(column: str, tokens: list[str]) -> tuple[list[str], list[str]]:
+    # Tokens are [a-z0-9] only, so they need no LIKE escaping.
+    conditions = [f"({column} LIKE %s OR {column} LIKE %s)" for _ in tokens]
+    params = [value for token in tokens for value in (f"{token}%", f"% {token}%")]
+    return conditions, params
+
+
+def _entity_ids_sql(entity_type: str, tokens: list[str], backend: str) -> tuple[str, list]:
+    if backend == SEARCH_BACKEND_FTS5:
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            f"SELECT d.entity_id FROM {DOCUMENT_TABLE} d "
+            f"JOIN {FTS5_TABLE} f ON f.rowid = d.id "
+            f"WHERE d.entity_type = %s AND {FTS5_TABLE} MATCH %s",
+            [entity_type, match],
+        )
+    conditions = ["entity_type = %s"]
+    params: list = [entity_type]
+    short_tokens = tokens
+    if backend == SEARCH_BACKEND_MYSQL:
+        long_tokens = [token for token in tokens if len(token) >= MYSQL_FULLTEXT_MIN_TOKEN]
+        short_tokens = [token for token in tokens if len(token) < MYSQL_FULLTEXT_MIN_TOKEN]
+        if long_tokens:
+            conditions.append("MATCH(search_text) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(" ".join(f"+{token}*" for token in long_tokens))
+    like_conditions, like_params = _word_prefix_like("search_text", short_tokens)
+    conditions += like_conditions
+    params += like_params
+    return f"SELECT entity_id FROM {DOCUMENT_TABLE} WHERE " + " AND ".join(conditions), params
+
+
+def name_search_q(entity_type: str, value, *, field: str = "name") -> Q:
+    """
+    Filter for a name search: every query word must start a word of the name,
+    after the same Ukrainian/Latin normalization as the index. Falls back to
+    ``<field>__icontains`` when the index is disabled or the query has no words.
+    """
+    raw_value = str(value or "").strip()
+    tokens = search_tokens(raw_value)
+    backend = search_backend() if tokens else None
+    if backend is None:
+        return Q(**{f"{field}__icontains": raw_value})
+    sql, params = _entity_ids_sql(entity_type, tokens, backend)
+    return Q(pk__in=RawSQL(sql, params))
+
+
+def index_search_document(entity_type: str, entity_id: int, name) -> None:
+    """Write the normalized name of one entity into the shadow index."""
+    from .models import SearchDocument
+
+    if not entity_id:
+        return
+    search_text = normalize_search_text(name)
+    updated = SearchDocument.objects.filter(entity_type=entity_type, entity_id=entity_id).update(
+        search_text=search_text
+    )
+    if not updated:
+        SearchDocument.objects.bulk_create(
+            [SearchDocument(entity_type=entity_type, entity_id=entity_id, search_text=search_text)],
+            ignore_conflicts=True,
+        )
+
+
+def remove_search_document(entity_type: str, entity_id: int) -> None:
+    from .models import SearchDocument
+
+    SearchDocument.objects.filter(entity_type=entity_type, entity_id=entity_id).delete()
+
+
+def _indexed_models():
+    from .models import Nomenclature, ProcurementTender, SalesTender
+
+    return {
+        SEARCH_ENTITY_PROCUREMENT_TENDER: ProcurementTender,
+        SEARCH_ENTITY_SALES_TENDER: SalesTender,
+        SEARCH_ENTITY_NOMENCLATURE: Nomenclature,
+    }
+
+
+def rebuild_search_index(entity_types=None, *, batch_size: int = 1000) -> dict[str, int]:
+    """Re-index every name of ``entity_types`` (all by default) and drop orphaned documents."""
+    from .models import SearchDocument
+
+    models_by_type = _indexed_models()
+    counts = {}
+    for entity_type in entity_types or models_by_type:
+        model = models_by_type[entity_type]
+        indexed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                model.objects.filter(id__gt=last_id).order_by("id").values_list("id", "name")[:batch_size]
+            )
+            if not batch:
+                break
+            for entity_id, name in batch:
+                index_search_document(entity_type, entity_id, name)
+            indexed += len(batch)
+            last_id = batch[-1][0]
+        SearchDocument.objects.filter(entity_type=entity_type).exclude(
+            entity_id__in=model.objects.values("id")
+        ).delete()
+        counts[entity_type] = indexed
+    return counts
@@ -51,6 +51,7 @@ from .models import (
     UnitOfMeasure,
     Nomenclature,
 )
+from .participation_state import refresh_tender_participation_states
 
 User = get_user_model()
 
@@ -2789,9 +2790,14 @@ class ProcurementTenderSerializer(serializers.ModelSerializer):
                     attribute_values=attribute_values,
                 )
                 seen_ids.add(new_pos.id)
+        removed = False
         for pos in list(instance.positions.all()):
             if pos.id not in seen_ids:
                 pos.delete()
+                removed = True
+        if removed:
+            # Видалення позицій прибирає їхні ціни та перемоги — стан участі перераховується раз на тендер.
+            refresh_tender_participation_states("procurement", [instance.id])
 
     def update(self, instance, validated_data):
         positions_data = validated_data.pop("positions", None)
@@ -3012,7 +3018,9 @@ class TenderProposalPositionSerializer(serializers.ModelSerializer):
             "price",
             "price_without_vat",
             "criterion_values",
+            "version",
         )
+        read_only_fields = ("version",)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3080,12 +3088,26 @@ class TenderProposalStatusSerializer(serializers.ModelSerializer):
         }
 
 
+class TenderProposalPositionDeltaSerializer(serializers.ModelSerializer):
+    """Compact position value row for realtime delta payloads."""
+
+    tender_position_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = TenderProposalPosition
+        fields = ("id", "tender_position_id", "price", "price_without_vat", "criterion_values", "version")
+        read_only_fields = fields
+
+
 class TenderProposalPositionUpdateSerializer(serializers.Serializer):
     """Оновлення значень по позиціях пропозиції (bulk)."""
 
     position_values = serializers.ListField(
         child=serializers.DictField(),
-        help_text="List of { tender_position_id, price?, criterion_values? }",
+        help_text=(
+            "List of { tender_position_id, price?, criterion_values?, version? }; "
+            "a version other than the stored one is rejected with 409."
+        ),
     )
 
 
@@ -3756,9 +3778,13 @@ class SalesTenderSerializer(serializers.ModelSerializer):
                     attribute_values=attribute_values,
                 )
                 seen_ids.add(new_pos.id)
+        removed = False
         for pos in list(instance.positions.all()):
             if pos.id not in seen_ids:
                 pos.delete()
+                removed = True
+        if removed:
+            refresh_tender_participation_states("sales", [instance.id])
 
     def update(self, instance, validated_data):
         positions_data = validated_data.pop("positions", None)
@@ -3979,7 +4005,9 @@ class SalesTenderProposalPositionSerializer(serializers.ModelSerializer):
             "price",
             "price_without_vat",
             "criterion_values",
+            "version",
         )
+        read_only_fields = ("version",)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -4047,6 +4075,17 @@ class SalesTenderProposalStatusSerializer(serializers.ModelSerializer):
         }
 
 
+class SalesTenderProposalPositionDeltaSerializer(serializers.ModelSerializer):
+    """Compact position value row for realtime delta payloads (sales)."""
+
+    tender_position_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = SalesTenderProposalPosition
+        fields = ("id", "tender_position_id", "price", "price_without_vat", "criterion_values", "version")
+        read_only_fields = fields
+
+
 class SalesTenderFileSerializer(serializers.ModelSerializer):
     """Файл, прикріплений до тендера на продаж."""
 
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_auth_user
+from .journal_summary import (
+    invalidate_journal_counts,
+    mark_tender_journal_summaries_stale,
+    schedule_tender_journal_summary_refresh,
+)
+from .models import (
+    CompanyUser,
+    Nomenclature,
+    ProcurementTender,
+    ProcurementTenderInvitation,
+    ProcurementTenderPosition,
+    SalesTender,
+    SalesTenderInvitation,
+    SalesTenderPosition,
+    SalesTenderProposal,
+    SalesTenderProposalPosition,
+    TenderProposal,
+    TenderProposalPosition,
+    User,
+)
+from .participation_state import (
+    drop_tender_participation_states,
+    mark_participation_position_values,
+    refresh_tender_participation_states,
+)
+from .realtime import (
+    invalidate_status_sync_snapshot,
+    invalidate_tender_access,
+    invalidate_user_tender_access,
+)
+from .search import (
+    SEARCH_ENTITY_NOMENCLATURE,
+    SEARCH_ENTITY_PROCUREMENT_TENDER,
+    SEARCH_ENTITY_SALES_TENDER,
+    index_search_document,
+    remove_search_document,
+)
+
+
+@receiver(post_save, sender=CompanyUser)
+@receiver(post_delete, sender=CompanyUser)
+def _invalidate_membership_access(sender, instance, **kwargs):
+    invalidate_user_tender_access(instance.user_id)
+    invalidate_cached_auth_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _invalidate_auth_user(sender, instance, **kwargs):
+    invalidate_cached_auth_user(instance.pk)
+
+
+@receiver(post_save, sender=ProcurementTender)
+@receiver(post_delete, sender=ProcurementTender)
+def _invalidate_procurement_tender_access(sender, instance, **kwargs):
+    invalidate_tender_access("procurement", instance.pk)
+
+
+@receiver(post_save, sender=SalesTender)
+@receiver(post_delete, sender=SalesTender)
+def _invalidate_sales_tender_access(sender, instance, **kwargs):
+    invalidate_tender_access("sales", instance.pk)
+
+
+@receiver(post_save, sender=TenderProposal)
+@receiver(post_delete, sender=TenderProposal)
+@receiver(post_save, sender=ProcurementTenderInvitation)
+@receiver(post_delete, sender=ProcurementTenderInvitation)
+def _invalidate_procurement_participant_access(sender, instance, **kwargs):
+    invalidate_tender_access("procurement", instance.tender_id)
+
+
+@receiver(post_save, sender=SalesTenderProposal)
+@receiver(post_delete, sender=SalesTenderProposal)
+@receiver(post_save, sender=SalesTenderInvitation)
+@receiver(post_delete, sender=SalesTenderInvitation)
+def _invalidate_sales_participant_access(sender, instance, **kwargs):
+    invalidate_tender_access("sales", instance.tender_id)
+
+
+@receiver(post_save, sender=TenderProposal)
+@receiver(post_delete, sender=TenderProposal)
+def _invalidate_procurement_status_sync(sender, instance, **kwargs):
+    # After commit, so a concurrent poll cannot cache pre-commit rows under the new version.
+    tender_id = instance.tender_id
+    transaction.on_commit(lambda: invalidate_status_sync_snapshot("procurement", tender_id))
+
+
+@receiver(post_save, sender=SalesTenderProposal)
+@receiver(post_delete, sender=SalesTenderProposal)
+def _invalidate_sales_status_sync(sender, instance, **kwargs):
+    tender_id = instance.tender_id
+    transaction.on_commit(lambda: invalidate_status_sync_snapshot("sales", tender_id))
+
+
+@receiver(post_save, sender=ProcurementTender)
+@receiver(post_delete, sender=ProcurementTender)
+def _invalidate_procurement_journal_counts(sender, instance, **kwargs):
+    company_id = instance.company_id
+    transaction.on_commit(lambda: invalidate_journal_counts("procurement", company_id))
+
+
+@receiver(post_save, sender=SalesTender)
+@receiver(post_delete, sender=SalesTender)
+def _invalidate_sales_journal_counts(sender, instance, **kwargs):
+    company_id = instance.company_id
+    transaction.on_commit(lambda: invalidate_journal_counts("sales", company_id))
+
+
+@receiver(post_save, sender=ProcurementTender)
+def _refresh_procurement_parent_journal_summary(sender, instance, created, **kwargs):
+    # A new tour flips has_next_tour of its parent.
+    if created and instance.parent_id:
+        schedule_tender_journal_summary_refresh("procurement", [instance.parent_id])
+
+
+@receiver(post_save, sender=SalesTender)
+def _refresh_sales_parent_journal_summary(sender, instance, created, **kwargs):
+    if created and instance.parent_id:
+        schedule_tender_journal_summary_refresh("sales", [instance.parent_id])
+
+
+@receiver(post_delete, sender=ProcurementTender)
+def _drop_procurement_journal_summary(sender, instance, **kwargs):
+    schedule_tender_journal_summary_refresh("procurement", [instance.pk, instance.parent_id])
+
+
+@receiver(post_delete, sender=SalesTender)
+def _drop_sales_journal_summary(sender, instance, **kwargs):
+    schedule_tender_journal_summary_refresh("sales", [instance.pk, instance.parent_id])
+
+
+@receiver(post_save, sender=ProcurementTenderPosition)
+@receiver(post_delete, sender=ProcurementTenderPosition)
+@receiver(post_save, sender=TenderProposal)
+@receiver(post_delete, sender=TenderProposal)
+def _mark_procurement_journal_summary_for_child(sender, instance, **kwargs):
+    # Only the stale flag: positions are saved row by row, and a refresh per row would
+    # recompute the same tender many times. Journal reads repair stale rows of their page.
+    mark_tender_journal_summaries_stale("procurement", [instance.tender_id])
+
+
+@receiver(post_save, sender=SalesTenderPosition)
+@receiver(post_delete, sender=SalesTenderPosition)
+@receiver(post_save, sender=SalesTenderProposal)
+@receiver(post_delete, sender=SalesTenderProposal)
+def _mark_sales_journal_summary_for_child(sender, instance, **kwargs):
+    mark_tender_journal_summaries_stale("sales", [instance.tender_id])
+
+
+_PARTICIPATION_TENDER_TYPE_BY_MODEL = {
+    TenderProposal: "procurement",
+    SalesTenderProposal: "sales",
+    TenderProposalPosition: "procurement",
+    SalesTenderProposalPosition: "sales",
+    ProcurementTender: "procurement",
+    SalesTender: "sales",
+}
+
+
+@receiver(post_save, sender=TenderProposal)
+@receiver(post_save, sender=SalesTenderProposal)
+@receiver(post_delete, sender=TenderProposal)
+@receiver(post_delete, sender=SalesTenderProposal)
+def _refresh_participation_state(sender, instance, update_fields=None, **kwargs):
+    # Confirm, submit and withdraw; disqualification and other fields do not change the flags.
+    if update_fields is not None and "submitted_at" not in update_fields:
+        return
+    refresh_tender_participation_states(
+        _PARTICIPATION_TENDER_TYPE_BY_MODEL[sender],
+        [instance.tender_id],
+        supplier_company_ids=[instance.supplier_company_id],
+    )
+
+
+@receiver(post_save, sender=TenderProposalPosition)
+@receiver(post_save, sender=SalesTenderProposalPosition)
+def _mark_participation_position_values(sender, instance, created, **kwargs):
+    if created:
+        mark_participation_position_values(
+            _PARTICIPATION_TENDER_TYPE_BY_MODEL[sender],
+            instance.proposal.tender_id,
+            instance.proposal.supplier_company_id,
+        )
+
+
+@receiver(post_delete, sender=ProcurementTender)
+@receiver(post_delete, sender=SalesTender)
+def _drop_participation_states(sender, instance, **kwargs):
+    drop_tender_participation_states(_PARTICIPATION_TENDER_TYPE_BY_MODEL[sender], [instance.pk])
+
+
+_SEARCH_ENTITY_BY_MODEL = {
+    ProcurementTender: SEARCH_ENTITY_PROCUREMENT_TENDER,
+    SalesTender: SEARCH_ENTITY_SALES_TENDER,
+    Nomenclature: SEARCH_ENTITY_NOMENCLATURE,
+}
+
+
+@receiver(post_save, sender=ProcurementTender)
+@receiver(post_save, sender=SalesTender)
+@receiver(post_save, sender=Nomenclature)
+def _index_search_document(sender, instance, update_fields=None, **kwargs):
+    # Same transaction as the rename, so search never sees a half-applied change.
+    if update_fields is not None and "name" not in update_fields:
+        return
+    index_search_document(_SEARCH_ENTITY_BY_MODEL[sender], instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=ProcurementTender)
+@receiver(post_delete, sender=SalesTender)
+@receiver(post_delete, sender=Nomenclature)
+def _remove_search_document(sender, instance, **kwargs):
+    remove_search_document(_SEARCH_ENTITY_BY_MODEL[sender], instance.pk)
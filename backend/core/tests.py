@@ -1,9 +1,55 @@
+import asyncio
+import importlib.util
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+from urllib.parse import unquote, urlparse
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator as AsgirefApplicationCommunicator
 from django.contrib.auth import get_user_model
-from django.test import TestCase, override_settings
-from rest_framework.test import APIRequestFactory, APITestCase
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
 
-from .models import Company, CompanyUser, Role
-from .views import _resolve_request_company_id
+from . import journal_summary, ratelimit, realtime, search
+from .cpv_closure import expand_cpv_ids_with_descendants
+from .journal_summary import mark_tender_journal_summaries_stale, refresh_tender_journal_summaries
+from .models import (
+    Company,
+    CompanyUser,
+    CpvClosure,
+    CpvDictionary,
+    Currency,
+    Nomenclature,
+    ProcurementTender,
+    ProcurementTenderPosition,
+    Role,
+    SalesTender,
+    SalesTenderPosition,
+    SalesTenderProposal,
+    SearchDocument,
+    TenderAuctionPositionState,
+    TenderBidHistory,
+    TenderJournalSummary,
+    TenderParticipationState,
+    TenderProposal,
+    TenderProposalChangeLog,
+    TenderProposalPosition,
+    UnitOfMeasure,
+)
+from .participation_state import refresh_tender_participation_states
+from .views import ProcurementTenderViewSet, _build_cpv_tree_for_tenders_queryset, _resolve_request_company_id
 
 User = get_user_model()
 
@@ -152,3 +198,1815 @@ class RegistrationStep2ExistingFlowTests(APITestCase):
         new_user.refresh_from_db()
         self.assertEqual(new_user.registration_step, 4)
 
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REALTIME_PROPOSAL_EVENT_COALESCE_MS=250,
+    REALTIME_PROPOSAL_EVENT_COALESCE_MAX_IDS=3,
+)
+class SharedProposalEventCoalescerTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        send_patcher = mock.patch.object(realtime, "_send_tender_event")
+        schedule_patcher = mock.patch.object(
+            realtime.SharedProposalEventCoalescer, "_schedule_flush"
+        )
+        self.send = send_patcher.start()
+        self.schedule = schedule_patcher.start()
+        self.addCleanup(send_patcher.stop)
+        self.addCleanup(schedule_patcher.stop)
+        # Two instances sharing one cache stand in for two worker processes.
+        self.worker_a = realtime.SharedProposalEventCoalescer()
+        self.worker_b = realtime.SharedProposalEventCoalescer()
+
+    def _queue(self, worker, proposal_id, event="proposal.submitted_at.updated"):
+        worker.queue(
+            "procurement",
+            7,
+            event,
+            proposal_id,
+            {"proposal_id": proposal_id, "submitted_at": "2026-01-01T00:00:00"},
+            window_ms=250,
+            max_ids=3,
+        )
+
+    def test_merges_ids_from_several_workers_into_one_send(self):
+        self._queue(self.worker_a, 1)
+        self._queue(self.worker_b, 2)
+        self._queue(self.worker_b, 1)
+        self.assertEqual(self.schedule.call_count, 1)
+        self.send.assert_not_called()
+
+        stream_key, generation, meta = self.schedule.call_args.args[:3]
+        self.assertTrue(self.worker_a.flush(stream_key, generation, meta))
+        self.assertFalse(self.worker_b.flush(stream_key, generation, meta))
+
+        self.send.assert_called_once()
+        payload = self.send.call_args.kwargs["payload"]
+        self.assertEqual(payload["proposal_ids"], [1, 2])
+        self.assertEqual(payload["proposal_id"], 1)
+        self.assertNotIn("submitted_at", payload)
+
+    def test_max_ids_flushes_early_and_opens_next_generation(self):
+        for proposal_id, worker in ((1, self.worker_a), (2, self.worker_b), (3, self.worker_a)):
+            self._queue(worker, proposal_id)
+        self.send.assert_called_once()
+        self.assertEqual(self.send.call_args.kwargs["payload"]["proposal_ids"], [1, 2, 3])
+
+        self._queue(self.worker_b, 4)
+        self.assertEqual(self.schedule.call_count, 2)
+        stream_key, generation, meta = self.schedule.call_args.args[:3]
+        self.worker_b.flush(stream_key, generation, meta)
+        self.assertEqual(self.send.call_count, 2)
+        self.assertEqual(self.send.call_args.kwargs["payload"]["proposal_ids"], [4])
+
+    def test_late_appender_flushes_generation_when_opener_died(self):
+        self._queue(self.worker_a, 1)
+        # worker_a dies before its scheduled flush runs.
+        with mock.patch.object(realtime.time, "time", return_value=time.time() + 1):
+            self._queue(self.worker_b, 2)
+            self._queue(self.worker_a, 3)
+        self.send.assert_called_once()
+        self.assertEqual(self.send.call_args.kwargs["payload"]["proposal_ids"], [1, 2])
+
+        stream_key, generation, meta = self.schedule.call_args_list[0].args[:3]
+        self.assertFalse(self.worker_a.flush(stream_key, generation, meta))
+        self.assertEqual(self.schedule.call_count, 2)
+
+    def test_streams_are_separated_per_event(self):
+        self._queue(self.worker_a, 1, event="proposal.submitted_at.updated")
+        self._queue(self.worker_b, 1, event="proposal.position_values.updated")
+        self.assertEqual(self.schedule.call_count, 2)
+
+    @override_settings(REALTIME_PROPOSAL_EVENT_COALESCE_BACKEND="cache")
+    def test_publish_uses_configured_backend(self):
+        realtime.publish_tender_event(
+            "sales", 9, "proposal.submitted_at.updated", {"proposal_id": 5}
+        )
+        self.send.assert_not_called()
+        self.assertEqual(self.schedule.call_count, 1)
+        self.assertIsInstance(
+            realtime.get_proposal_event_coalescer(),
+            realtime.SharedProposalEventCoalescer,
+        )
+
+
+class DeadlineFlusherTests(SimpleTestCase):
+    def setUp(self):
+        realtime.reset_coalesce_metrics()
+        send_patcher = mock.patch.object(realtime, "_send_tender_event")
+        self.send = send_patcher.start()
+        self.addCleanup(send_patcher.stop)
+
+    def test_runs_callbacks_in_deadline_order_on_one_thread(self):
+        flusher = realtime.DeadlineFlusher(name="test-flusher")
+        calls = []
+        done = threading.Event()
+
+        def record(label):
+            calls.append((label, threading.current_thread().name))
+            if len(calls) == 3:
+                done.set()
+            return True
+
+        flusher.schedule(0.06, record, "late")
+        flusher.schedule(0.01, record, "early")
+        flusher.schedule(0.03, record, "middle")
+        self.assertTrue(done.wait(2))
+        self.assertEqual([label for label, _ in calls], ["early", "middle", "late"])
+        self.assertEqual({name for _, name in calls}, {"test-flusher"})
+        self.assertEqual(realtime.get_coalesce_metrics()["flush_lag_samples"], 3)
+
+    def test_local_coalescer_early_flush_cancels_scheduled_flush(self):
+        flusher = mock.Mock(spec=realtime.DeadlineFlusher)
+        coalescer = realtime.LocalProposalEventCoalescer(flusher=flusher)
+        for proposal_id in (1, 2, 2, 3):
+            coalescer.queue(
+                "procurement", 1, "proposal.position_values.updated", proposal_id,
+                {"proposal_id": proposal_id}, window_ms=250, max_ids=3,
+            )
+        flusher.schedule.assert_called_once()
+        self.send.assert_called_once()
+        self.assertEqual(self.send.call_args.kwargs["payload"]["proposal_ids"], [1, 2, 3])
+
+        # The deadline entry fires later and must not flush anything.
+        _, callback, *args = flusher.schedule.call_args.args
+        self.assertFalse(callback(*args))
+        self.send.assert_called_once()
+
+        metrics = realtime.get_coalesce_metrics()
+        self.assertEqual(metrics["buffers_flushed"], 1)
+        self.assertEqual(metrics["ids_merged"], 3)
+
+
+class OutboundEventSenderTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.delivered = []
+
+    def _blocking_deliver(self, kind, tender_id, message):
+        self.started.set()
+        self.release.wait(2)
+        self.delivered.append((kind, tender_id, message["event"], message["payload"]))
+        return True
+
+    def _message(self, event, payload):
+        return realtime._build_tender_event_message(event, payload)
+
+    def _fill(self, sender):
+        sender.submit("procurement", 1, self._message("proposal.submitted_at.updated", {"proposal_id": 1}))
+        self.assertTrue(self.started.wait(2))
+        sender.submit("procurement", 1, self._message("proposal.position_values.updated", {"proposal_id": 2, "position_ids": [5]}))
+        sender.submit("procurement", 2, self._message("proposal.submitted_at.updated", {"proposal_id": 3}))
+
+    def test_submit_does_not_wait_for_slow_channel_layer(self):
+        sender = realtime.OutboundEventSender(max_size=10, workers=1, deliver=self._blocking_deliver)
+        started_at = time.monotonic()
+        self.assertTrue(sender.submit("sales", 4, self._message("proposal.submitted_at.updated", {"proposal_id": 1})))
+        self.assertLess(time.monotonic() - started_at, 0.5)
+        self.release.set()
+        self.assertTrue(sender.drain(2))
+        metrics = sender.metrics()
+        self.assertEqual(metrics["sent"], 1)
+        self.assertEqual(metrics["depth"], 0)
+        self.assertEqual(metrics["send_latency_samples"], 1)
+
+    def test_drop_oldest_policy_discards_oldest_queued_message(self):
+        sender = realtime.OutboundEventSender(
+            max_size=2, workers=1, overflow_policy="drop_oldest", deliver=self._blocking_deliver
+        )
+        self._fill(sender)
+        sender.submit("procurement", 3, self._message("proposal.submitted_at.updated", {"proposal_id": 4}))
+        self.assertEqual(sender.metrics()["dropped"], 1)
+        self.release.set()
+        self.assertTrue(sender.drain(2))
+        self.assertEqual([row[1] for row in self.delivered], [1, 2, 3])
+
+    def test_merge_policy_folds_message_into_queued_event(self):
+        sender = realtime.OutboundEventSender(
+            max_size=2, workers=1, overflow_policy="merge", deliver=self._blocking_deliver
+        )
+        self._fill(sender)
+        sender.submit(
+            "procurement", 1,
+            self._message("proposal.position_values.updated", {"proposal_id": 9, "position_ids": [4, 5]}),
+        )
+        metrics = sender.metrics()
+        self.assertEqual(metrics["merged"], 1)
+        self.assertEqual(metrics["dropped"], 0)
+        self.release.set()
+        self.assertTrue(sender.drain(2))
+        merged_payload = self.delivered[1][3]
+        self.assertEqual(merged_payload["proposal_ids"], [2, 9])
+        self.assertEqual(merged_payload["position_ids"], [4, 5])
+
+    def test_sequenced_messages_are_never_dropped(self):
+        sender = realtime.OutboundEventSender(
+            max_size=1, workers=1, overflow_policy="drop_oldest", deliver=self._blocking_deliver
+        )
+
+        def sequenced(seq, event, payload):
+            return {**self._message(event, payload), "seq": seq}
+
+        sender.submit("procurement", 1, sequenced(1, "proposal.submitted_at.updated", {"proposal_id": 1}))
+        self.assertTrue(self.started.wait(2))
+        sender.submit("procurement", 1, sequenced(2, "proposal.position_values.updated", {"proposal_id": 2}))
+        sender.submit("procurement", 1, sequenced(3, "proposal.position_values.updated", {"proposal_id": 3}))
+        sender.submit("procurement", 1, sequenced(4, "proposal.submitted_at.updated", {"proposal_id": 4}))
+        metrics = sender.metrics()
+        self.assertEqual(metrics["dropped"], 0)
+        self.assertEqual(metrics["merged"], 1)
+        self.assertEqual(metrics["overflowed"], 1)
+        self.release.set()
+        self.assertTrue(sender.drain(2))
+        self.assertEqual(
+            [row[3].get("proposal_ids", [row[3]["proposal_id"]]) for row in self.delivered], [[1], [2, 3], [4]]
+        )
+
+    def test_merge_records_folded_seqs(self):
+        sender = realtime.OutboundEventSender(max_size=1, workers=1, deliver=self._blocking_deliver)
+        sent = []
+        sender._deliver = lambda kind, tender_id, message: sent.append(dict(message)) or self._blocking_deliver(
+            kind, tender_id, message
+        )
+        sender.submit("sales", 1, {**self._message("proposal.submitted_at.updated", {"proposal_id": 1}), "seq": 1})
+        self.assertTrue(self.started.wait(2))
+        sender.submit("sales", 1, {**self._message("proposal.submitted_at.updated", {"proposal_id": 2}), "seq": 2})
+        sender.submit("sales", 1, {**self._message("proposal.submitted_at.updated", {"proposal_id": 3}), "seq": 3})
+        self.release.set()
+        self.assertTrue(sender.drain(2))
+        self.assertEqual(sent[1]["seq"], 3)
+        self.assertEqual(sent[1]["merged_seqs"], [2, 3])
+
+    def test_events_of_one_tender_keep_order_across_workers(self):
+        delivered = []
+        lock = threading.Lock()
+
+        def deliver(kind, tender_id, message):
+            time.sleep(0.001 * (message["seq"] % 3))
+            with lock:
+                delivered.append((tender_id, message["seq"]))
+            return True
+
+        sender = realtime.OutboundEventSender(max_size=200, workers=3, deliver=deliver)
+        for seq in range(1, 31):
+            for tender_id in (1, 2, 3, 4):
+                sender.submit(
+                    "procurement", tender_id,
+                    {**self._message("proposal.submitted_at.updated", {"proposal_id": seq}), "seq": seq},
+                )
+        self.assertTrue(sender.drain(5))
+        for tender_id in (1, 2, 3, 4):
+            self.assertEqual([seq for tid, seq in delivered if tid == tender_id], list(range(1, 31)))
+
+    def test_zero_workers_falls_back_to_inline_send(self):
+        sender = realtime.OutboundEventSender(workers=0, deliver=self._blocking_deliver)
+        self.assertFalse(sender.submit("sales", 1, self._message("proposal.submitted_at.updated", {})))
+
+
+class TenderEventLogTests(TestCase):
+    def _append_many(self, event_log, count):
+        for index in range(1, count + 1):
+            message = realtime._build_tender_event_message(
+                "proposal.submitted_at.updated", {"proposal_id": index}
+            )
+            self.assertEqual(event_log.append("procurement", 3, message), index)
+
+    def test_memory_log_replays_only_missed_events(self):
+        event_log = realtime.InMemoryTenderEventLog(max_events=5)
+        self._append_many(event_log, 4)
+        events, resync_required = event_log.replay("procurement", 3, 2)
+        self.assertFalse(resync_required)
+        self.assertEqual([item["seq"] for item in events], [3, 4])
+        self.assertEqual(events[0]["payload"], {"proposal_id": 3})
+        self.assertEqual(event_log.replay("procurement", 3, 4), ([], False))
+
+    def test_memory_log_requires_resync_when_gap_is_evicted(self):
+        event_log = realtime.InMemoryTenderEventLog(max_events=3)
+        self._append_many(event_log, 6)
+        self.assertEqual(event_log.replay("procurement", 3, 1), ([], True))
+        # A client ahead of the server (e.g. after a restart) must resync as well.
+        self.assertEqual(event_log.replay("procurement", 3, 10), ([], True))
+        self.assertEqual(event_log.current_seq("sales", 3), 0)
+
+    def test_database_log_shares_sequence_and_prunes(self):
+        event_log = realtime.DatabaseTenderEventLog(max_events=10)
+        event_log.prune_every = 5
+        self._append_many(event_log, 15)
+        self.assertEqual(event_log.current_seq("procurement", 3), 15)
+        events, resync_required = event_log.replay("procurement", 3, 12)
+        self.assertFalse(resync_required)
+        self.assertEqual([item["seq"] for item in events], [13, 14, 15])
+        self.assertEqual(event_log.replay("procurement", 3, 2), ([], True))
+
+    @override_settings(REALTIME_EVENT_LOG_BACKEND="memory", REALTIME_EVENT_LOG_SIZE=7)
+    def test_send_attaches_sequence_number_to_message(self):
+        with mock.patch.object(realtime, "get_outbound_sender") as get_sender:
+            realtime._send_tender_event("sales", 77, "proposal.submitted_at.updated", {"proposal_id": 1})
+            realtime._send_tender_event("sales", 77, "proposal.submitted_at.updated", {"proposal_id": 2})
+        messages = [call.args[2] for call in get_sender.return_value.submit.call_args_list]
+        self.assertEqual([message["seq"] for message in messages], [1, 2])
+
+
+class _WebsocketCommunicator(AsgirefApplicationCommunicator):
+    """
+    The subset of ``channels.testing.WebsocketCommunicator`` used here.
+    ``channels.testing`` imports daphne for its live server test case, so the
+    consumer tests drive the ASGI app through asgiref directly.
+    """
+
+    def __init__(self, application, path):
+        parsed = urlparse(path)
+        self.scope = {
+            "type": "websocket",
+            "path": unquote(parsed.path),
+            "query_string": parsed.query.encode("utf-8"),
+            "headers": [],
+            "subprotocols": [],
+        }
+        super().__init__(application, self.scope)
+
+    async def send_input(self, message):
+        with mock.patch("channels.db.close_old_connections"):
+            return await super().send_input(message)
+
+    async def receive_output(self, timeout=1):
+        with mock.patch("channels.db.close_old_connections"):
+            return await super().receive_output(timeout)
+
+    async def connect(self, timeout=1):
+        await self.send_input({"type": "websocket.connect"})
+        response = await self.receive_output(timeout)
+        if response["type"] == "websocket.close":
+            return False, response.get("code", 1000)
+        return True, response.get("subprotocol")
+
+    async def send_json_to(self, data):
+        await self.send_input({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json_from(self, timeout=1):
+        response = await self.receive_output(timeout)
+        assert response["type"] == "websocket.send", response
+        return json.loads(response["text"])
+
+    async def disconnect(self, code=1000, timeout=1):
+        await self.send_input({"type": "websocket.disconnect", "code": code})
+        await self.wait(timeout)
+
+
+@skipUnless(importlib.util.find_spec("channels"), "channels not installed")
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    REALTIME_EVENT_LOG_BACKEND="memory",
+)
+class TenderRealtimeConsumerReplayTests(SimpleTestCase):
+    AUDIENCES = {("procurement", 501): {"is_owner": True, "company_ids": frozenset()}}
+
+    def _communicator(self, query=""):
+        from .consumers import TenderRealtimeConsumer
+
+        communicator = _WebsocketCommunicator(
+            TenderRealtimeConsumer.as_asgi(), f"/ws/tenders/procurement/501/{query}"
+        )
+        communicator.scope["user"] = mock.Mock(is_authenticated=True, id=1)
+        communicator.scope["url_route"] = {"kwargs": {"kind": "procurement", "tender_id": "501"}}
+        return communicator
+
+    def test_reconnect_with_since_seq_replays_missed_events(self):
+        event_log = realtime.get_tender_event_log()
+        for proposal_id in (1, 2, 3):
+            event_log.append(
+                "procurement",
+                501,
+                realtime._build_tender_event_message("proposal.submitted_at.updated", {"proposal_id": proposal_id}),
+            )
+        base_seq = event_log.current_seq("procurement", 501) - 3
+
+        async def scenario():
+            communicator = self._communicator(f"?since_seq={base_seq + 1}")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            hello = await communicator.receive_json_from()
+            first = await communicator.receive_json_from()
+            second = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return hello, first, second
+
+        with mock.patch("core.consumers._load_tender_audiences", mock.AsyncMock(return_value=self.AUDIENCES)):
+            hello, first, second = async_to_sync(scenario)()
+        self.assertEqual(hello["payload"]["seq"], base_seq + 3)
+        self.assertEqual([first["seq"], second["seq"]], [base_seq + 2, base_seq + 3])
+        self.assertTrue(first["replayed"])
+        self.assertEqual(second["payload"], {"proposal_id": 3})
+
+    def test_stale_since_seq_gets_resync_signal(self):
+        async def scenario():
+            communicator = self._communicator("?since_seq=999999")
+            await communicator.connect()
+            await communicator.receive_json_from()
+            message = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return message
+
+        with mock.patch("core.consumers._load_tender_audiences", mock.AsyncMock(return_value=self.AUDIENCES)):
+            message = async_to_sync(scenario)()
+        self.assertEqual(message["event"], "resync.required")
+
+
+class ProposalDeltaPayloadTests(SimpleTestCase):
+    def test_merge_keeps_latest_position_values_per_proposal(self):
+        merged = realtime._merge_event_payloads(
+            {
+                "proposal_id": 7,
+                "deltas": [
+                    {
+                        "proposal_id": 7,
+                        "supplier_company_id": 3,
+                        "position_values": [
+                            {"tender_position_id": 1, "price": "10.00"},
+                            {"tender_position_id": 2, "price": "20.00"},
+                        ],
+                    }
+                ],
+            },
+            {
+                "proposal_id": 7,
+                "deltas": [
+                    {
+                        "proposal_id": 7,
+                        "supplier_company_id": 3,
+                        "position_values": [{"tender_position_id": 2, "price": "19.00"}],
+                    }
+                ],
+            },
+        )
+        self.assertEqual(len(merged["deltas"]), 1)
+        self.assertEqual(
+            merged["deltas"][0]["position_values"],
+            [
+                {"tender_position_id": 1, "price": "10.00"},
+                {"tender_position_id": 2, "price": "19.00"},
+            ],
+        )
+
+    def test_connection_payload_respects_opt_in_and_audience(self):
+        from .consumers import TenderRealtimeConsumer
+
+        payload = {
+            "proposal_ids": [1, 2],
+            "deltas": [
+                {"proposal_id": 1, "supplier_company_id": 10},
+                {"proposal_id": 2, "supplier_company_id": 20},
+            ],
+        }
+        consumer = TenderRealtimeConsumer()
+        consumer.delta_mode = False
+        consumer.audience = None
+        self.assertNotIn("deltas", consumer._payload_for_connection(payload))
+
+        consumer.delta_mode = True
+        consumer.audience = {"is_owner": False, "company_ids": frozenset({20})}
+        participant_payload = consumer._payload_for_connection(payload)
+        self.assertEqual([delta["proposal_id"] for delta in participant_payload["deltas"]], [2])
+        self.assertTrue(participant_payload["delta_complete"])
+
+        consumer.audience = {"is_owner": True, "company_ids": frozenset({99})}
+        self.assertEqual(len(consumer._payload_for_connection(payload)["deltas"]), 2)
+
+
+class TenderTestCase(TestCase):
+    """TestCase with the unmanaged ``cpv_dictionary`` table that tender FKs point to."""
+
+    @classmethod
+    def setUpClass(cls):
+        if CpvDictionary._meta.db_table not in connection.introspection.table_names():
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(CpvDictionary)
+        super().setUpClass()
+
+
+class LoadTenderAudiencesTests(TenderTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="watcher@example.com", password="testpass123")
+        self.own_company = Company.objects.create(edrpou="20000001", name="Buyer")
+        self.other_company = Company.objects.create(edrpou="20000002", name="Other")
+        role = Role.objects.create(company=self.own_company, name="Role-buyer")
+        CompanyUser.objects.create(
+            user=self.user,
+            company=self.own_company,
+            role=role,
+            status=CompanyUser.Status.APPROVED,
+        )
+        self.currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+
+    def _tender(self, company, **kwargs):
+        return ProcurementTender.objects.create(
+            company=company, name="T", currency=self.currency, **kwargs
+        )
+
+    def test_authorises_many_tenders_with_fixed_query_count(self):
+        from .consumers import _load_tender_audiences
+
+        owned = [self._tender(self.own_company) for _ in range(10)]
+        participating = self._tender(self.other_company)
+        TenderProposal.objects.create(tender=participating, supplier_company=self.own_company)
+        public = self._tender(self.other_company, conduct_type="rfx", stage="acceptance")
+        hidden = self._tender(self.other_company, conduct_type="rfx", stage="passport")
+        keys = [("procurement", tender.id) for tender in [*owned, participating, public, hidden]]
+        keys.append(("sales", 999999))
+
+        # procurement tenders + sales tenders + membership company ids
+        with self.assertNumQueries(3):
+            audiences = async_to_sync(_load_tender_audiences)(self.user.id, keys)
+        with self.assertNumQueries(0):
+            async_to_sync(_load_tender_audiences)(self.user.id, keys)
+
+        self.assertNotIn(("procurement", hidden.id), audiences)
+        self.assertNotIn(("sales", 999999), audiences)
+        self.assertEqual(len(audiences), 12)
+        self.assertTrue(audiences[("procurement", owned[0].id)]["is_owner"])
+        self.assertFalse(audiences[("procurement", participating.id)]["is_owner"])
+        self.assertEqual(audiences[("procurement", public.id)]["company_ids"], {self.own_company.id})
+
+    def test_single_connect_check_is_one_query_then_cached(self):
+        from .consumers import _resolve_tender_access
+
+        tender = self._tender(self.own_company)
+        with self.assertNumQueries(1):
+            self.assertIn(("procurement", tender.id), _resolve_tender_access(self.user.id, [("procurement", tender.id)]))
+        with self.assertNumQueries(0):
+            _resolve_tender_access(self.user.id, [("procurement", tender.id)])
+
+    def test_cached_decision_is_invalidated_by_proposal_and_membership_changes(self):
+        from .consumers import _resolve_tender_access
+
+        tender = self._tender(self.other_company)
+        key = ("procurement", tender.id)
+        self.assertNotIn(key, _resolve_tender_access(self.user.id, [key]))
+
+        TenderProposal.objects.create(tender=tender, supplier_company=self.own_company)
+        self.assertIn(key, _resolve_tender_access(self.user.id, [key]))
+
+        CompanyUser.objects.filter(user=self.user).first().delete()
+        self.assertNotIn(key, _resolve_tender_access(self.user.id, [key]))
+
+
+@skipUnless(importlib.util.find_spec("channels"), "channels not installed")
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    REALTIME_EVENT_LOG_BACKEND="memory",
+    REALTIME_OUTBOUND_WORKERS=0,
+    REALTIME_MAX_SUBSCRIPTIONS=2,
+)
+class UserRealtimeConsumerTests(SimpleTestCase):
+    def test_subscribes_to_many_tenders_over_one_socket(self):
+        from .consumers import UserRealtimeConsumer
+
+        audience = {"is_owner": True, "company_ids": frozenset({1})}
+        allowed = {("procurement", 601): audience, ("sales", 602): audience}
+
+        async def load_audiences(user_id, keys):
+            return {key: allowed[key] for key in keys if key in allowed}
+
+        async def scenario():
+            communicator = _WebsocketCommunicator(UserRealtimeConsumer.as_asgi(), "/ws/realtime/")
+            communicator.scope["user"] = mock.Mock(is_authenticated=True, id=1)
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.receive_json_from()
+            await communicator.send_json_to(
+                {
+                    "event": "subscribe",
+                    "tenders": [
+                        {"kind": "procurement", "tender_id": 601},
+                        {"kind": "sales", "tender_id": 602},
+                        {"kind": "procurement", "tender_id": 603},
+                    ],
+                }
+            )
+            subscribed = await communicator.receive_json_from()
+            await sync_to_async(realtime.publish_tender_event)("sales", 602, "tender.updated", {"stage": "decision"})
+            routed = await communicator.receive_json_from()
+            await communicator.send_json_to(
+                {"event": "unsubscribe", "tenders": [{"kind": "sales", "tender_id": 602}]}
+            )
+            unsubscribed = await communicator.receive_json_from()
+            await sync_to_async(realtime.publish_tender_event)("sales", 602, "tender.updated", {"stage": "approval"})
+            silent = await communicator.receive_nothing()
+            await communicator.disconnect()
+            return subscribed, routed, unsubscribed, silent
+
+        with mock.patch("core.consumers._load_tender_audiences", side_effect=load_audiences):
+            subscribed, routed, unsubscribed, silent = async_to_sync(scenario)()
+
+        self.assertEqual(
+            [(item["kind"], item["tender_id"]) for item in subscribed["payload"]["tenders"]],
+            [("procurement", 601), ("sales", 602)],
+        )
+        self.assertEqual(subscribed["payload"]["denied"][0]["reason"], "limit")
+        self.assertEqual((routed["kind"], routed["tender_id"]), ("sales", 602))
+        self.assertEqual(routed["payload"], {"stage": "decision"})
+        self.assertEqual(unsubscribed["payload"]["tenders"], [{"kind": "sales", "tender_id": 602}])
+        self.assertTrue(silent)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        self.user = User.objects.create_user(email="jwt@example.com", password="testpass123")
+        self.token = str(AccessToken.for_user(self.user))
+        self.factory = APIRequestFactory()
+
+    def _authenticate(self):
+        from .authentication import CachedJWTAuthentication
+
+        request = self.factory.get("/api/dummy/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return CachedJWTAuthentication().authenticate(request)
+
+    def test_second_request_skips_user_lookup(self):
+        with self.assertNumQueries(1):
+            user, _ = self._authenticate()
+        with self.assertNumQueries(0):
+            cached_user, validated_token = self._authenticate()
+        self.assertEqual(cached_user.pk, user.pk)
+        self.assertEqual(validated_token["user_id"], str(self.user.pk))
+
+    def test_deactivation_invalidates_cached_user(self):
+        from rest_framework.exceptions import AuthenticationFailed
+
+        self._authenticate()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_membership_change_reloads_user(self):
+        self._authenticate()
+        company = Company.objects.create(edrpou="30000001", name="Jwt Co")
+        role = Role.objects.create(company=company, name="Role-jwt")
+        CompanyUser.objects.create(user=self.user, company=company, role=role)
+        with self.assertNumQueries(1):
+            self._authenticate()
+
+
+@override_settings(REALTIME_CONSUMER_HIGH_WATER=2, REALTIME_CONSUMER_MAX_BUFFER=3)
+class BufferedSendMixinTests(SimpleTestCase):
+    def _consumer(self):
+        from .consumers import TenderRealtimeConsumer
+
+        consumer = TenderRealtimeConsumer()
+        consumer._init_outbox()
+        consumer.sent = []
+        consumer.closed_with = None
+        consumer.release = None
+
+        async def send_json(message):
+            await consumer.release.wait()
+            consumer.sent.append(message)
+
+        async def close(code=None):
+            consumer.closed_with = code
+
+        consumer.send_json = send_json
+        consumer.close = close
+        return consumer
+
+    def test_merges_proposal_events_past_high_water_mark(self):
+        from . import consumers
+
+        consumers.reset_backpressure_metrics()
+        consumer = self._consumer()
+
+        async def scenario():
+            consumer.release = asyncio.Event()
+            await consumer._enqueue_event({"event": "tender.updated", "payload": {}, "seq": 1})
+            await asyncio.sleep(0)
+            for seq, proposal_id in ((2, 10), (3, 11), (4, 12), (5, 13)):
+                await consumer._enqueue_event(
+                    {"event": "proposal.submitted_at.updated", "payload": {"proposal_id": proposal_id}, "seq": seq}
+                )
+            consumer.release.set()
+            while consumer._outbox_writer is not None:
+                await asyncio.sleep(0)
+
+        async_to_sync(scenario)()
+        self.assertIsNone(consumer.closed_with)
+        self.assertEqual([message["seq"] for message in consumer.sent], [1, 2, 5])
+        self.assertEqual(consumer.sent[2]["merged_seqs"], [3, 4, 5])
+        self.assertEqual(consumer.sent[2]["payload"]["proposal_ids"], [11, 12, 13])
+        self.assertEqual(consumers.get_backpressure_metrics()["events_merged"], 2)
+
+    def test_closes_with_resync_code_when_buffer_is_full(self):
+        from . import consumers
+
+        consumers.reset_backpressure_metrics()
+        consumer = self._consumer()
+
+        async def scenario():
+            consumer.release = asyncio.Event()
+            for seq in range(1, 6):
+                await consumer._enqueue_event({"event": "tender.updated", "payload": {}, "seq": seq})
+            consumer._stop_outbox()
+
+        async_to_sync(scenario)()
+        self.assertEqual(consumer.closed_with, consumers.RESYNC_CLOSE_CODE)
+        metrics = consumers.get_backpressure_metrics()
+        self.assertEqual(metrics["slow_consumers_closed"], 1)
+        self.assertGreaterEqual(metrics["events_dropped"], 3)
+
+
+class OnlineAuctionTestCase(TenderTestCase):
+    """Procurement online auction with two positions and three bidding suppliers."""
+
+    POSITIONS = 2
+    SUPPLIERS = 3
+
+    def setUp(self):
+        currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+        unit, _ = UnitOfMeasure.objects.get_or_create(name_ua="шт")
+        self.owner_company = Company.objects.create(edrpou="40000000", name="Auction owner")
+        self.owner = User.objects.create_user(email="auction-owner@example.com", password="testpass123")
+        CompanyUser.objects.create(
+            user=self.owner,
+            company=self.owner_company,
+            role=Role.objects.create(company=self.owner_company, name="Role-auction-owner"),
+            status=CompanyUser.Status.APPROVED,
+        )
+        self.tender = ProcurementTender.objects.create(
+            company=self.owner_company,
+            name="Auction",
+            currency=currency,
+            conduct_type="online_auction",
+            stage="acceptance",
+        )
+        self.positions = [
+            ProcurementTenderPosition.objects.create(
+                tender=self.tender,
+                nomenclature=Nomenclature.objects.create(
+                    company=self.owner_company, name=f"Item {index}", unit=unit
+                ),
+                start_price=1000,
+                min_bid_step=10,
+                max_bid_step=100,
+            )
+            for index in range(self.POSITIONS)
+        ]
+        self.bidders = []
+        for index in range(self.SUPPLIERS):
+            company = Company.objects.create(edrpou=f"4000010{index}", name=f"Supplier {index}")
+            user = User.objects.create_user(email=f"bidder{index}@example.com", password="testpass123")
+            role = Role.objects.create(company=company, name=f"Role-bidder-{index}")
+            CompanyUser.objects.create(
+                user=user, company=company, role=role, status=CompanyUser.Status.APPROVED
+            )
+            proposal = TenderProposal.objects.create(
+                tender=self.tender, supplier_company=company, created_by=user
+            )
+            self.bidders.append((user, company, proposal))
+
+    def bid(self, bidder_index, prices, **extra):
+        user, _, proposal = self.bidders[bidder_index]
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(
+            f"/api/procurement-tenders/{self.tender.id}/proposals/{proposal.id}/position-values/",
+            {
+                "position_values": [
+                    {"tender_position_id": position.id, "price": str(price)}
+                    for position, price in zip(self.positions, prices)
+                    if price is not None
+                ]
+            },
+            format="json",
+            **extra,
+        )
+
+
+class AuctionLeaderboardTests(OnlineAuctionTestCase):
+    def test_bids_update_state_and_publish_leaderboard_with_ranks(self):
+        with mock.patch("core.views.publish_tender_event") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.bid(0, [990, 950]).status_code, 200)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.bid(1, [970]).status_code, 200)
+
+        first_position, second_position = self.positions
+        state = TenderAuctionPositionState.objects.get(tender_position_id=first_position.id)
+        self.assertEqual((state.best_price, state.bid_count, state.version), (970, 2, 2))
+        self.assertEqual(state.best_proposal_id, self.bidders[1][2].id)
+        leaderboard_calls = [call.args for call in publish.call_args_list if call.args[2] == "leaderboard.updated"]
+        self.assertEqual(len(leaderboard_calls), 2)
+        self.assertEqual(
+            [row["position_id"] for row in leaderboard_calls[0][3]["positions"]],
+            [first_position.id, second_position.id],
+        )
+        latest = leaderboard_calls[1][3]["positions"]
+        self.assertEqual(latest[0]["best_price"], "970.0000")
+        self.assertEqual(
+            latest[0]["ranks"],
+            [
+                {"supplier_company_id": self.bidders[1][1].id, "rank": 1},
+                {"supplier_company_id": self.bidders[0][1].id, "rank": 2},
+            ],
+        )
+
+    def test_price_range_is_validated_against_state_row(self):
+        self.assertEqual(self.bid(0, [990]).status_code, 200)
+        first_position = self.positions[0]
+        # The allowed range follows the state row, not a scan of submitted prices.
+        TenderAuctionPositionState.objects.filter(tender_position_id=first_position.id).update(best_price=900)
+        self.assertEqual(self.bid(1, [980]).status_code, 400)
+        self.assertEqual(self.bid(1, [890]).status_code, 200)
+        state = TenderAuctionPositionState.objects.get(tender_position_id=first_position.id)
+        self.assertEqual((state.best_price, state.best_proposal_id), (890, self.bidders[1][2].id))
+
+    def test_validation_query_count_does_not_grow_with_bids(self):
+        captured = []
+        price = 1000
+        for _round in range(3):
+            for bidder_index in range(self.SUPPLIERS):
+                price -= 10
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.bid(bidder_index, [price]).status_code, 200)
+                captured.append(len(queries))
+        # Repeat bids (updates) cost the same however many prices are already on the position.
+        self.assertEqual(captured[-1], captured[-1 - self.SUPPLIERS])
+
+    def test_rejected_bid_writes_nothing(self):
+        response = self.bid(0, [990, 800])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["tender_position_id"], self.positions[1].id)
+        self.assertFalse(TenderProposalPosition.objects.filter(proposal=self.bidders[0][2]).exists())
+
+    def test_consumer_keeps_only_viewer_rank_for_participants(self):
+        from .consumers import _filter_payload_for_audience
+
+        payload = {
+            "positions": [
+                {
+                    "position_id": 1,
+                    "best_price": "970.0000",
+                    "bid_count": 2,
+                    "ranks": [{"supplier_company_id": 5, "rank": 1}, {"supplier_company_id": 6, "rank": 2}],
+                }
+            ]
+        }
+        participant = _filter_payload_for_audience(
+            payload, delta_mode=False, audience={"is_owner": False, "company_ids": frozenset({6})}
+        )
+        self.assertEqual(
+            participant["positions"],
+            [{"position_id": 1, "best_price": "970.0000", "bid_count": 2, "my_rank": 2}],
+        )
+        owner = _filter_payload_for_audience(
+            payload, delta_mode=False, audience={"is_owner": True, "company_ids": frozenset({1})}
+        )
+        self.assertEqual(len(owner["positions"][0]["ranks"]), 2)
+        self.assertIsNone(owner["positions"][0]["my_rank"])
+
+
+class ProposalPositionValuesBatchTests(TenderTestCase):
+    # Whole request, including auth checks and the serialized response.
+    QUERY_BUDGET = 20
+
+    def setUp(self):
+        self.currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+        self.unit, _ = UnitOfMeasure.objects.get_or_create(name_ua="шт")
+        self.owner_company = Company.objects.create(edrpou="41000000", name="Batch owner")
+        self.owner = User.objects.create_user(email="batch-owner@example.com", password="testpass123")
+        CompanyUser.objects.create(
+            user=self.owner,
+            company=self.owner_company,
+            role=Role.objects.create(company=self.owner_company, name="Role-batch-owner"),
+            status=CompanyUser.Status.APPROVED,
+        )
+        self.supplier_company = Company.objects.create(edrpou="41000001", name="Batch supplier")
+        self.supplier = User.objects.create_user(email="batch-supplier@example.com", password="testpass123")
+        CompanyUser.objects.create(
+            user=self.supplier,
+            company=self.supplier_company,
+            role=Role.objects.create(company=self.supplier_company, name="Role-batch-supplier"),
+            status=CompanyUser.Status.APPROVED,
+        )
+        self.nomenclature_seq = 0
+
+    def _tender(self, *, is_sales, positions, stage="acceptance"):
+        tender_model, position_model, proposal_model = (
+            (SalesTender, SalesTenderPosition, SalesTenderProposal)
+            if is_sales
+            else (ProcurementTender, ProcurementTenderPosition, TenderProposal)
+        )
+        tender = tender_model.objects.create(
+            company=self.owner_company, name="Batch", currency=self.currency, stage=stage
+        )
+        tender_positions = []
+        for _ in range(positions):
+            self.nomenclature_seq += 1
+            nomenclature = Nomenclature.objects.create(
+                company=self.owner_company, name=f"Batch item {self.nomenclature_seq}", unit=self.unit
+            )
+            tender_positions.append(position_model.objects.create(tender=tender, nomenclature=nomenclature))
+        proposal = proposal_model.objects.create(
+            tender=tender, supplier_company=self.supplier_company, created_by=self.supplier
+        )
+        return tender, tender_positions, proposal
+
+    def _save(self, *, is_sales, tender, positions, proposal, price, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.supplier)
+        prefix = "sales-tenders" if is_sales else "procurement-tenders"
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                f"/api/{prefix}/{tender.id}/proposals/{proposal.id}/position-values/",
+                {
+                    "position_values": [
+                        {"tender_position_id": position.id, "price": str(price), "criterion_values": {"1": "yes"}}
+                        for position in positions
+                    ]
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_positions(self):
+        for is_sales in (False, True):
+            with self.subTest(is_sales=is_sales):
+                counts = {}
+                for size in (3, 30):
+                    tender, positions, proposal = self._tender(is_sales=is_sales, positions=size)
+                    created = self._save(
+                        is_sales=is_sales, tender=tender, positions=positions, proposal=proposal, price=100
+                    )
+                    updated = self._save(
+                        is_sales=is_sales, tender=tender, positions=positions, proposal=proposal, price=90
+                    )
+                    counts[size] = (created, updated)
+                    self.assertEqual(proposal.position_values.filter(price=90).count(), size)
+                self.assertEqual(counts[3], counts[30])
+                self.assertLessEqual(max(counts[30]), self.QUERY_BUDGET)
+
+    def test_owner_decision_stage_edits_are_change_logged(self):
+        tender, positions, proposal = self._tender(is_sales=False, positions=3)
+        self._save(is_sales=False, tender=tender, positions=positions, proposal=proposal, price=100)
+        tender.stage = ProcurementTender.Stage.DECISION
+        tender.save(update_fields=["stage"])
+        for price in (95, 90):
+            self._save(
+                is_sales=False, tender=tender, positions=positions, proposal=proposal, price=price, user=self.owner
+            )
+        entries = TenderProposalChangeLog.objects.filter(proposal_id=proposal.id)
+        self.assertEqual(entries.count(), 3)
+        self.assertEqual({(entry.original_price, entry.current_price) for entry in entries}, {(100, 90)})
+
+
+class BidRetrySafetyTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def post_values(self, bidder_index, position_values, **extra):
+        user, _, proposal = self.bidders[bidder_index]
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(
+            f"/api/procurement-tenders/{self.tender.id}/proposals/{proposal.id}/position-values/",
+            {"position_values": position_values},
+            format="json",
+            **extra,
+        )
+
+    def test_retry_with_same_idempotency_key_replays_response(self):
+        first = self.bid(0, [990, 950], HTTP_IDEMPOTENCY_KEY="bid-1")
+        retry = self.bid(0, [990, 950], HTTP_IDEMPOTENCY_KEY="bid-1")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(TenderBidHistory.objects.filter(tender_id=self.tender.id).count(), 2)
+        self.assertEqual(self.bid(0, [980, 940], HTTP_IDEMPOTENCY_KEY="bid-2").status_code, 200)
+        self.assertEqual(TenderBidHistory.objects.filter(tender_id=self.tender.id).count(), 4)
+
+    def test_idempotency_key_is_scoped_to_payload_and_user(self):
+        self.assertEqual(self.bid(0, [990], HTTP_IDEMPOTENCY_KEY="shared").status_code, 200)
+        self.assertEqual(self.bid(0, [980], HTTP_IDEMPOTENCY_KEY="shared").status_code, 422)
+        self.assertEqual(self.bid(1, [980], HTTP_IDEMPOTENCY_KEY="shared").status_code, 200)
+
+    @override_settings(IDEMPOTENCY_PENDING_TTL_SECONDS=1)
+    def test_pending_claim_is_renewed_while_the_bid_runs(self):
+        import hashlib
+
+        from . import views
+
+        user, _, proposal = self.bidders[0]
+        path = f"/api/procurement-tenders/{self.tender.id}/proposals/{proposal.id}/position-values/"
+        cache_key = "idempotency-v1:" + hashlib.sha256(f"{user.id}:POST:{path}:slow".encode()).hexdigest()
+        load_company_ids = views._user_company_ids
+        claim_seen = []
+
+        def slow_company_ids(request_user):
+            # Longer than the pending TTL: without renewal the claim would expire here.
+            time.sleep(1.6)
+            claim_seen.append(caches["default"].get(cache_key))
+            return load_company_ids(request_user)
+
+        with mock.patch.object(views, "_user_company_ids", side_effect=slow_company_ids):
+            self.assertEqual(self.bid(0, [990], HTTP_IDEMPOTENCY_KEY="slow").status_code, 200)
+        self.assertEqual(claim_seen[0]["status"], None)
+        stored = caches["default"].get(cache_key)
+        self.assertEqual(stored["status"], 200)
+        time.sleep(1.1)
+        # Renewals stop once the response is stored with the full TTL.
+        self.assertEqual(caches["default"].get(cache_key)["status"], 200)
+
+    def test_stale_version_is_rejected_with_conflict(self):
+        position = self.positions[0]
+        response = self.post_values(0, [{"tender_position_id": position.id, "price": "990", "version": 0}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["position_values"][0]["version"], 1)
+
+        stale = self.post_values(0, [{"tender_position_id": position.id, "price": "980", "version": 0}])
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.data["version"], 1)
+        self.assertEqual(TenderProposalPosition.objects.get(tender_position=position).price, 990)
+        self.assertEqual(TenderBidHistory.objects.filter(tender_id=self.tender.id).count(), 1)
+
+        current = self.post_values(0, [{"tender_position_id": position.id, "price": "980", "version": 1}])
+        self.assertEqual(current.status_code, 200)
+        self.assertEqual(current.data["position_values"][0]["version"], 2)
+
+
+class BenchBidsCommandTests(TenderTestCase):
+    def test_reports_metrics_and_removes_seeded_auction(self):
+        out = io.StringIO()
+        call_command("bench_bids", positions=2, suppliers=2, rounds=2, baseline="/nonexistent.json", stdout=out)
+        output = out.getvalue()
+        self.assertIn("requests=4 accepted=4 rejected=0 errors=0", output)
+        self.assertIn("p95", output)
+        self.assertIn("per bid", output)
+        self.assertFalse(ProcurementTender.objects.filter(name__startswith="Bench auction").exists())
+        self.assertFalse(User.objects.filter(email__startswith="bench-").exists())
+        self.assertFalse(TenderBidHistory.objects.exists())
+
+
+class BidHistoryEndpointTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        _, company, proposal = self.bidders[0]
+        start = timezone.now() - timedelta(minutes=30)
+        self.rows = []
+        for index in range(7):
+            row = TenderBidHistory.objects.create(
+                tender_type="procurement",
+                tender_id=self.tender.id,
+                proposal_id=proposal.id,
+                tender_position_id=self.positions[0].id,
+                supplier_company=company,
+                price=1000 - index * 10,
+            )
+            # Дві ставки на хвилину: 0-1, 2-3, 4-5, 6.
+            TenderBidHistory.objects.filter(id=row.id).update(
+                created_at=start + timedelta(minutes=index // 2, seconds=index % 2)
+            )
+            self.rows.append(row)
+
+    def get(self, **params):
+        return self.client.get(
+            f"/api/procurement-tenders/{self.tender.id}/bid-history/",
+            {"tender_position_id": self.positions[0].id, **params},
+        )
+
+    def test_default_response_is_full_list(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 7)
+
+    def test_cursor_mode_walks_pages_newest_first(self):
+        seen = []
+        params = {"cursor_mode": 1, "page_size": 3}
+        while True:
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["id"] for item in response.json()["results"])
+            if not response.json()["has_more"]:
+                break
+            params["cursor"] = response.json()["next_cursor"]
+        self.assertEqual(seen, [row.id for row in reversed(self.rows)])
+
+    def test_cursor_pages_cover_more_than_default_page(self):
+        # The acceptance-stage table follows next_cursor, so every bid past BID_HISTORY_PAGE_SIZE is shown.
+        _, company, proposal = self.bidders[1]
+        TenderBidHistory.objects.bulk_create(
+            TenderBidHistory(
+                tender_type="procurement",
+                tender_id=self.tender.id,
+                proposal_id=proposal.id,
+                tender_position_id=self.positions[0].id,
+                supplier_company=company,
+                price=500 - index,
+            )
+            for index in range(100)
+        )
+        first = self.get(cursor_mode=1).json()
+        self.assertEqual(len(first["results"]), 100)
+        self.assertTrue(first["has_more"])
+        rest = self.get(cursor_mode=1, cursor=first["next_cursor"]).json()
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(len(first["results"]) + len(rest["results"]), 107)
+
+    def test_since_id_returns_only_newer_bids_in_order(self):
+        response = self.get(since_id=self.rows[4].id)
+        self.assertEqual([item["id"] for item in response.json()["results"]], [self.rows[5].id, self.rows[6].id])
+        self.assertEqual(response.json()["last_id"], self.rows[6].id)
+        self.assertFalse(response.json()["has_more"])
+        empty = self.get(since_id=self.rows[6].id)
+        self.assertEqual(empty.json()["results"], [])
+        self.assertEqual(empty.json()["last_id"], self.rows[6].id)
+
+    def test_series_mode_keeps_best_price_per_bucket(self):
+        response = self.get(mode="series", bucket="minute")
+        self.assertEqual(response.json()["bucket"], "minute")
+        self.assertEqual(
+            [(Decimal(point["best_price"]), point["bids"]) for point in response.json()["series"]],
+            [(990, 2), (970, 2), (950, 2), (940, 1)],
+        )
+
+        auto = self.get(mode="series", points=10)
+        self.assertEqual(auto.data["bucket"], "minute")
+        self.assertEqual(len(auto.data["series"]), 4)
+
+
+class StatusSyncConditionalGetTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def poll(self, user, **headers):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(
+            f"/api/procurement-tenders/{self.tender.id}/proposals/",
+            {"view": "status"},
+            **headers,
+        )
+
+    def test_unchanged_poll_gets_not_modified(self):
+        first = self.poll(self.owner)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json()), self.SUPPLIERS)
+        etag = first["ETag"]
+        self.assertEqual(first["Cache-Control"], "private, no-cache")
+
+        with mock.patch("core.views.TenderProposalStatusSerializer") as serializer:
+            again = self.poll(self.owner, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], etag)
+        serializer.assert_not_called()
+        self.assertEqual(self.poll(self.owner, HTTP_IF_NONE_MATCH=f"W/{etag}").status_code, 304)
+
+        proposal = self.bidders[0][2]
+        proposal.submitted_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.save(update_fields=["submitted_at", "status_updated_at"])
+        changed = self.poll(self.owner, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_etag_is_scoped_to_viewer(self):
+        owner_etag = self.poll(self.owner)["ETag"]
+        supplier = self.bidders[0][0]
+        response = self.poll(supplier, HTTP_IF_NONE_MATCH=owner_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()], [self.bidders[0][2].id])
+
+    def test_cached_delta_poll_revalidates_without_queries_on_proposals(self):
+        since = (timezone.now() - timedelta(hours=1)).isoformat()
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = f"/api/procurement-tenders/{self.tender.id}/proposals/"
+        first = client.get(url, {"view": "status", "updated_since": since})
+        self.assertEqual(first["X-Status-Sync-Cache"], "MISS")
+        with CaptureQueriesContext(connection) as queries:
+            again = client.get(
+                url, {"view": "status", "updated_since": since}, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["X-Status-Sync-Cache"], "HIT")
+        self.assertFalse(any("core_tenderproposal" in query["sql"] for query in queries))
+
+    def test_snapshot_is_shared_between_viewers_and_invalidated_on_save(self):
+        owner_poll = self.poll(self.owner)
+        self.assertEqual(owner_poll["X-Status-Sync-Cache"], "MISS")
+
+        supplier, _, own_proposal = self.bidders[1]
+        supplier_poll = self.poll(supplier)
+        self.assertEqual(supplier_poll["X-Status-Sync-Cache"], "HIT")
+        self.assertEqual([row["id"] for row in supplier_poll.json()], [own_proposal.id])
+
+        own_proposal.submitted_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            own_proposal.save(update_fields=["submitted_at", "status_updated_at"])
+        self.assertEqual(self.poll(supplier)["X-Status-Sync-Cache"], "MISS")
+        self.assertEqual(self.poll(self.owner)["X-Status-Sync-Cache"], "HIT")
+
+
+class AsyncReadFastPathTests(OnlineAuctionTestCase):
+    def get(self, path, user=None, **params):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        headers = {}
+        if user is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+        return APIClient().get(f"/api/procurement-tenders/{self.tender.id}/{path}/", params, **headers)
+
+    def test_participant_view_matches_sync_action(self):
+        supplier = self.bidders[0][0]
+        with mock.patch("core.views.ASYNC_READ_FAST_PATH", False):
+            expected = self.get("participant-view", supplier)
+        with mock.patch.object(
+            ProcurementTenderViewSet, "participant_view", side_effect=AssertionError("sync path")
+        ):
+            response = self.get("participant-view", supplier)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+
+    def test_status_sync_with_jwt_skips_sync_action(self):
+        with mock.patch.object(
+            ProcurementTenderViewSet, "proposals_list", side_effect=AssertionError("sync path")
+        ):
+            owner_rows = self.get("proposals", self.owner, view="status").json()
+            supplier_rows = self.get("proposals", self.bidders[2][0], view="status").json()
+        self.assertEqual(len(owner_rows), self.SUPPLIERS)
+        self.assertEqual([row["id"] for row in supplier_rows], [self.bidders[2][2].id])
+
+    def test_outsiders_and_missing_credentials_keep_sync_answers(self):
+        outsider = User.objects.create_user(email="outsider@example.com", password="testpass123")
+        self.assertEqual(self.get("proposals", outsider, view="status").status_code, 404)
+        self.assertEqual(self.get("participant-view", outsider).status_code, 404)
+        self.assertEqual(self.get("proposals", view="status").status_code, 401)
+        # Bid history is an owner/approver endpoint: suppliers go through get_object.
+        position_id = self.positions[0].id
+        self.assertEqual(
+            self.get("bid-history", self.bidders[0][0], tender_position_id=position_id).status_code,
+            404,
+        )
+        self.assertEqual(
+            self.get("bid-history", self.owner, tender_position_id=position_id).json(),
+            [],
+        )
+
+
+    def test_default_throttles_run_once_when_fast_path_falls_back(self):
+        calls = []
+
+        class CountingThrottle(BaseThrottle):
+            def allow_request(self, request, view):
+                calls.append(request.path)
+                return True
+
+        position_id = self.positions[0].id
+        with mock.patch.object(APIView, "throttle_classes", [CountingThrottle]):
+            # Suppliers are refused by the bid-history fast path and served by the sync action.
+            response = self.get("bid-history", self.bidders[0][0], tender_position_id=position_id)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(calls), 1)
+
+    def test_default_throttles_refusal_is_answered_on_async_path(self):
+        class RefusingThrottle(BaseThrottle):
+            def allow_request(self, request, view):
+                return False
+
+            def wait(self):
+                return 7
+
+        with mock.patch.object(APIView, "throttle_classes", [RefusingThrottle]), mock.patch.object(
+            ProcurementTenderViewSet, "proposals_list", side_effect=AssertionError("sync path")
+        ):
+            response = self.get("proposals", self.owner, view="status")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "7")
+
+
+class RateLimiterTests(TestCase):
+    def exhaust(self, store, key, limit=3):
+        return [store.consume(key, limit=limit, period=60).allowed for _ in range(limit + 1)]
+
+    def test_local_token_bucket_refills_over_time(self):
+        store = ratelimit.LocalTokenBucketStore()
+        self.assertEqual(self.exhaust(store, "k"), [True, True, True, False])
+        with mock.patch("core.ratelimit.time.monotonic", return_value=time.monotonic() + 20):
+            decision = store.consume("k", limit=3, period=60)
+        self.assertTrue(decision.allowed)
+        self.assertEqual(decision.remaining, 0)
+
+    def test_database_token_bucket_is_shared_through_rows(self):
+        store = ratelimit.DatabaseTokenBucketStore()
+        self.assertEqual(self.exhaust(store, "db-key"), [True, True, True, False])
+        denied = ratelimit.DatabaseTokenBucketStore().consume("db-key", limit=3, period=60)
+        self.assertFalse(denied.allowed)
+        self.assertEqual(denied.retry_after, 20)
+
+    def test_cache_sliding_window_has_no_burst_at_window_boundary(self):
+        caches["default"].clear()
+        store = ratelimit.CacheSlidingWindowStore("default")
+        window_end = (int(time.time() // 60) + 1) * 60
+        with mock.patch("core.ratelimit.time.time", return_value=window_end - 1):
+            self.assertEqual(self.exhaust(store, "c"), [True, True, True, False])
+        with mock.patch("core.ratelimit.time.time", return_value=window_end + 1):
+            # A fixed minute bucket would allow three more requests here.
+            decision = store.consume("c", limit=3, period=60)
+        self.assertFalse(decision.allowed)
+        self.assertGreaterEqual(decision.retry_after, 1)
+        with mock.patch("core.ratelimit.time.time", return_value=window_end + 30):
+            self.assertTrue(store.consume("c", limit=3, period=60).allowed)
+
+    def test_disabled_limit_and_store_outage_fail_open(self):
+        self.assertIsNone(ratelimit.consume_rate_limit("k", limit=0))
+        with mock.patch.object(
+            ratelimit, "get_rate_limit_store", side_effect=RuntimeError
+        ), self.assertLogs("core.ratelimit", "ERROR"):
+            self.assertIsNone(ratelimit.consume_rate_limit("k", limit=1))
+
+
+class BidSubmitThrottleTests(OnlineAuctionTestCase):
+    @override_settings(RATE_LIMIT_THROTTLE_RATES={"bid": 2})
+    def test_bids_get_429_after_bucket_drains_and_pass_after_refill(self):
+        with mock.patch.object(ratelimit, "_stores", {}):
+            self.assertEqual(self.bid(0, [900]).status_code, 200)
+            self.assertEqual(self.bid(0, [890]).status_code, 200)
+            throttled = self.bid(0, [880])
+            self.assertEqual(throttled.status_code, 429)
+            self.assertEqual(throttled["Retry-After"], "30")
+            # Another bidder has its own bucket.
+            self.assertEqual(self.bid(1, [870]).status_code, 200)
+            with mock.patch("core.ratelimit.time.monotonic", return_value=time.monotonic() + 30):
+                self.assertEqual(self.bid(0, [860]).status_code, 200)
+
+
+class StatusSyncTenderBudgetTests(OnlineAuctionTestCase):
+    def poll(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f"/api/procurement-tenders/{self.tender.id}/proposals/", {"view": "status"})
+
+    def test_tender_budget_is_shared_between_viewers(self):
+        with mock.patch.object(ratelimit, "_stores", {}), mock.patch(
+            "core.views.STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE", 2
+        ):
+            self.assertEqual(self.poll(self.owner).status_code, 200)
+            self.assertEqual(self.poll(self.bidders[0][0]).status_code, 200)
+            throttled = self.poll(self.bidders[1][0])
+        self.assertEqual(throttled.status_code, 429)
+        self.assertEqual(throttled["Retry-After"], "30")
+        self.assertEqual(throttled["X-Status-Sync-RateLimit-Remaining"], "119")
+
+
+@override_settings(STATUS_SYNC_CACHE_TTL_SECONDS=0)
+class StatusSyncLongPollTests(OnlineAuctionTestCase):
+    def poll(self, **params):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        headers = {}
+        if "etag" in params:
+            headers["HTTP_IF_NONE_MATCH"] = params.pop("etag")
+        return client.get(
+            f"/api/procurement-tenders/{self.tender.id}/proposals/",
+            {"view": "status", **params},
+            **headers,
+        )
+
+    def test_waiter_is_woken_by_publish(self):
+        async def run():
+            async with realtime.TenderEventWaiter("procurement", self.tender.id) as waiter:
+                self.assertFalse(await waiter.wait(0.05))
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    None,
+                    realtime.publish_tender_event,
+                    "procurement",
+                    self.tender.id,
+                    "proposal.submitted",
+                    {},
+                )
+                return await waiter.wait(5)
+
+        with mock.patch.object(realtime, "get_channel_layer", None), mock.patch.object(
+            realtime, "_send_tender_event"
+        ):
+            self.assertTrue(async_to_sync(run)())
+        self.assertNotIn(("procurement", self.tender.id), realtime._event_waiters)
+
+    def test_unchanged_long_poll_times_out_with_not_modified(self):
+        etag = self.poll()["ETag"]
+        started = time.monotonic()
+        response = self.poll(wait="0.2", etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(self.poll(wait="0.2")["ETag"], etag)
+
+    def test_long_poll_returns_changed_rows_after_event(self):
+        since = timezone.now().isoformat()
+        proposal = self.bidders[0][2]
+
+        def submit():
+            proposal.submitted_at = timezone.now()
+            proposal.save(update_fields=["submitted_at", "status_updated_at"])
+
+        async def woken(waiter, timeout):
+            await sync_to_async(submit)()
+            return True
+
+        with mock.patch.object(realtime.TenderEventWaiter, "wait", woken):
+            response = self.poll(wait="20", updated_since=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()], [proposal.id])
+        self.assertIn("X-Status-Sync-RateLimit-Remaining", response)
+
+
+class TenderJournalSummaryTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def summary(self, tender=None):
+        return TenderJournalSummary.objects.get(
+            tender_type="procurement", tender_id=(tender or self.tender).id
+        )
+
+    def submit(self, bidder_index, prices):
+        _, _, proposal = self.bidders[bidder_index]
+        for position, price in zip(self.positions, prices):
+            if price is not None:
+                TenderProposalPosition.objects.create(proposal=proposal, tender_position=position, price=price)
+        proposal.submitted_at = timezone.now()
+        proposal.save(update_fields=["submitted_at", "status_updated_at"])
+
+    def journal_row(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get("/api/procurement-tenders/", {"status": "all"})
+        self.assertEqual(response.status_code, 200)
+        return next(row for row in response.json()["results"] if row["id"] == self.tender.id)
+
+    def test_write_paths_mark_summary_stale_and_journal_read_repairs_it(self):
+        refresh_tender_journal_summaries("procurement", [self.tender.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(0, [900, 800])
+            self.submit(1, [1000, None])
+            first_position = self.positions[0]
+            first_position.winner_proposal = self.bidders[0][2]
+            first_position.save()
+        self.assertTrue(self.summary().is_stale)
+
+        ProcurementTender.objects.filter(pk=self.tender.pk).update(stage="completed")
+        row = self.journal_row()
+        self.assertEqual((row["total_amount"], row["economy_amount"]), ("900.00", "850.00"))
+        self.assertEqual(row["decision_label"], "З переможцем")
+
+        summary = self.summary()
+        self.assertFalse(summary.is_stale)
+        self.assertEqual(summary.winners_count, 1)
+        self.assertEqual(summary.total_amount, Decimal("900"))
+        self.assertEqual(summary.market_total_amount, Decimal("1750"))
+        self.assertTrue(summary.has_submitted_position_prices)
+        self.assertFalse(summary.has_next_tour)
+
+    def test_position_writes_cost_one_update_per_row(self):
+        refresh_tender_journal_summaries("procurement", [self.tender.id])
+        position = self.positions[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(10):
+                    position.save()
+        journal_queries = [query for query in queries if "core_tenderjournalsummary" in query["sql"]]
+        self.assertEqual(len(journal_queries), 10)
+        self.assertTrue(all(query["sql"].startswith("UPDATE") for query in journal_queries))
+
+    def test_bid_marks_summary_stale_and_journal_read_repairs_it(self):
+        proposal = self.bidders[0][2]
+        proposal.submitted_at = timezone.now()
+        proposal.save(update_fields=["submitted_at", "status_updated_at"])
+        refresh_tender_journal_summaries("procurement", [self.tender.id])
+        self.assertFalse(self.summary().has_submitted_position_prices)
+
+        self.assertEqual(self.bid(0, [990, 950]).status_code, 200)
+        self.assertTrue(self.summary().is_stale)
+
+        ProcurementTender.objects.filter(pk=self.tender.pk).update(stage="completed")
+        self.assertEqual(self.journal_row()["total_amount"], "0.00")
+        summary = self.summary()
+        self.assertFalse(summary.is_stale)
+        self.assertEqual(summary.market_total_amount, Decimal("1940"))
+
+    def test_refresh_does_not_overwrite_newer_change(self):
+        refresh_tender_journal_summaries("procurement", [self.tender.id])
+        compute = journal_summary.compute_tender_journal_metrics
+
+        def compute_then_change(tender_type, tender_ids):
+            metrics = compute(tender_type, tender_ids)
+            mark_tender_journal_summaries_stale(tender_type, tender_ids)
+            return metrics
+
+        mark_tender_journal_summaries_stale("procurement", [self.tender.id])
+        with mock.patch.object(journal_summary, "compute_tender_journal_metrics", compute_then_change):
+            refresh_tender_journal_summaries("procurement", [self.tender.id])
+        self.assertTrue(self.summary().is_stale)
+
+    def test_next_tour_delete_and_rebuild_command(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            next_tour = ProcurementTender.objects.create(
+                company=self.owner_company,
+                parent=self.tender,
+                tour_number=2,
+                name="Auction, tour 2",
+                currency=self.tender.currency,
+            )
+        self.assertTrue(self.summary().has_next_tour)
+
+        TenderJournalSummary.objects.all().delete()
+        call_command("rebuild_tender_journal_summaries", tender_type="procurement", stdout=io.StringIO())
+        self.assertTrue(self.summary().has_next_tour)
+        self.assertFalse(self.summary(next_tour).is_stale)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            next_tour.delete()
+        self.assertFalse(self.summary().has_next_tour)
+        self.assertFalse(
+            TenderJournalSummary.objects.filter(tender_type="procurement", tender_id=next_tour.id).exists()
+        )
+
+
+class OwnerJournalPaginationTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        for index in range(4):
+            ProcurementTender.objects.create(
+                company=self.owner_company,
+                name=f"Journal {index}",
+                currency=self.tender.currency,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def journal(self, **params):
+        response = self.client.get("/api/procurement-tenders/", {"status": "all", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages_match_offset_pages(self):
+        offset_ids = []
+        for page in (1, 2, 3):
+            offset_ids += [row["id"] for row in self.journal(page=page, page_size=2)["results"]]
+
+        cursor_ids = []
+        body = self.journal(cursor_mode=1, page_size=2)
+        self.assertIsNone(body["count"])
+        while True:
+            cursor_ids += [row["id"] for row in body["results"]]
+            if not body["has_more"]:
+                break
+            body = self.journal(cursor_mode=1, page_size=2, cursor=body["next_cursor"])
+
+        self.assertEqual(cursor_ids, offset_ids)
+        self.assertEqual(len(cursor_ids), 5)
+        self.assertEqual(self.journal(cursor_mode=1, with_count=1)["count"], 5)
+
+    def test_count_is_cached_per_filters_and_invalidated_by_tender_write(self):
+        def count_queries(**params):
+            with CaptureQueriesContext(connection) as queries:
+                body = self.journal(**params)
+            return body["count"], sum('"__count"' in query["sql"] for query in queries)
+
+        self.assertEqual(count_queries(), (5, 1))
+        self.assertEqual(count_queries(page=2, page_size=2), (5, 0))
+        self.assertEqual(count_queries(conduct_type="online_auction"), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProcurementTender.objects.create(
+                company=self.owner_company, name="Journal new", currency=self.tender.currency
+            )
+        self.assertEqual(count_queries(), (6, 1))
+
+
+class NameSearchIndexTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        unit = self.positions[0].nomenclature.unit
+        self.cable = Nomenclature.objects.create(company=self.owner_company, name="Кабель мідний ВВГ", unit=unit)
+        self.tie = Nomenclature.objects.create(company=self.owner_company, name="Cable tie", unit=unit)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def nomenclature_ids(self, name):
+        response = self.client.get("/api/nomenclatures/", {"name": name})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        rows = rows["results"] if isinstance(rows, dict) else rows
+        return {row["id"] for row in rows}
+
+    def test_normalization_folds_case_script_and_apostrophes(self):
+        self.assertEqual(search.normalize_search_text("М'ясо Кабель-ВВГ, Café"), "myaso kabel vvh cafe")
+        self.assertEqual(search.search_tokens("КАБ каб kab"), ["kab"])
+
+    def test_nomenclature_name_search_matches_word_prefixes_in_both_scripts(self):
+        self.assertEqual(self.nomenclature_ids("каб"), {self.cable.id})
+        self.assertEqual(self.nomenclature_ids("kabel mid"), {self.cable.id})
+        self.assertEqual(self.nomenclature_ids("мідн кабель"), {self.cable.id})
+        self.assertEqual(self.nomenclature_ids("cable"), {self.tie.id})
+        self.assertEqual(self.nomenclature_ids("бель"), set())
+
+        self.tie.name = "Стяжка кабельна"
+        self.tie.save()
+        self.assertEqual(self.nomenclature_ids("кабел"), {self.cable.id, self.tie.id})
+
+    def test_owner_journal_search_uses_index_and_tender_number(self):
+        def journal_ids(term):
+            response = self.client.get("/api/procurement-tenders/", {"status": "all", "search": term})
+            self.assertEqual(response.status_code, 200)
+            return [row["id"] for row in response.json()["results"]]
+
+        self.assertEqual(journal_ids("auct"), [self.tender.id])
+        self.assertEqual(journal_ids(str(self.tender.number)), [self.tender.id])
+        self.assertEqual(journal_ids("tender"), [])
+
+        if search.search_backend() == search.SEARCH_BACKEND_FTS5:
+            with CaptureQueriesContext(connection) as queries:
+                journal_ids("auct")
+            self.assertTrue(any(search.FTS5_TABLE in query["sql"] for query in queries))
+
+        tender_id = self.tender.id
+        self.tender.delete()
+        self.assertFalse(
+            SearchDocument.objects.filter(entity_type="procurement_tender", entity_id=tender_id).exists()
+        )
+
+    def test_disabled_index_falls_back_to_icontains(self):
+        with override_settings(SEARCH_FULLTEXT_INDEX=False):
+            self.assertEqual(self.nomenclature_ids("бель"), {self.cable.id})
+
+    def test_rebuild_command_restores_documents(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.nomenclature_ids("каб"), set())
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        self.assertEqual(self.nomenclature_ids("каб"), {self.cable.id})
+        self.assertEqual(
+            SearchDocument.objects.filter(entity_type="nomenclature").count(),
+            Nomenclature.objects.count(),
+        )
+
+
+class TenderParticipationStateTests(OnlineAuctionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def state(self, bidder_index):
+        return TenderParticipationState.objects.get(
+            tender_type="procurement",
+            tender_id=self.tender.id,
+            supplier_company=self.bidders[bidder_index][1],
+        )
+
+    def participation_ids(self, bidder_index, **params):
+        client = APIClient()
+        client.force_authenticate(self.bidders[bidder_index][0])
+        response = client.get("/api/procurement-tenders/for-participation/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def set_submitted(self, bidder_index, submitted):
+        proposal = self.bidders[bidder_index][2]
+        proposal.submitted_at = timezone.now() if submitted else None
+        proposal.save(update_fields=["submitted_at", "status_updated_at"])
+
+    def test_write_paths_maintain_flags(self):
+        self.assertTrue(self.state(0).has_proposal)
+        self.assertFalse(self.state(0).has_position_values)
+
+        self.assertEqual(self.bid(0, [990, 950]).status_code, 200)
+        self.assertTrue(self.state(0).has_position_values)
+        self.assertFalse(self.state(1).has_position_values)
+
+        self.set_submitted(0, True)
+        self.assertTrue(self.state(0).is_submitted)
+        self.set_submitted(0, False)
+        self.assertFalse(self.state(0).is_submitted)
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post(
+            f"/api/procurement-tenders/{self.tender.id}/fix-decision/",
+            {
+                "mode": "winner",
+                "position_winners": [
+                    {"position_id": self.positions[0].id, "proposal_id": self.bidders[0][2].id},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.state(0).is_winner)
+        self.assertFalse(self.state(1).is_winner)
+
+        proposal = self.bidders[2][2]
+        proposal.delete()
+        self.assertFalse(
+            TenderParticipationState.objects.filter(supplier_company=self.bidders[2][1]).exists()
+        )
+
+    def test_for_participation_filters_on_state_table(self):
+        self.set_submitted(0, True)
+        self.assertEqual(self.participation_ids(0, tab="active", submitted_only="true"), [self.tender.id])
+        self.assertEqual(self.participation_ids(1, tab="active", submitted_only="true"), [])
+        self.assertEqual(self.participation_ids(1, tab="active"), [self.tender.id])
+        self.assertEqual(
+            self.participation_ids(0, tab="active", participation_result="participation"), [self.tender.id]
+        )
+        self.assertEqual(self.participation_ids(0, tab="active", participation_result="win"), [])
+
+        self.positions[0].winner_proposal = self.bidders[0][2]
+        self.positions[0].save()
+        refresh_tender_participation_states("procurement", [self.tender.id])
+        self.assertEqual(self.participation_ids(0, tab="active", participation_result="win"), [self.tender.id])
+        self.assertEqual(self.participation_ids(0, tab="active", participation_result="participation"), [])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.participation_ids(0, tab="active", submitted_only="true")
+        self.assertFalse(any('"core_tenderproposal"' in query["sql"] for query in queries))
+
+    def test_removing_positions_refreshes_tender_once(self):
+        from .serializers import ProcurementTenderSerializer
+
+        self.assertEqual(self.bid(0, [990, 950]).status_code, 200)
+        self.assertTrue(self.state(0).has_position_values)
+        with CaptureQueriesContext(connection) as queries:
+            ProcurementTenderSerializer()._update_positions(self.tender, [])
+        self.assertFalse(self.state(0).has_position_values)
+        proposal_reads = [query for query in queries if query["sql"].startswith('SELECT "core_tenderproposal"."id"')]
+        self.assertEqual(len(proposal_reads), 1)
+
+    def test_rebuild_command_restores_rows(self):
+        self.assertEqual(self.bid(1, [990, None]).status_code, 200)
+        TenderParticipationState.objects.all().delete()
+        TenderParticipationState.objects.create(
+            tender_type="procurement", tender_id=999999, supplier_company=self.bidders[0][1]
+        )
+        call_command("rebuild_participation_states", stdout=io.StringIO())
+        self.assertEqual(TenderParticipationState.objects.count(), self.SUPPLIERS)
+        self.assertTrue(self.state(1).has_position_values)
+        self.assertFalse(self.state(0).has_position_values)
+
+
+class CpvClosureTests(TenderTestCase):
+    def setUp(self):
+        def cpv(code, level_code, parent_code):
+            return CpvDictionary.objects.create(
+                cpv_code=code, cpv_level_code=level_code, cpv_parent_code=parent_code, name_ua=code
+            )
+
+        self.root = cpv("03000000-1", "1", "0")
+        self.child = cpv("03100000-2", "1.1", "1")
+        self.leaf = cpv("03110000-5", "1.1.1", "1.1")
+        self.sibling = cpv("03200000-3", "1.2", "1")
+        self.other_root = cpv("09000000-3", "2", "0")
+
+    def test_expansion_matches_before_and_after_rebuild(self):
+        expected = {self.child.id, self.leaf.id}
+        self.assertEqual(set(expand_cpv_ids_with_descendants([self.child.id])), expected)
+
+        call_command("rebuild_cpv_closure", stdout=io.StringIO())
+        # root has itself plus 3 descendants, child 2, leaf/sibling/other root 1 each
+        self.assertEqual(CpvClosure.objects.count(), 9)
+        with self.assertNumQueries(2):
+            self.assertEqual(set(expand_cpv_ids_with_descendants([self.child.id])), expected)
+        self.assertEqual(
+            set(expand_cpv_ids_with_descendants([self.root.id, 999999])),
+            {self.root.id, self.child.id, self.leaf.id, self.sibling.id},
+        )
+
+    def test_tender_cpv_tree_includes_ancestors(self):
+        currency, _ = Currency.objects.get_or_create(code="UAH", defaults={"name": "Гривня"})
+        company = Company.objects.create(edrpou="42000000", name="CPV owner")
+        ProcurementTender.objects.create(company=company, name="CPV", currency=currency, cpv_category=self.leaf)
+        call_command("rebuild_cpv_closure", stdout=io.StringIO())
+
+        tree = _build_cpv_tree_for_tenders_queryset(ProcurementTender.objects.filter(company=company))
+        self.assertEqual([node["id"] for node in tree], [self.root.id])
+        self.assertEqual([node["id"] for node in tree[0]["children"]], [self.child.id])
+        self.assertEqual([node["id"] for node in tree[0]["children"][0]["children"]], [self.leaf.id])
+
+    def test_children_search_builds_hierarchy_without_level_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/cpv/children/", {"search": "03110000"})
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()
+        self.assertEqual(row["hierarchy_label"], "03000000-1 - 03000000-1 / 03100000-2 - 03100000-2 / 03110000-5 - 03110000-5")
+        self.assertEqual([node["id"] for node in row["hierarchy_path"]], [self.root.id, self.child.id, self.leaf.id])
+        self.assertFalse(row["has_children"])
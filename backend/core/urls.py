@@ -47,6 +47,12 @@ from .views import (
     password_reset_request,
     password_reset_confirm,
     password_change,
+    procurement_tender_bid_history,
+    procurement_tender_participant_view,
+    procurement_tender_proposals_list,
+    sales_tender_bid_history,
+    sales_tender_participant_view,
+    sales_tender_proposals_list,
 )
 
 router = DefaultRouter()
@@ -101,6 +107,14 @@ urlpatterns = [
     path("cpv/with-companies/", CpvWithCompaniesView.as_view(), name="cpv-with-companies"),
     # Company CPV settings for current user
     path("companies/current-cpvs/", company_current_cpvs, name="company_current_cpvs"),
+    # Async-вхід для частих читань тендера (status-sync з long-poll, bid-history,
+    # participant-view); решта запитів іде в ті самі actions viewset
+    path("procurement-tenders/<pk>/proposals/", procurement_tender_proposals_list),
+    path("sales-tenders/<pk>/proposals/", sales_tender_proposals_list),
+    path("procurement-tenders/<pk>/bid-history/", procurement_tender_bid_history),
+    path("sales-tenders/<pk>/bid-history/", sales_tender_bid_history),
+    path("procurement-tenders/<pk>/participant-view/", procurement_tender_participant_view),
+    path("sales-tenders/<pk>/participant-view/", sales_tender_participant_view),
     # Router viewsets
     path("", include(router.urls)),
 ]
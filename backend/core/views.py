@@ -1,5 +1,6 @@
 import base64
 import copy as pycopy
+import functools
 import hashlib
 import io
 import json
@@ -7,19 +8,25 @@ import logging
 import os
 import re
 import textwrap
+import threading
 import time
 from datetime import datetime
 from html import unescape
 from xml.sax.saxutils import escape as xml_escape
 
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.exceptions import (
+    AuthenticationFailed,
     ValidationError as DRFValidationError,
     PermissionDenied,
+    Throttled,
 )
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework.views import APIView
+from rest_framework.settings import api_settings as drf_api_settings
+from rest_framework.views import APIView, exception_handler as drf_exception_handler
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from decimal import Decimal, InvalidOperation
@@ -27,7 +34,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.password_validation import validate_password
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction, IntegrityError
 from django.db.models import (
@@ -35,18 +42,16 @@ from django.db.models import (
     Exists,
     OuterRef,
     Count,
+    Max,
+    Min,
     Avg,
-    Subquery,
-    DecimalField,
-    ExpressionWrapper,
     F,
-    Sum,
-    Value,
 )
-from django.db.models.functions import Coalesce
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute, TruncSecond
 from django.http import HttpResponse
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
@@ -88,6 +93,7 @@ from .models import (
     TenderChatThread,
     TenderChatMessage,
     TenderBidHistory,
+    TenderAuctionPositionState,
     TenderProposalChangeLog,
     Branch,
     Department,
@@ -185,32 +191,75 @@ from .serializers import (
     TenderProposalSerializer,
     TenderProposalStatusSerializer,
     TenderProposalPositionUpdateSerializer,
+    TenderProposalPositionDeltaSerializer,
     ProcurementTenderFileSerializer,
     SalesTenderSerializer,
     SalesTenderListSerializer,
     SalesParticipationTenderListSerializer,
     SalesTenderProposalSerializer,
     SalesTenderProposalStatusSerializer,
+    SalesTenderProposalPositionDeltaSerializer,
     SalesTenderFileSerializer,
     TenderApprovalJournalSerializer,
 )
-from .realtime import publish_tender_event
+from .authentication import CachedJWTAuthentication
+from .cpv_closure import cpv_ids_with_ancestors, expand_cpv_ids_with_descendants
+from .io_steps import IO, alist, arun_steps, run_steps
+from .journal_summary import (
+    attach_tender_journal_summaries,
+    get_cached_journal_count,
+    mark_tender_journal_summaries_stale,
+    schedule_tender_journal_summary_refresh,
+    store_journal_count,
+)
+from .participation_state import (
+    attach_participation_flags,
+    mark_participation_position_values,
+    participating_tender_ids,
+    refresh_tender_participation_states,
+)
+from .ratelimit import BidSubmitThrottle, aconsume_rate_limit, consume_rate_limit
+from .search import (
+    SEARCH_ENTITY_NOMENCLATURE,
+    SEARCH_ENTITY_PROCUREMENT_TENDER,
+    SEARCH_ENTITY_SALES_TENDER,
+    name_search_q,
+)
+from .realtime import (
+    AUCTION_LEADERBOARD_EVENT,
+    DeadlineFlusher,
+    aget_cached_user_company_ids,
+    get_cached_user_company_ids,
+    invalidate_tender_access,
+    publish_tender_event,
+    status_sync_snapshot_steps,
+    store_status_sync_snapshot_steps,
+    TenderEventWaiter,
+)
 
 User = get_user_model()
 status_sync_logger = logging.getLogger("core.status_sync")
-try:
-    STATUS_SYNC_CACHE_TTL_SECONDS = max(
-        0, int(getattr(settings, "STATUS_SYNC_CACHE_TTL_SECONDS", 2))
-    )
-except (TypeError, ValueError):
-    STATUS_SYNC_CACHE_TTL_SECONDS = 2
+idempotency_logger = logging.getLogger("core.idempotency")
 try:
     STATUS_SYNC_THROTTLE_PER_MINUTE = max(
         0, int(getattr(settings, "STATUS_SYNC_THROTTLE_PER_MINUTE", 120))
     )
 except (TypeError, ValueError):
     STATUS_SYNC_THROTTLE_PER_MINUTE = 120
+try:
+    STATUS_SYNC_LONG_POLL_MAX_SECONDS = max(
+        0.0, float(getattr(settings, "STATUS_SYNC_LONG_POLL_MAX_SECONDS", 25))
+    )
+except (TypeError, ValueError):
+    STATUS_SYNC_LONG_POLL_MAX_SECONDS = 25.0
+try:
+    STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE = max(
+        0, int(getattr(settings, "STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE", 6000))
+    )
+except (TypeError, ValueError):
+    STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE = 6000
 STATUS_SYNC_LOG_METRICS = bool(getattr(settings, "STATUS_SYNC_LOG_METRICS", False))
+ASYNC_READ_FAST_PATH = bool(getattr(settings, "ASYNC_READ_FAST_PATH", True))
 
 
 def _resolve_request_company_id(request):
@@ -541,7 +590,10 @@ def _filter_owner_tenders_qs_by_search(qs, search_value):
     if not term:
         return qs
 
-    filters = Q(name__icontains=term)
+    entity_type = (
+        SEARCH_ENTITY_SALES_TENDER if qs.model is SalesTender else SEARCH_ENTITY_PROCUREMENT_TENDER
+    )
+    filters = name_search_q(entity_type, term)
     number_tokens = []
     for raw in re.findall(r"\d+", term):
         try:
@@ -620,15 +672,52 @@ def _resolve_journal_deletable_ids(*, request, rows, is_sales):
     )
 
 
+def _owner_tender_journal_count(request, *, qs, tender_type, signature):
+    """
+    Кількість рядків журналу для сигнатури фільтрів. Кешується на рівні видимих
+    компаній користувача; записи тендерів компанії інвалідовують її лічильники.
+    """
+    user = request.user
+    company_ids = (
+        None
+        if user.is_superuser
+        else get_cached_user_company_ids(int(user.id), lambda: _user_company_ids(user))
+    )
+    total, versions = get_cached_journal_count(tender_type, company_ids=company_ids, signature=signature)
+    if total is None:
+        total = qs.count()
+        store_journal_count(
+            tender_type,
+            company_ids=company_ids,
+            signature=signature,
+            count=total,
+            versions=versions,
+        )
+    return total
+
+
 def _build_owner_tender_journal_response(
     request,
     *,
     qs,
     serializer_cls,
 ):
+    """
+    Журнал тендерів замовника. Сторінки по ``page`` (OFFSET) або, з ``cursor_mode=1``,
+    по ``cursor`` у порядку (-updated_at, -id): глибокі сторінки коштують як перша.
+    У режимі курсора ``count`` повертається лише з ``with_count=1``; сама кількість
+    кешується за сигнатурою фільтрів.
+    """
     page = _parse_int_param(request.query_params.get("page"), default=1, min_value=1)
     page_size = _parse_int_param(request.query_params.get("page_size"), default=20, min_value=1)
     page_size = min(page_size, 100)
+    cursor_mode = str(request.query_params.get("cursor_mode", "")).strip().lower() in ("1", "true", "yes")
+    cursor_token = (request.query_params.get("cursor") or "").strip()
+    with_count = not cursor_mode or str(request.query_params.get("with_count", "")).strip().lower() in (
+        "1",
+        "true",
+        "yes",
+    )
 
     status_filter = (request.query_params.get("status") or "active").strip().lower()
     if status_filter not in {"active", "completed", "all"}:
@@ -648,16 +737,20 @@ def _build_owner_tender_journal_response(
         qs = qs.filter(stage="completed")
     else:
         qs = qs.filter(stage__in=all_stage_values)
+    # Нормалізовані фільтри — ключ кешу кількості рядків.
+    signature = {"status": status_filter}
 
     stage_filter = (request.query_params.get("stage") or "").strip().lower()
     if status_filter in {"active", "all"} and stage_filter:
         allowed_stages = set(active_stages if status_filter == "active" else all_stage_values)
         if stage_filter in allowed_stages:
             qs = qs.filter(stage=stage_filter)
+            signature["stage"] = stage_filter
 
     search_value = (request.query_params.get("search") or "").strip()
     if search_value:
         qs = _filter_owner_tenders_qs_by_search(qs, search_value)
+        signature["search"] = search_value
 
     author_id = _parse_int_param(
         request.query_params.get("author_id"),
@@ -666,109 +759,55 @@ def _build_owner_tender_journal_response(
     )
     if author_id:
         qs = qs.filter(created_by_id=author_id)
+        signature["author_id"] = author_id
 
     branch_ids = [item for item in _parse_int_list_param(request.query_params.getlist("branch_ids")) if item > 0]
     if branch_ids:
         qs = qs.filter(branch_id__in=branch_ids)
+        signature["branch_ids"] = sorted(set(branch_ids))
 
     department_ids = [item for item in _parse_int_list_param(request.query_params.getlist("department_ids")) if item > 0]
     if department_ids:
         qs = qs.filter(department_id__in=department_ids)
+        signature["department_ids"] = sorted(set(department_ids))
 
     expense_ids = [item for item in _parse_int_list_param(request.query_params.getlist("expense_ids")) if item > 0]
     if expense_ids:
         qs = qs.filter(expense_article_id__in=expense_ids)
+        signature["expense_ids"] = sorted(set(expense_ids))
 
     conduct_type = (request.query_params.get("conduct_type") or "").strip().lower()
     if conduct_type in {"registration", "rfx", "online_auction"}:
         qs = qs.filter(conduct_type=conduct_type)
+        signature["conduct_type"] = conduct_type
 
-    total = qs.count()
-    total_pages = (total + page_size - 1) // page_size
-
-    # Journal metrics are computed in SQL to avoid per-row ORM queries in serializers.
-    amount_output_field = DecimalField(max_digits=24, decimal_places=4)
-    line_total_expr = ExpressionWrapper(
-        Coalesce(F("positions__quantity"), Value(Decimal("0")))
-        * Coalesce(F("positions__proposal_values__price"), Value(Decimal("0"))),
-        output_field=amount_output_field,
-    )
     is_sales_journal = qs.model is SalesTender
-    position_model = SalesTenderPosition if is_sales_journal else ProcurementTenderPosition
-    proposal_position_model = (
-        SalesTenderProposalPosition if is_sales_journal else TenderProposalPosition
-    )
-    submitted_position_prices_exists = proposal_position_model.objects.filter(
-        tender_position__tender_id=OuterRef("pk"),
-        proposal__submitted_at__isnull=False,
-        price__isnull=False,
-    )
-    avg_price_subquery = (
-        proposal_position_model.objects.filter(
-            tender_position_id=OuterRef("pk"),
-            proposal__submitted_at__isnull=False,
-            price__isnull=False,
-        )
-        .values("tender_position_id")
-        .annotate(avg_price=Avg("price"))
-        .values("avg_price")[:1]
+    tender_type = "sales" if is_sales_journal else "procurement"
+    total = (
+        _owner_tender_journal_count(request, qs=qs, tender_type=tender_type, signature=signature)
+        if with_count
+        else None
     )
-    market_total_subquery = (
-        position_model.objects.filter(tender_id=OuterRef("pk"))
-        .annotate(
-            avg_price=Subquery(avg_price_subquery, output_field=amount_output_field),
-            line_total=ExpressionWrapper(
-                Coalesce(F("quantity"), Value(Decimal("0")))
-                * Coalesce(F("avg_price"), Value(Decimal("0"))),
-                output_field=amount_output_field,
-            )
+    total_pages = (total + page_size - 1) // page_size if total is not None else None
+
+    if cursor_mode:
+        rows, next_cursor, has_more = _paginate_by_updated_cursor(
+            qs=qs,
+            cursor=cursor_token,
+            page_size=page_size,
         )
-        .values("tender_id")
-        .annotate(
-            total=Coalesce(
-                Sum("line_total", output_field=amount_output_field),
-                Value(Decimal("0")),
-                output_field=amount_output_field,
-            )
+    else:
+        start = (page - 1) * page_size
+        rows, next_cursor, has_more = _updated_cursor_page(
+            list(qs.order_by("-updated_at", "-id")[start : start + page_size + 1]),
+            page_size=page_size,
         )
-        .values("total")[:1]
-    )
-    qs = qs.annotate(
-        winners_count=Count(
-            "positions",
-            filter=Q(positions__winner_proposal__isnull=False),
-            distinct=True,
-        ),
-        total_amount=Coalesce(
-            Sum(
-                line_total_expr,
-                filter=Q(
-                    positions__winner_proposal_id=F(
-                        "positions__proposal_values__proposal_id"
-                    )
-                ),
-                output_field=amount_output_field,
-            ),
-            Value(Decimal("0")),
-            output_field=amount_output_field,
-        ),
-        market_total_amount=Coalesce(
-            Subquery(market_total_subquery, output_field=amount_output_field),
-            Value(Decimal("0")),
-            output_field=amount_output_field,
-        ),
-        has_submitted_position_prices=Exists(submitted_position_prices_exists),
-        has_next_tour=Exists(qs.model.objects.filter(parent_id=OuterRef("pk"))),
-    )
-    qs = qs.order_by("-updated_at", "-id")
-
-    start = (page - 1) * page_size
-    end = start + page_size
-    rows = list(qs[start:end])
+    # Метрики журналу читаються з TenderJournalSummary лише для рядків сторінки.
+    attach_tender_journal_summaries(rows, tender_type=tender_type)
     journal_deletable_ids = _resolve_journal_deletable_ids(
         request=request,
         rows=rows,
-        is_sales=qs.model is SalesTender,
+        is_sales=is_sales_journal,
     )
     serializer = serializer_cls(
         rows,
@@ -784,7 +823,8 @@ def _build_owner_tender_journal_response(
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "has_more": page < total_pages,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
             "results": serializer.data,
         }
     )
@@ -2308,26 +2348,6 @@ def _collect_active_approver_tasks(*, user, is_sales):
     return tasks
 
 
-def _build_status_sync_cache_key(
-    *,
-    kind: str,
-    tender_id: int,
-    user_id: int,
-    updated_since,
-):
-    raw = "|".join(
-        [
-            "status-sync-v1",
-            str(kind),
-            str(tender_id),
-            str(user_id),
-            str(updated_since.isoformat() if updated_since is not None else ""),
-        ]
-    )
-    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
-    return f"status-sync:{kind}:{tender_id}:{user_id}:{digest}"
-
-
 def _status_sync_log(event: str, **payload):
     if not STATUS_SYNC_LOG_METRICS:
         return
@@ -2335,65 +2355,245 @@ def _status_sync_log(event: str, **payload):
     status_sync_logger.info("status_sync event=%s %s", event, details)
 
 
-def _status_sync_rate_limit_key(*, kind: str, tender_id: int, actor_key: str, minute_bucket: int):
-    raw = f"status-sync-rate-v1|{kind}|{tender_id}|{actor_key}|{minute_bucket}"
-    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
-    return f"status-sync-rate:{digest}"
-
+def _status_sync_actor(*, request, user):
+    """(user_id, actor_key) глядача status-sync: користувач або IP для анонімних."""
+    if user is not None and user.is_authenticated:
+        return int(user.id), f"user:{int(user.id)}"
+    return None, f"ip:{str(request.META.get('REMOTE_ADDR') or 'unknown')}"
 
-def _enforce_status_sync_rate_limit(*, request, kind: str, tender_id: int):
-    if STATUS_SYNC_THROTTLE_PER_MINUTE <= 0:
-        return None, None
-
-    actor_key = "anon"
-    user_id = None
-    if request.user and request.user.is_authenticated:
-        user_id = int(request.user.id)
-        actor_key = f"user:{user_id}"
-    else:
-        actor_key = f"ip:{str(request.META.get('REMOTE_ADDR') or 'unknown')}"
-    now_ts = int(time.time())
-    minute_bucket = now_ts // 60
-    cache_key = _status_sync_rate_limit_key(
-        kind=kind,
-        tender_id=int(tender_id),
-        actor_key=actor_key,
-        minute_bucket=minute_bucket,
-    )
 
-    current = cache.get(cache_key)
-    if current is None:
-        cache.set(cache_key, 1, 65)
-        current = 1
-    else:
-        try:
-            current = cache.incr(cache_key)
-        except ValueError:
-            cache.set(cache_key, 1, 65)
-            current = 1
-    remaining = max(0, STATUS_SYNC_THROTTLE_PER_MINUTE - int(current))
-    if int(current) <= STATUS_SYNC_THROTTLE_PER_MINUTE:
+def _status_sync_throttle_result(*, kind, tender_id, user_id, actor_key, actor_decision, tender_decision):
+    """
+    Повертає (429-відповідь або None, залишок бюджету глядача або None) за рішеннями
+    лімітера для глядача і для тендера загалом.
+    """
+    decision = actor_decision
+    if tender_decision is not None and not tender_decision.allowed:
+        decision = tender_decision
+    remaining = actor_decision.remaining if actor_decision is not None else None
+    if decision is None or decision.allowed:
         return None, remaining
 
-    retry_after = max(1, 60 - (now_ts % 60))
     response = Response(
         {"detail": "Too many status sync requests. Please retry shortly."},
         status=status.HTTP_429_TOO_MANY_REQUESTS,
     )
-    response["Retry-After"] = str(retry_after)
-    response["X-Status-Sync-RateLimit-Limit"] = str(STATUS_SYNC_THROTTLE_PER_MINUTE)
-    response["X-Status-Sync-RateLimit-Remaining"] = "0"
+    response["Retry-After"] = str(decision.retry_after)
+    if actor_decision is not None:
+        response["X-Status-Sync-RateLimit-Limit"] = str(actor_decision.limit)
+        response["X-Status-Sync-RateLimit-Remaining"] = str(actor_decision.remaining)
     _status_sync_log(
         "throttle",
         kind=kind,
         tender_id=int(tender_id),
         user_id=user_id,
         actor=actor_key,
-        limit=STATUS_SYNC_THROTTLE_PER_MINUTE,
+        scope="actor" if decision is actor_decision else "tender",
+        limit=decision.limit,
     )
     return response, 0
 
 
+def _status_sync_rate_limit_steps(*, request, user, kind: str, tender_id: int):
+    """
+    Два бюджети status-sync: на глядача (користувач або IP) і спільний на тендер,
+    щоб багато глядачів одного тендера не перевантажували його разом.
+    Бюджет тендера витрачається лише тоді, коли глядач укладається у свій.
+    Кроки для run_steps/arun_steps (core.io_steps).
+    """
+    user_id, actor_key = _status_sync_actor(request=request, user=user)
+    actor_decision = yield IO(
+        consume_rate_limit,
+        aconsume_rate_limit,
+        f"status-sync:{kind}:{int(tender_id)}:{actor_key}",
+        limit=STATUS_SYNC_THROTTLE_PER_MINUTE,
+    )
+    tender_decision = None
+    if actor_decision is None or actor_decision.allowed:
+        tender_decision = yield IO(
+            consume_rate_limit,
+            aconsume_rate_limit,
+            f"status-sync:{kind}:{int(tender_id)}",
+            limit=STATUS_SYNC_TENDER_THROTTLE_PER_MINUTE,
+        )
+    return _status_sync_throttle_result(
+        kind=kind,
+        tender_id=tender_id,
+        user_id=user_id,
+        actor_key=actor_key,
+        actor_decision=actor_decision,
+        tender_decision=tender_decision,
+    )
+
+
+def _status_sync_etag(*, rows, kind: str, tender_id: int, user_id, updated_since, proposal_ids):
+    """
+    Версія відповіді status-sync для глядача: max(status_updated_at), кількість
+    і max(id) видимих рядків разом з параметрами запиту.
+    """
+    raw = "|".join(
+        [
+            "status-sync-etag-v2",
+            str(kind),
+            str(tender_id),
+            str(user_id or ""),
+            str(updated_since.isoformat() if updated_since is not None else ""),
+            ",".join(str(proposal_id) for proposal_id in sorted(proposal_ids)),
+            str(max((row[0] for row in rows if row[0]), default="") or ""),
+            str(len(rows)),
+            str(max((row[2]["id"] for row in rows), default="")),
+        ]
+    )
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _etag_matches_request(request, etag) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header or not etag:
+        return False
+    # Слабке порівняння (RFC 9110): проксі з gzip перетворюють ETag на W/"...".
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in parse_etags(header)}
+    return "*" in candidates or etag in candidates
+
+
+def _status_sync_rows_from_proposals(*, proposals, is_sales):
+    status_serializer_class = (
+        SalesTenderProposalStatusSerializer if is_sales else TenderProposalStatusSerializer
+    )
+    return [
+        (proposal.status_updated_at, proposal.supplier_company_id, data)
+        for proposal, data in zip(proposals, status_serializer_class(proposals, many=True).data)
+    ]
+
+
+def _status_sync_proposals_queryset(*, tender_id, is_sales):
+    proposal_model = SalesTenderProposal if is_sales else TenderProposal
+    return proposal_model.objects.filter(tender_id=int(tender_id)).select_related(
+        "supplier_company", "disqualified_by"
+    )
+
+
+def _status_sync_rows_steps(*, tender_id, is_sales):
+    """
+    Рядки статусів усіх пропозицій тендера: (status_updated_at, supplier_company_id, data).
+    Один знімок на тендер у спільному кеші обслуговує всіх глядачів протягом TTL;
+    версія знімка зростає при збереженні пропозиції (core.signals).
+    Кроки для run_steps/arun_steps, результат — (rows, cache_state).
+    """
+    kind = _tender_kind(is_sales)
+    rows, version = yield from status_sync_snapshot_steps(kind, int(tender_id))
+    if rows is not None:
+        return rows, "HIT"
+    proposals = yield IO(list, alist, _status_sync_proposals_queryset(tender_id=tender_id, is_sales=is_sales))
+    rows = _status_sync_rows_from_proposals(proposals=proposals, is_sales=is_sales)
+    yield from store_status_sync_snapshot_steps(kind, int(tender_id), version, rows)
+    return rows, "MISS" if version is not None else None
+
+
+def _status_sync_rows_response(
+    *,
+    request,
+    kind,
+    tender_id,
+    tender_company_id,
+    user_id,
+    company_ids,
+    rows,
+    cache_state,
+    updated_since,
+    proposal_ids,
+    rate_limit_remaining,
+):
+    """
+    Спільна частина sync- та async-шляху status-sync: зріз ``updated_since``,
+    ``ids`` та видимість пропозицій (ті самі правила, що й
+    _filter_tender_proposals_for_user) у пам'яті, ETag і 304.
+    """
+
+    def finish(response, event, *, etag=None, rows=0):
+        if etag:
+            response["ETag"] = etag
+            # Браузер зберігає відповідь, але щоразу перевіряє її через If-None-Match.
+            response["Cache-Control"] = "private, no-cache"
+            patch_vary_headers(response, ("Authorization",))
+        if cache_state:
+            response["X-Status-Sync-Cache"] = cache_state
+        if rate_limit_remaining is not None:
+            response["X-Status-Sync-RateLimit-Limit"] = str(STATUS_SYNC_THROTTLE_PER_MINUTE)
+            response["X-Status-Sync-RateLimit-Remaining"] = str(rate_limit_remaining)
+        _status_sync_log(event, kind=kind, tender_id=tender_id, user_id=user_id, rows=rows)
+        return response
+
+    if int(tender_company_id) not in company_ids:
+        rows = [row for row in rows if row[1] in company_ids]
+    if updated_since is not None:
+        rows = [row for row in rows if row[0] and row[0] > updated_since]
+    if proposal_ids:
+        wanted_ids = set(proposal_ids)
+        rows = [row for row in rows if row[2]["id"] in wanted_ids]
+    etag = _status_sync_etag(
+        rows=rows,
+        kind=kind,
+        tender_id=tender_id,
+        user_id=user_id,
+        updated_since=updated_since,
+        proposal_ids=proposal_ids,
+    )
+    if _etag_matches_request(request, etag):
+        return finish(Response(status=status.HTTP_304_NOT_MODIFIED), "not_modified", etag=etag)
+    data = [row[2] for row in rows]
+    return finish(
+        Response(data),
+        {"HIT": "cache_hit", "MISS": "cache_miss"}.get(cache_state, "no_cache"),
+        etag=etag,
+        rows=len(data),
+    )
+
+
+def _proposal_status_sync_response(*, request, tender, is_sales, updated_since, proposal_ids):
+    """
+    Відповідь ``proposals?view=status`` (закупівлі та продажі) поверх спільного
+    знімка тендера. Відповідь має ETag; запит з актуальним If-None-Match отримує 304.
+    """
+    kind = _tender_kind(is_sales)
+    tender_id = int(tender.id)
+    rate_limit_remaining = None
+    # Повторна перевірка в межах того самого long-poll запиту ліміт не витрачає.
+    if not getattr(request, "status_sync_recheck", False):
+        throttled_response, rate_limit_remaining = run_steps(
+            _status_sync_rate_limit_steps(
+                request=request,
+                user=request.user,
+                kind=kind,
+                tender_id=tender_id,
+            )
+        )
+        if throttled_response is not None:
+            return throttled_response
+    if not proposal_ids and "ids" in request.query_params:
+        return Response([])
+    user_id = int(request.user.id) if request.user and request.user.is_authenticated else None
+    rows, cache_state = run_steps(_status_sync_rows_steps(tender_id=tender.id, is_sales=is_sales))
+    company_ids = (
+        get_cached_user_company_ids(user_id, lambda: _user_company_ids(request.user))
+        if user_id is not None
+        else frozenset()
+    )
+    return _status_sync_rows_response(
+        request=request,
+        kind=kind,
+        tender_id=tender_id,
+        tender_company_id=tender.company_id,
+        user_id=user_id,
+        company_ids=company_ids,
+        rows=rows,
+        cache_state=cache_state,
+        updated_since=updated_since,
+        proposal_ids=proposal_ids,
+        rate_limit_remaining=rate_limit_remaining,
+    )
+
+
 def _encode_cursor_token(updated_at, object_id: int):
     if updated_at is None:
         return None
@@ -2422,27 +2622,38 @@ def _decode_cursor_token(raw_cursor):
         return None
 
 
-def _paginate_by_updated_cursor(*, qs, cursor, page_size: int):
+def _updated_cursor_queryset(*, qs, cursor, page_size: int, time_field: str = "updated_at"):
+    """Зріз сторінки (page_size + 1 рядків) після ``cursor`` у порядку (-time_field, -id)."""
     cursor_payload = _decode_cursor_token(cursor)
     if cursor_payload is not None:
         cursor_updated_at, cursor_object_id = cursor_payload
         qs = qs.filter(
-            Q(updated_at__lt=cursor_updated_at)
-            | (Q(updated_at=cursor_updated_at) & Q(id__lt=cursor_object_id))
+            Q(**{f"{time_field}__lt": cursor_updated_at})
+            | (Q(**{time_field: cursor_updated_at}) & Q(id__lt=cursor_object_id))
         )
-    rows = list(qs.order_by("-updated_at", "-id")[: page_size + 1])
+    return qs.order_by(f"-{time_field}", "-id")[: page_size + 1]
+
+
+def _updated_cursor_page(rows, *, page_size: int, time_field: str = "updated_at"):
     has_more = len(rows) > page_size
     rows = rows[:page_size]
     next_cursor = None
     if has_more and rows:
         last_item = rows[-1]
         next_cursor = _encode_cursor_token(
-            getattr(last_item, "updated_at", None),
+            getattr(last_item, time_field, None),
             int(getattr(last_item, "id", 0)),
         )
     return rows, next_cursor, has_more
 
 
+def _paginate_by_updated_cursor(*, qs, cursor, page_size: int, time_field: str = "updated_at"):
+    rows = list(
+        _updated_cursor_queryset(qs=qs, cursor=cursor, page_size=page_size, time_field=time_field)
+    )
+    return _updated_cursor_page(rows, page_size=page_size, time_field=time_field)
+
+
 def _create_tender_approval_journal_entry(
     *,
     action: str,
@@ -3119,13 +3330,15 @@ def _sync_tender_invited_suppliers(*, tender, supplier_company_ids, is_sales):
         ],
         ignore_conflicts=True,
     )
+    # bulk_create skips post_save, so drop cached websocket access explicitly.
+    invalidate_tender_access("sales" if is_sales else "procurement", tender.pk)
 
 
-def _get_tender_for_owner_or_participant(*, user, tender_id, is_sales):
+def _get_tender_for_owner_or_participant(*, user, tender_id, is_sales, user_company_ids=None):
     tender = _tender_detail_queryset(is_sales=is_sales).filter(pk=tender_id).first()
     if not tender:
         return None
-    user_company_ids = set(_user_company_ids(user))
+    user_company_ids = set(_user_company_ids(user) if user_company_ids is None else user_company_ids)
     if not user_company_ids:
         return None
     if int(tender.company_id) in user_company_ids:
@@ -3144,8 +3357,8 @@ def _get_tender_for_owner_or_participant(*, user, tender_id, is_sales):
     return tender if has_proposal else None
 
 
-def _filter_tender_proposals_for_user(*, qs, tender, user):
-    user_company_ids = set(_user_company_ids(user))
+def _filter_tender_proposals_for_user(*, qs, tender, user, user_company_ids=None):
+    user_company_ids = set(_user_company_ids(user) if user_company_ids is None else user_company_ids)
     is_owner = int(tender.company_id) in user_company_ids
     if is_owner:
         return qs, True
@@ -3315,123 +3528,465 @@ def _mark_tender_chat_thread_read(*, thread, is_owner):
     thread.save(update_fields=[field_name])
 
 
-def _record_tender_bid_history(
-    *,
-    tender,
-    is_sales,
-    proposal,
-    tender_position_id,
-    price,
-    actor,
-):
-    if getattr(tender, "conduct_type", "") != "online_auction":
-        return
-    TenderBidHistory.objects.create(
-        tender_type=_tender_kind(is_sales),
-        tender_id=int(tender.id),
-        proposal_id=int(proposal.id),
-        tender_position_id=int(tender_position_id),
-        supplier_company_id=proposal.supplier_company_id,
-        price=price,
-        created_by=actor,
+# Ставки мають власний бюджет (RATE_LIMIT_THROTTLE_RATES["bid"]) поверх глобальних тротлів.
+BID_THROTTLE_CLASSES = [*drf_api_settings.DEFAULT_THROTTLE_CLASSES, BidSubmitThrottle]
+BID_HISTORY_PAGE_SIZE = 100
+BID_HISTORY_MAX_PAGE_SIZE = 500
+BID_HISTORY_SERIES_POINTS = 200
+# Інтервали агрегації ряду ставок від найдрібнішого: (назва, секунд, функція).
+BID_HISTORY_SERIES_BUCKETS = (
+    ("second", 1, TruncSecond),
+    ("minute", 60, TruncMinute),
+    ("hour", 3600, TruncHour),
+    ("day", 86400, TruncDay),
+)
+
+
+def _build_tender_bid_history_series(*, qs, is_sales, bucket_name, points):
+    """
+    Ряд кращої ціни по інтервалах часу для графіка ставок. Агрегація виконується
+    в БД; без явного ``bucket`` обирається найдрібніший інтервал, що дає не більше ``points`` точок.
+    """
+    buckets = {name: (seconds, trunc) for name, seconds, trunc in BID_HISTORY_SERIES_BUCKETS}
+    if bucket_name not in buckets:
+        span = qs.order_by().aggregate(first=Min("created_at"), last=Max("created_at"))
+        span_seconds = (
+            (span["last"] - span["first"]).total_seconds() if span["first"] and span["last"] else 0
+        )
+        bucket_name = BID_HISTORY_SERIES_BUCKETS[-1][0]
+        for name, seconds, _ in BID_HISTORY_SERIES_BUCKETS:
+            if span_seconds / seconds < points:
+                bucket_name = name
+                break
+    trunc = buckets[bucket_name][1]
+    rows = (
+        qs.order_by()
+        .annotate(bucket=trunc("created_at"))
+        .values("bucket")
+        .annotate(best_price=Max("price") if is_sales else Min("price"), bids=Count("id"))
+        .order_by("bucket")
     )
+    return {
+        "bucket": bucket_name,
+        "series": [
+            {
+                "t": row["bucket"].isoformat() if row["bucket"] else None,
+                "best_price": str(row["best_price"]) if row["best_price"] is not None else None,
+                "bids": row["bids"],
+            }
+            for row in rows
+        ],
+    }
 
 
-def _record_tender_proposal_change_log(
-    *,
-    tender,
-    is_sales,
-    proposal,
-    tender_position_id,
-    original_price,
-    original_criterion_values,
-    current_price,
-    current_criterion_values,
-    actor,
-):
-    entry, created = TenderProposalChangeLog.objects.get_or_create(
+def _bid_history_request(*, params, tender_id, is_sales):
+    """
+    Розбір параметрів bid-history, спільний для sync- та async-шляху.
+    Повертає (400-відповідь або None, базовий queryset ставок позиції).
+    """
+    position_id = _parse_int_param(params.get("tender_position_id"), min_value=1)
+    if not position_id:
+        return (
+            Response(
+                {"detail": "Передайте tender_position_id."},
+                status=status.HTTP_400_BAD_REQUEST,
+            ),
+            None,
+        )
+    return None, TenderBidHistory.objects.filter(
         tender_type=_tender_kind(is_sales),
-        proposal_id=int(proposal.id),
-        tender_position_id=int(tender_position_id),
-        defaults={
-            "tender_id": int(tender.id),
-            "supplier_company_id": proposal.supplier_company_id,
-            "original_price": original_price,
-            "original_criterion_values": original_criterion_values or {},
-            "current_price": current_price,
-            "current_criterion_values": current_criterion_values or {},
-            "updated_by": actor,
-        },
-    )
-    if created:
-        return
-    entry.tender_id = int(tender.id)
-    entry.supplier_company_id = proposal.supplier_company_id
-    entry.current_price = current_price
-    entry.current_criterion_values = current_criterion_values or {}
-    entry.updated_by = actor
-    entry.save(
-        update_fields=[
-            "tender_id",
-            "supplier_company",
-            "current_price",
-            "current_criterion_values",
-            "updated_by",
-            "updated_at",
-        ]
+        tender_id=int(tender_id),
+        tender_position_id=position_id,
     )
 
 
-def _notify_tender_chat_message(*, tender, is_sales, thread, message, actor):
-    meta = _tender_document_meta(tender=tender, is_sales=is_sales)
-    meta.update(
-        {
-            "event": Notification.Type.CHAT_MESSAGE,
-            "chat_thread_id": int(thread.id),
-            "supplier_company_id": int(thread.supplier_company_id),
-        }
+def _bid_history_page_size(params):
+    return min(
+        _parse_int_param(
+            params.get("page_size"),
+            default=BID_HISTORY_PAGE_SIZE,
+            min_value=1,
+        ),
+        BID_HISTORY_MAX_PAGE_SIZE,
     )
-    title = "Нове повідомлення у чаті тендера"
-    body = str(getattr(message, "body", "") or "").strip()
-    if len(body) > 180:
-        body = f"{body[:177]}..."
 
-    recipients = []
-    if _user_represents_company(user=actor, company_id=getattr(tender, "company_id", None)):
-        recipients = list(
-            CompanyUser.objects.filter(
-                company_id=thread.supplier_company_id,
-                status=CompanyUser.Status.APPROVED,
+
+def _bid_history_is_cursor_mode(params):
+    return str(params.get("cursor_mode", "")).strip().lower() in ("1", "true", "yes")
+
+
+def _bid_history_delta_payload(rows, *, since_id, page_size):
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        "results": TenderBidHistorySerializer(rows, many=True).data,
+        "last_id": rows[-1].id if rows else since_id,
+        "has_more": has_more,
+    }
+
+
+def _bid_history_cursor_payload(rows, *, page_size):
+    rows, next_cursor, has_more = _updated_cursor_page(rows, page_size=page_size, time_field="created_at")
+    return {
+        "results": TenderBidHistorySerializer(rows, many=True).data,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        # Для наступних дельт через since_id.
+        "last_id": max((row.id for row in rows), default=None),
+    }
+
+
+def _tender_bid_history_response(*, request, tender, is_sales):
+    """
+    Історія ставок по позиції. Без параметрів режиму — повний список (як раніше);
+    ``cursor_mode=1`` — сторінки від нових до старих по (created_at, id) з ``cursor``;
+    ``since_id=N`` — лише ставки з id > N у порядку надходження (дельта для клієнта);
+    ``mode=series`` — ряд кращої ціни по інтервалах (``bucket``, ``points``) для графіка.
+    """
+    params = request.query_params
+    error_response, qs = _bid_history_request(params=params, tender_id=tender.id, is_sales=is_sales)
+    if error_response is not None:
+        return error_response
+    mode = str(params.get("mode", "")).strip().lower()
+    if mode == "series":
+        points = _parse_int_param(
+            params.get("points"),
+            default=BID_HISTORY_SERIES_POINTS,
+            min_value=1,
+        )
+        return Response(
+            _build_tender_bid_history_series(
+                qs=qs,
+                is_sales=is_sales,
+                bucket_name=str(params.get("bucket", "")).strip().lower(),
+                points=min(points, BID_HISTORY_MAX_PAGE_SIZE),
             )
-            .select_related("user")
-            .exclude(user_id=getattr(actor, "id", None))
         )
-    else:
-        author = getattr(tender, "created_by", None)
-        if author and getattr(author, "id", None) != getattr(actor, "id", None):
-            recipients = [type("Recipient", (), {"user": author})()]
 
-    for membership in recipients:
-        recipient_meta = _tender_document_meta(tender=tender, is_sales=is_sales)
-        if _user_represents_company(user=membership.user, company_id=thread.supplier_company_id):
-            recipient_meta["document_url"] = (
-                f"/cabinet/tenders/sales/proposals/{int(tender.id)}"
-                if is_sales
-                else f"/cabinet/tenders/proposals/{int(tender.id)}"
+    qs = qs.select_related("supplier_company", "created_by")
+    page_size = _bid_history_page_size(params)
+    since_id = params.get("since_id")
+    if since_id not in (None, ""):
+        since_id = _parse_int_param(since_id, default=0, min_value=0)
+        rows = list(qs.filter(id__gt=since_id).order_by("id")[: page_size + 1])
+        return Response(_bid_history_delta_payload(rows, since_id=since_id, page_size=page_size))
+
+    if _bid_history_is_cursor_mode(params):
+        rows = list(
+            _updated_cursor_queryset(
+                qs=qs,
+                cursor=(params.get("cursor") or "").strip(),
+                page_size=page_size,
+                time_field="created_at",
             )
-        recipient_meta.update(
-            {
-                "event": Notification.Type.CHAT_MESSAGE,
-                "chat_thread_id": int(thread.id),
-                "supplier_company_id": int(thread.supplier_company_id),
-            }
-        )
-        _create_notification(
-            user=membership.user,
-            notification_type=Notification.Type.CHAT_MESSAGE,
-            title=title,
-            body=body,
-            meta=recipient_meta,
+        )
+        return Response(_bid_history_cursor_payload(rows, page_size=page_size))
+
+    return Response(TenderBidHistorySerializer(qs, many=True).data)
+
+
+def _lock_auction_position_states(*, tender, is_sales, position_ids, proposal_position_model):
+    """
+    Заблокувати (SELECT ... FOR UPDATE) рядки стану аукціону по позиціях до
+    кінця транзакції: конкурентні ставки по позиції валідуються по черзі.
+    Для позицій без рядка стан один раз ініціалізується з поточних цін та історії ставок.
+    """
+    tender_kind = _tender_kind(is_sales)
+    position_ids = sorted({int(position_id) for position_id in position_ids})
+    # Стабільний порядок блокування — без взаємних блокувань між запитами.
+    locked_qs = (
+        TenderAuctionPositionState.objects.select_for_update()
+        .filter(tender_type=tender_kind, tender_position_id__in=position_ids)
+        .order_by("tender_position_id")
+    )
+    states = {state.tender_position_id: state for state in locked_qs}
+    missing_ids = [position_id for position_id in position_ids if position_id not in states]
+    if not missing_ids:
+        return states
+    best_rows = {}
+    for position_id, proposal_id, price in (
+        proposal_position_model.objects.filter(
+            tender_position_id__in=missing_ids,
+            price__isnull=False,
+        )
+        .order_by("tender_position_id", "-price" if is_sales else "price", "id")
+        .values_list("tender_position_id", "proposal_id", "price")
+    ):
+        best_rows.setdefault(position_id, (proposal_id, price))
+    bid_counts = dict(
+        TenderBidHistory.objects.filter(
+            tender_type=tender_kind,
+            tender_id=int(tender.id),
+            tender_position_id__in=missing_ids,
+        )
+        .order_by()
+        .values("tender_position_id")
+        .annotate(total=Count("id"))
+        .values_list("tender_position_id", "total")
+    )
+    TenderAuctionPositionState.objects.bulk_create(
+        [
+            TenderAuctionPositionState(
+                tender_type=tender_kind,
+                tender_id=int(tender.id),
+                tender_position_id=position_id,
+                best_proposal_id=best_rows[position_id][0] if position_id in best_rows else None,
+                best_price=best_rows[position_id][1] if position_id in best_rows else None,
+                bid_count=bid_counts.get(position_id, 0),
+            )
+            for position_id in missing_ids
+        ],
+        ignore_conflicts=True,
+    )
+    states.update(
+        {state.tender_position_id: state for state in locked_qs.filter(tender_position_id__in=missing_ids)}
+    )
+    return states
+
+
+def _record_auction_bids(*, tender, is_sales, proposal, bids, states, actor):
+    """
+    Записати ставки онлайн-аукціону пакетом: оновити кращу ціну, лічильник
+    ставок і версію в заблокованих рядках стану та додати записи в TenderBidHistory.
+    ``bids`` — список (tender_position_id, price). Повертає id позицій для лідерборду.
+    """
+    if getattr(tender, "conduct_type", "") != "online_auction" or not bids:
+        return set()
+    now = timezone.now()
+    touched_states = []
+    for tender_position_id, price in bids:
+        state = states.get(int(tender_position_id))
+        price_dec = _to_decimal(price)
+        if state is None or price_dec is None:
+            continue
+        best_price = _to_decimal(state.best_price)
+        if best_price is None or (price_dec > best_price if is_sales else price_dec < best_price):
+            state.best_price = price_dec
+            state.best_proposal_id = int(proposal.id)
+        state.bid_count += 1
+        state.version += 1
+        state.updated_at = now
+        touched_states.append(state)
+    if touched_states:
+        TenderAuctionPositionState.objects.bulk_update(
+            touched_states,
+            ["best_price", "best_proposal_id", "bid_count", "version", "updated_at"],
+        )
+    TenderBidHistory.objects.bulk_create(
+        [
+            TenderBidHistory(
+                tender_type=_tender_kind(is_sales),
+                tender_id=int(tender.id),
+                proposal_id=int(proposal.id),
+                tender_position_id=int(tender_position_id),
+                supplier_company_id=proposal.supplier_company_id,
+                price=price,
+                created_by=actor,
+            )
+            for tender_position_id, price in bids
+        ]
+    )
+    return {state.tender_position_id for state in touched_states}
+
+
+def _build_auction_leaderboard_payload(*, tender, is_sales, position_ids, proposal_position_model):
+    """
+    Компактний diff лідерборду по змінених позиціях: краща ціна, кількість
+    ставок і місця постачальників. Споживач WebSocket залишає учаснику лише
+    його власне місце (``my_rank``).
+    """
+    position_ids = sorted({int(position_id) for position_id in position_ids})
+    states = {
+        state.tender_position_id: state
+        for state in TenderAuctionPositionState.objects.filter(
+            tender_type=_tender_kind(is_sales),
+            tender_position_id__in=position_ids,
+        )
+    }
+    prices_by_position = {}
+    for position_id, supplier_company_id, price in proposal_position_model.objects.filter(
+        tender_position_id__in=position_ids,
+        price__isnull=False,
+    ).order_by().values_list("tender_position_id", "proposal__supplier_company_id", "price"):
+        prices_by_position.setdefault(position_id, []).append((supplier_company_id, price))
+
+    positions = []
+    for position_id in position_ids:
+        state = states.get(position_id)
+        prices = sorted(
+            prices_by_position.get(position_id, []),
+            key=lambda row: row[1],
+            reverse=is_sales,
+        )
+        ranks = []
+        for index, (supplier_company_id, price) in enumerate(prices):
+            # Однакова ціна — однакове місце.
+            rank = ranks[-1]["rank"] if index and prices[index - 1][1] == price else index + 1
+            ranks.append({"supplier_company_id": supplier_company_id, "rank": rank})
+        best_price = state.best_price if state else (prices[0][1] if prices else None)
+        positions.append(
+            {
+                "position_id": position_id,
+                "best_price": str(best_price) if best_price is not None else None,
+                "bid_count": state.bid_count if state else 0,
+                "version": state.version if state else 0,
+                "ranks": ranks,
+            }
+        )
+    return {"tender_id": int(tender.id), "positions": positions}
+
+
+def _record_tender_proposal_change_logs(*, tender, is_sales, proposal, changes, actor):
+    """
+    Журнал змін пропозиції власником на етапі рішення. ``changes`` — список
+    (tender_position_id, original_price, original_criterion_values, current_price,
+    current_criterion_values); початкові значення фіксуються лише при першій зміні.
+    """
+    if not changes:
+        return
+    tender_kind = _tender_kind(is_sales)
+    existing = {
+        entry.tender_position_id: entry
+        for entry in TenderProposalChangeLog.objects.filter(
+            tender_type=tender_kind,
+            proposal_id=int(proposal.id),
+            tender_position_id__in=[int(row[0]) for row in changes],
+        )
+    }
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for (
+        tender_position_id,
+        original_price,
+        original_criterion_values,
+        current_price,
+        current_criterion_values,
+    ) in changes:
+        entry = existing.get(int(tender_position_id))
+        if entry is None:
+            to_create.append(
+                TenderProposalChangeLog(
+                    tender_type=tender_kind,
+                    tender_id=int(tender.id),
+                    proposal_id=int(proposal.id),
+                    tender_position_id=int(tender_position_id),
+                    supplier_company_id=proposal.supplier_company_id,
+                    original_price=original_price,
+                    original_criterion_values=original_criterion_values or {},
+                    current_price=current_price,
+                    current_criterion_values=current_criterion_values or {},
+                    updated_by=actor,
+                )
+            )
+            continue
+        entry.tender_id = int(tender.id)
+        entry.supplier_company_id = proposal.supplier_company_id
+        entry.current_price = current_price
+        entry.current_criterion_values = current_criterion_values or {}
+        entry.updated_by = actor
+        entry.updated_at = now
+        to_update.append(entry)
+    if to_create:
+        TenderProposalChangeLog.objects.bulk_create(to_create)
+    if to_update:
+        TenderProposalChangeLog.objects.bulk_update(
+            to_update,
+            [
+                "tender_id",
+                "supplier_company",
+                "current_price",
+                "current_criterion_values",
+                "updated_by",
+                "updated_at",
+            ],
+        )
+
+
+def _build_proposal_status_delta(*, proposal, is_sales):
+    serializer_cls = (
+        SalesTenderProposalStatusSerializer if is_sales else TenderProposalStatusSerializer
+    )
+    return {
+        "proposal_id": int(proposal.id),
+        "supplier_company_id": int(proposal.supplier_company_id),
+        "status": dict(serializer_cls(proposal).data),
+    }
+
+
+def _build_proposal_position_values_delta(*, proposal, position_values, is_sales):
+    serializer_cls = (
+        SalesTenderProposalPositionDeltaSerializer
+        if is_sales
+        else TenderProposalPositionDeltaSerializer
+    )
+    return {
+        "proposal_id": int(proposal.id),
+        "supplier_company_id": int(proposal.supplier_company_id),
+        "position_values": [dict(row) for row in serializer_cls(position_values, many=True).data],
+    }
+
+
+def _attach_realtime_delta(payload, delta):
+    """
+    Embed a self-contained delta into a proposal event payload. Consumers strip
+    it for sockets that did not opt in and filter it per audience.
+    """
+    if getattr(settings, "REALTIME_DELTA_PAYLOADS", True):
+        payload["deltas"] = [delta]
+    return payload
+
+
+def _notify_tender_chat_message(*, tender, is_sales, thread, message, actor):
+    meta = _tender_document_meta(tender=tender, is_sales=is_sales)
+    meta.update(
+        {
+            "event": Notification.Type.CHAT_MESSAGE,
+            "chat_thread_id": int(thread.id),
+            "supplier_company_id": int(thread.supplier_company_id),
+        }
+    )
+    title = "Нове повідомлення у чаті тендера"
+    body = str(getattr(message, "body", "") or "").strip()
+    if len(body) > 180:
+        body = f"{body[:177]}..."
+
+    recipients = []
+    if _user_represents_company(user=actor, company_id=getattr(tender, "company_id", None)):
+        recipients = list(
+            CompanyUser.objects.filter(
+                company_id=thread.supplier_company_id,
+                status=CompanyUser.Status.APPROVED,
+            )
+            .select_related("user")
+            .exclude(user_id=getattr(actor, "id", None))
+        )
+    else:
+        author = getattr(tender, "created_by", None)
+        if author and getattr(author, "id", None) != getattr(actor, "id", None):
+            recipients = [type("Recipient", (), {"user": author})()]
+
+    for membership in recipients:
+        recipient_meta = _tender_document_meta(tender=tender, is_sales=is_sales)
+        if _user_represents_company(user=membership.user, company_id=thread.supplier_company_id):
+            recipient_meta["document_url"] = (
+                f"/cabinet/tenders/sales/proposals/{int(tender.id)}"
+                if is_sales
+                else f"/cabinet/tenders/proposals/{int(tender.id)}"
+            )
+        recipient_meta.update(
+            {
+                "event": Notification.Type.CHAT_MESSAGE,
+                "chat_thread_id": int(thread.id),
+                "supplier_company_id": int(thread.supplier_company_id),
+            }
+        )
+        _create_notification(
+            user=membership.user,
+            notification_type=Notification.Type.CHAT_MESSAGE,
+            title=title,
+            body=body,
+            meta=recipient_meta,
         )
 
 
@@ -3486,6 +4041,9 @@ def _copy_sales_proposals_from_previous_tour(*, tender, actor):
         if new_values:
             SalesTenderProposalPosition.objects.bulk_create(new_values)
         copied_company_ids.append(int(source_proposal.supplier_company_id))
+    if copied_company_ids:
+        schedule_tender_journal_summary_refresh("sales", [tender.id])
+        refresh_tender_participation_states("sales", [tender.id], supplier_company_ids=copied_company_ids)
 
     return {
         "copied_companies": copied_company_ids,
@@ -3936,40 +4494,8 @@ def _start_approval_stage_cycle_if_needed(*, tender, is_sales):
 
 
 def _expand_cpv_ids_with_descendants(cpv_ids):
-    if not cpv_ids:
-        return []
-
-    selected = list(
-        CpvDictionary.objects.filter(id__in=cpv_ids).values("id", "cpv_level_code")
-    )
-    if not selected:
-        return []
-
-    result_ids = {item["id"] for item in selected}
-    pending_level_codes = {
-        item["cpv_level_code"] for item in selected if item.get("cpv_level_code")
-    }
-    processed = set()
-
-    while pending_level_codes:
-        level_codes = list(pending_level_codes - processed)
-        if not level_codes:
-            break
-        processed.update(level_codes)
-        children = list(
-            CpvDictionary.objects.filter(cpv_parent_code__in=level_codes).values(
-                "id", "cpv_level_code"
-            )
-        )
-        if not children:
-            continue
-        for child in children:
-            result_ids.add(child["id"])
-            next_level_code = child.get("cpv_level_code")
-            if next_level_code and next_level_code not in processed:
-                pending_level_codes.add(next_level_code)
-
-    return list(result_ids)
+    # Нащадки беруться із замикання CPV одним запитом замість обходу по рівнях.
+    return expand_cpv_ids_with_descendants(cpv_ids)
 
 
 def _filter_participation_qs_by_tab(qs, tab):
@@ -4076,8 +4602,9 @@ def _build_cpv_tree_for_tenders_queryset(qs):
     if not cpv_ids:
         return []
 
+    # Вибрані коди разом з усіма предками — одним запитом через замикання CPV.
     selected = list(
-        CpvDictionary.objects.filter(id__in=cpv_ids).values(
+        CpvDictionary.objects.filter(id__in=cpv_ids_with_ancestors(cpv_ids)).values(
             "id", "cpv_code", "name_ua", "cpv_level_code", "cpv_parent_code"
         )
     )
@@ -4085,33 +4612,10 @@ def _build_cpv_tree_for_tenders_queryset(qs):
         return []
 
     included_by_level = {}
-    pending_parent_codes = set()
     for item in selected:
         level_code = item.get("cpv_level_code")
         if level_code:
             included_by_level[level_code] = item
-        parent_code = (item.get("cpv_parent_code") or "").strip()
-        if parent_code and parent_code != "0":
-            pending_parent_codes.add(parent_code)
-
-    processed_parent_codes = set()
-    while pending_parent_codes:
-        to_fetch = list(pending_parent_codes - processed_parent_codes)
-        if not to_fetch:
-            break
-        processed_parent_codes.update(to_fetch)
-        parents = list(
-            CpvDictionary.objects.filter(cpv_level_code__in=to_fetch).values(
-                "id", "cpv_code", "name_ua", "cpv_level_code", "cpv_parent_code"
-            )
-        )
-        for parent in parents:
-            level_code = parent.get("cpv_level_code")
-            if level_code:
-                included_by_level[level_code] = parent
-            parent_code = (parent.get("cpv_parent_code") or "").strip()
-            if parent_code and parent_code != "0":
-                pending_parent_codes.add(parent_code)
 
     nodes_by_level = {}
     for item in included_by_level.values():
@@ -4166,7 +4670,7 @@ def _validate_online_auction_position_price(
     *,
     tender,
     position,
-    proposal_position_model,
+    best_price,
     new_price,
     is_procurement: bool,
 ):
@@ -4185,18 +4689,9 @@ def _validate_online_auction_position_price(
     if new_price_dec is None:
         return "Вкажіть коректну цінову пропозицію."
 
-    current_prices = [
-        _to_decimal(v)
-        for v in proposal_position_model.objects.filter(
-            proposal__tender=tender,
-            tender_position=position,
-            price__isnull=False,
-        ).values_list("price", flat=True)
-    ]
-    current_prices = [v for v in current_prices if v is not None]
+    best_price = _to_decimal(best_price)
 
-    if current_prices:
-        best_price = min(current_prices) if is_procurement else max(current_prices)
+    if best_price is not None:
         first_point = best_price - min_step if is_procurement else best_price + min_step
         second_point = (
             first_point - max_step if is_procurement else first_point + max_step
@@ -4215,6 +4710,331 @@ def _validate_online_auction_position_price(
     return None
 
 
+def _apply_proposal_position_values(
+    *,
+    tender,
+    is_sales,
+    proposal,
+    items,
+    actor,
+    actor_represents_owner,
+):
+    """
+    Пакетно застосувати значення по позиціях пропозиції: позиції та наявні
+    значення читаються одним запитом кожне, ціни онлайн-аукціону валідуються
+    в пам'яті по заблокованих рядках стану, а записи йдуть через bulk_create /
+    bulk_update разом з історією ставок і журналом змін.
+    Наявні значення блокуються до кінця транзакції; елемент з ``version``, що
+    не збігається з поточною версією значення, відхиляється з 409.
+    Викликається всередині transaction.atomic(). Повертає
+    (error_response, changed_position_values, leaderboard_position_ids);
+    при помилці нічого не записується.
+    """
+    position_model = SalesTenderPosition if is_sales else ProcurementTenderPosition
+    value_model = SalesTenderProposalPosition if is_sales else TenderProposalPosition
+    decision_stage = SalesTender.Stage.DECISION if is_sales else ProcurementTender.Stage.DECISION
+
+    items_by_position = {}
+    for item in items:
+        tp_id = item.get("tender_position_id")
+        if not tp_id:
+            continue
+        # Повтор позиції в одному запиті: пізніші поля перекривають попередні.
+        items_by_position.setdefault(int(tp_id), {}).update(item)
+    if not items_by_position:
+        return None, {}, set()
+    positions = position_model.objects.filter(tender=tender).in_bulk(list(items_by_position))
+    items_by_position = {
+        tp_id: item for tp_id, item in items_by_position.items() if tp_id in positions
+    }
+    existing_values = {
+        pv.tender_position_id: pv
+        for pv in value_model.objects.select_for_update().filter(
+            proposal=proposal,
+            tender_position_id__in=list(items_by_position),
+        )
+    }
+    for tp_id, item in items_by_position.items():
+        if item.get("version") is None:
+            continue
+        try:
+            expected_version = int(item["version"])
+        except (TypeError, ValueError):
+            return (
+                Response(
+                    {"detail": "Некоректна версія значення позиції.", "tender_position_id": tp_id},
+                    status=status.HTTP_400_BAD_REQUEST,
+                ),
+                {},
+                set(),
+            )
+        current_version = existing_values[tp_id].version if tp_id in existing_values else 0
+        if expected_version != current_version:
+            return (
+                Response(
+                    {
+                        "detail": "Значення позиції вже змінено в іншому вікні. Оновіть дані та повторіть.",
+                        "tender_position_id": tp_id,
+                        "version": current_version,
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                ),
+                {},
+                set(),
+            )
+
+    states = {}
+    priced_ids = [tp_id for tp_id, item in items_by_position.items() if "price" in item]
+    if priced_ids and getattr(tender, "conduct_type", "") == "online_auction":
+        # Рядки стану позицій лишаються заблокованими до кінця транзакції ставки.
+        states = _lock_auction_position_states(
+            tender=tender,
+            is_sales=is_sales,
+            position_ids=priced_ids,
+            proposal_position_model=value_model,
+        )
+        for tp_id in priced_ids:
+            price_validation_error = _validate_online_auction_position_price(
+                tender=tender,
+                position=positions[tp_id],
+                best_price=states[tp_id].best_price,
+                new_price=items_by_position[tp_id].get("price"),
+                is_procurement=not is_sales,
+            )
+            if price_validation_error:
+                return (
+                    Response(
+                        {"detail": price_validation_error, "tender_position_id": tp_id},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    ),
+                    {},
+                    set(),
+                )
+
+    to_create = []
+    to_update = []
+    changed_position_values = {}
+    bids = []
+    change_log_rows = []
+    for tp_id, item in items_by_position.items():
+        pv = existing_values.get(tp_id)
+        if pv is None:
+            pv = value_model(proposal=proposal, price=None, criterion_values={})
+            to_create.append(pv)
+        pv.tender_position = positions[tp_id]
+        previous_price = pv.price
+        previous_criterion_values = pycopy.deepcopy(pv.criterion_values or {})
+        has_changes = False
+        if "price" in item:
+            next_price = item["price"]
+            if pv.price != next_price:
+                pv.price = next_price
+                has_changes = True
+        if "criterion_values" in item:
+            next_criterion_values = item["criterion_values"] or {}
+            if (pv.criterion_values or {}) != next_criterion_values:
+                pv.criterion_values = next_criterion_values
+                has_changes = True
+        if not has_changes:
+            continue
+        pv.version += 1
+        if pv.pk:
+            to_update.append(pv)
+        changed_position_values[tp_id] = pv
+        if "price" in item and previous_price != pv.price:
+            bids.append((tp_id, pv.price))
+        if actor_represents_owner and tender.stage == decision_stage:
+            change_log_rows.append(
+                (tp_id, previous_price, previous_criterion_values, pv.price, pv.criterion_values or {})
+            )
+
+    if to_create:
+        value_model.objects.bulk_create(to_create)
+        if any(pv.pk is None for pv in to_create):
+            # MySQL не повертає id з bulk_create.
+            created_ids = dict(
+                value_model.objects.filter(
+                    proposal=proposal,
+                    tender_position_id__in=[pv.tender_position_id for pv in to_create],
+                ).values_list("tender_position_id", "id")
+            )
+            for pv in to_create:
+                pv.pk = created_ids.get(pv.tender_position_id)
+        if not existing_values:
+            # Перші ціни КП вмикають прапорець участі; далі він лише залишається увімкненим.
+            mark_participation_position_values(
+                "sales" if is_sales else "procurement",
+                tender.id,
+                proposal.supplier_company_id,
+            )
+    if to_update:
+        value_model.objects.bulk_update(to_update, ["price", "criterion_values", "version"])
+    if changed_position_values and (
+        proposal.submitted_at is not None
+        or any(positions[tp_id].winner_proposal_id == proposal.id for tp_id in changed_position_values)
+    ):
+        # Підсумок журналу враховує лише подані КП і ціни переможців. Ціни аукціону
+        # змінюються часто, тому рядок лише позначається застарілим, а перерахунок
+        # відбудеться під час читання журналу.
+        mark_tender_journal_summaries_stale("sales" if is_sales else "procurement", [tender.id])
+    leaderboard_position_ids = _record_auction_bids(
+        tender=tender,
+        is_sales=is_sales,
+        proposal=proposal,
+        bids=bids,
+        states=states,
+        actor=actor,
+    )
+    _record_tender_proposal_change_logs(
+        tender=tender,
+        is_sales=is_sales,
+        proposal=proposal,
+        changes=change_log_rows,
+        actor=actor,
+    )
+    return None, changed_position_values, leaderboard_position_ids
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Один потік продовжує заявки ключів, поки перші запити ще виконуються.
+_idempotency_claim_refresher = DeadlineFlusher(name="idempotency-claim-refresher")
+
+
+def _idempotency_cache():
+    return caches[getattr(settings, "IDEMPOTENCY_CACHE", "default") or "default"]
+
+
+def _idempotency_ttl() -> int:
+    try:
+        return max(0, int(getattr(settings, "IDEMPOTENCY_KEY_TTL_SECONDS", 86400)))
+    except (TypeError, ValueError):
+        return 86400
+
+
+def _idempotency_pending_ttl(ttl: int) -> int:
+    """
+    Час життя заявки ключа без продовження (IDEMPOTENCY_PENDING_TTL_SECONDS). Поки
+    перший запит виконується, заявка продовжується кожні півперіоду, тож повтори
+    отримують 409, а не виконують запис вдруге; після падіння процесу вона зникає за цей час.
+    """
+    try:
+        pending_ttl = int(getattr(settings, "IDEMPOTENCY_PENDING_TTL_SECONDS", 60))
+    except (TypeError, ValueError):
+        pending_ttl = 60
+    return max(1, min(ttl, pending_ttl))
+
+
+def _refresh_idempotency_claim(claim) -> bool:
+    with claim["lock"]:
+        if claim["done"]:
+            return False
+        try:
+            claim["cache"].touch(claim["key"], claim["timeout"])
+        except Exception:
+            idempotency_logger.exception("idempotency cache unavailable")
+    _idempotency_claim_refresher.schedule(claim["timeout"] / 2, _refresh_idempotency_claim, claim)
+    return False
+
+
+def _idempotency_cache_key(*, request, key) -> str:
+    raw = f"{int(request.user.id)}:{request.method}:{request.path}:{key}"
+    return f"idempotency-v1:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def _idempotency_fingerprint(request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _idempotent_request(view_method):
+    """
+    Підтримка заголовка Idempotency-Key для POST/PATCH дій ViewSet.
+    Відповідь (крім 5xx) зберігається в кеші на IDEMPOTENCY_KEY_TTL_SECONDS і
+    повертається без повторного виконання для повторів з тим самим ключем від
+    того самого користувача на тому самому шляху. Повтор з іншим тілом — 422,
+    повтор під час виконання першого запиту — 409. Без заголовка дія працює як раніше.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = str(request.headers.get(IDEMPOTENCY_KEY_HEADER) or "").strip()
+        ttl = _idempotency_ttl()
+        if not key or ttl <= 0 or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} задовгий (максимум {IDEMPOTENCY_KEY_MAX_LENGTH} символів)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        cache_key = _idempotency_cache_key(request=request, key=key)
+        fingerprint = _idempotency_fingerprint(request)
+        try:
+            idem_cache = _idempotency_cache()
+            pending_ttl = _idempotency_pending_ttl(ttl)
+            claimed = idem_cache.add(
+                cache_key,
+                {"fingerprint": fingerprint, "status": None},
+                timeout=pending_ttl,
+            )
+            stored = None if claimed else idem_cache.get(cache_key)
+        except Exception:
+            idempotency_logger.exception("idempotency cache unavailable")
+            return view_method(self, request, *args, **kwargs)
+        if not claimed:
+            if stored and stored.get("fingerprint") != fingerprint:
+                return Response(
+                    {"detail": f"{IDEMPOTENCY_KEY_HEADER} вже використано для іншого запиту."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if not stored or stored.get("status") is None:
+                return Response(
+                    {"detail": "Запит з цим ключем ще виконується. Повторіть трохи пізніше."},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={"Retry-After": "1"},
+                )
+            return Response(
+                stored.get("data"),
+                status=stored["status"],
+                headers={"Idempotent-Replayed": "true"},
+            )
+        claim = {
+            "cache": idem_cache,
+            "key": cache_key,
+            "timeout": pending_ttl,
+            "done": False,
+            "lock": threading.Lock(),
+        }
+        _idempotency_claim_refresher.schedule(pending_ttl / 2, _refresh_idempotency_claim, claim)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except BaseException:
+            with claim["lock"]:
+                claim["done"] = True
+            idem_cache.delete(cache_key)
+            raise
+        with claim["lock"]:
+            claim["done"] = True
+        try:
+            if response.status_code >= 500:
+                idem_cache.delete(cache_key)
+            else:
+                idem_cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": getattr(response, "data", None),
+                    },
+                    timeout=ttl,
+                )
+        except Exception:
+            idempotency_logger.exception("idempotency cache write failed")
+        return response
+
+    return wrapper
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom JWT login endpoint.
@@ -6272,12 +7092,13 @@ class CpvDictionaryChildrenView(APIView):
         parent_level_code = (request.query_params.get("parent_level_code") or "").strip()
         search = (request.query_params.get("search") or "").strip()
 
+        all_items = []
         if search:
             search_term = search.casefold()
-            qs = CpvDictionary.objects.all()
+            all_items = list(CpvDictionary.objects.order_by("cpv_code"))
             items = [
                 item
-                for item in qs.order_by("cpv_code")
+                for item in all_items
                 if search_term in str(getattr(item, "cpv_code", "") or "").casefold()
                 or search_term in str(getattr(item, "name_ua", "") or "").casefold()
                 or search_term in str(getattr(item, "name_en", "") or "").casefold()
@@ -6294,23 +7115,12 @@ class CpvDictionaryChildrenView(APIView):
 
         ancestors_by_level_code = {}
         if search and items:
-            pending_parent_codes = {
-                (item.cpv_parent_code or "").strip()
-                for item in items
-                if (item.cpv_parent_code or "").strip()
+            # Пошук уже прочитав увесь довідник, тож предки шукаються в ньому без запитів по рівнях.
+            ancestors_by_level_code = {
+                (item.cpv_level_code or "").strip(): item
+                for item in all_items
+                if (item.cpv_level_code or "").strip()
             }
-            while pending_parent_codes:
-                parent_items = list(
-                    CpvDictionary.objects.filter(cpv_level_code__in=pending_parent_codes)
-                )
-                pending_parent_codes = set()
-                for parent in parent_items:
-                    parent_level_code = (parent.cpv_level_code or "").strip()
-                    if parent_level_code:
-                        ancestors_by_level_code[parent_level_code] = parent
-                    next_parent_code = (parent.cpv_parent_code or "").strip()
-                    if next_parent_code and next_parent_code not in ancestors_by_level_code:
-                        pending_parent_codes.add(next_parent_code)
 
         def _label(item):
             return f"{item.cpv_code} - {item.name_ua}"
@@ -6355,7 +7165,9 @@ class CpvDictionaryChildrenView(APIView):
             return result
 
         child_parent_codes = set()
-        if level_codes:
+        if search:
+            child_parent_codes = {item.cpv_parent_code for item in all_items} & set(level_codes)
+        elif level_codes:
             child_parent_codes = set(
                 CpvDictionary.objects.filter(cpv_parent_code__in=level_codes).values_list("cpv_parent_code", flat=True)
             )
@@ -6682,7 +7494,7 @@ class NomenclatureViewSet(ReferenceActivityMixin, viewsets.ModelViewSet):
         cpv_ids = _parse_int_list_param(self.request.query_params.getlist("cpv_ids"))
 
         if name:
-            qs = qs.filter(name__icontains=name)
+            qs = qs.filter(name_search_q(SEARCH_ENTITY_NOMENCLATURE, name))
         if category_id:
             qs = qs.filter(category_id=category_id)
         if cpv_ids:
@@ -7119,6 +7931,9 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         parameters=[
             OpenApiParameter(name="page", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY),
             OpenApiParameter(name="page_size", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="cursor_mode", type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY, description="Use cursor pagination"),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Opaque cursor token from previous page"),
+            OpenApiParameter(name="with_count", type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY, description="Include count in cursor mode"),
             OpenApiParameter(
                 name="search",
                 type=OpenApiTypes.STR,
@@ -7542,14 +8357,6 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         cpv_ids = _parse_int_list_param(request.query_params.getlist("cpv_ids"))
         expanded_cpv_ids = _expand_cpv_ids_with_descendants(cpv_ids)
 
-        proposal_subquery = TenderProposal.objects.filter(
-            tender_id=OuterRef("pk"),
-            supplier_company_id__in=user_company_ids,
-        )
-        submitted_proposal_subquery = proposal_subquery.filter(submitted_at__isnull=False)
-        position_proposal_subquery = proposal_subquery.filter(position_values__isnull=False)
-        won_proposal_subquery = proposal_subquery.filter(won_positions__isnull=False)
-
         qs = (
             ProcurementTender.objects.filter(
                 ~Q(company_id__in=user_company_ids),
@@ -7560,43 +8367,27 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
                 "company",
             )
             .prefetch_related("cpv_categories")
-            .annotate(
-                current_user_has_proposal=Exists(proposal_subquery),
-                current_user_has_submitted_proposal=Exists(submitted_proposal_subquery),
-                current_user_has_position_proposal=Exists(position_proposal_subquery),
-                current_user_has_win=Exists(won_proposal_subquery),
-            )
         )
         qs = _filter_participation_qs_by_publication_type(
             qs=qs,
             user_company_ids=user_company_ids,
         )
         qs = _filter_participation_qs_by_tab(qs, tab)
-        participated_filter_field = (
-            "current_user_has_position_proposal"
-            if tab == "journal"
-            else "current_user_has_submitted_proposal"
+        # Прапорці участі беруться з TenderParticipationState через індекс компанії.
+        participated_flag = "has_position_values" if tab == "journal" else "is_submitted"
+        participated_tender_ids = participating_tender_ids(
+            "procurement", user_company_ids, **{participated_flag: True}
         )
         if tab == "active" and reception_started:
             qs = qs.filter(start_at__isnull=False, start_at__lte=timezone.now())
         if conduct_type in ("rfx", "online_auction"):
             qs = qs.filter(conduct_type=conduct_type)
-        if submitted_only:
-            qs = qs.filter(**{participated_filter_field: True})
+        if submitted_only or participation_result in ("win", "participation"):
+            qs = qs.filter(id__in=participated_tender_ids)
         if participation_result == "win":
-            qs = qs.filter(
-                **{
-                    participated_filter_field: True,
-                    "current_user_has_win": True,
-                }
-            )
+            qs = qs.filter(id__in=participating_tender_ids("procurement", user_company_ids, is_winner=True))
         elif participation_result == "participation":
-            qs = qs.filter(
-                **{
-                    participated_filter_field: True,
-                    "current_user_has_win": False,
-                }
-            )
+            qs = qs.exclude(id__in=participating_tender_ids("procurement", user_company_ids, is_winner=True))
         if company_id:
             qs = qs.filter(company_id=company_id)
         if tender_number:
@@ -7636,6 +8427,7 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
                 cursor=cursor_token,
                 page_size=page_size,
             )
+            attach_participation_flags(rows, tender_type="procurement", company_ids=user_company_ids)
             serializer = ProcurementParticipationTenderListSerializer(
                 rows, many=True, context={"request": request}
             )
@@ -7655,10 +8447,11 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         total_pages = (total + page_size - 1) // page_size
         start = (page - 1) * page_size
         end = start + page_size
-        paged_qs = qs.order_by("-updated_at")[start:end]
+        rows = list(qs.order_by("-updated_at")[start:end])
+        attach_participation_flags(rows, tender_type="procurement", company_ids=user_company_ids)
 
         serializer = ProcurementParticipationTenderListSerializer(
-            paged_qs, many=True, context={"request": request}
+            rows, many=True, context={"request": request}
         )
         return Response({
             "count": total,
@@ -7750,6 +8543,7 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
 
     @extend_schema(responses=TenderProposalSerializer)
     @action(detail=True, methods=["post"], url_path="submit-proposal")
+    @_idempotent_request
     def submit_proposal(self, request, pk=None):
         """Подати пропозицію (фіксує подачу для компанії поточного користувача)."""
         tender = ProcurementTender.objects.filter(pk=pk).first()
@@ -7822,10 +8616,13 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
                 supplier_company_id=supplier_company_id,
                 defaults={"source": CompanySupplier.Source.PARTICIPATION},
             )
-        payload_for_ws = {
-            "proposal_id": proposal.id,
-            "submitted_at": proposal.submitted_at.isoformat() if proposal.submitted_at else None,
-        }
+        payload_for_ws = _attach_realtime_delta(
+            {
+                "proposal_id": proposal.id,
+                "submitted_at": proposal.submitted_at.isoformat() if proposal.submitted_at else None,
+            },
+            _build_proposal_status_delta(proposal=proposal, is_sales=False),
+        )
         transaction.on_commit(
             lambda: publish_tender_event(
                 "procurement",
@@ -7898,10 +8695,13 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         proposal.submitted_at = None
         proposal.status_updated_at = timezone.now()
         proposal.save(update_fields=["submitted_at", "status_updated_at"])
-        payload_for_ws = {
-            "proposal_id": proposal.id,
-            "submitted_at": None,
-        }
+        payload_for_ws = _attach_realtime_delta(
+            {
+                "proposal_id": proposal.id,
+                "submitted_at": None,
+            },
+            _build_proposal_status_delta(proposal=proposal, is_sales=False),
+        )
         transaction.on_commit(
             lambda: publish_tender_event(
                 "procurement",
@@ -8032,19 +8832,7 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="bid-history")
     def bid_history(self, request, pk=None):
         tender = self.get_object()
-        position_id = _parse_int_param(request.query_params.get("tender_position_id"), min_value=1)
-        if not position_id:
-            return Response(
-                {"detail": "Передайте tender_position_id."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        qs = TenderBidHistory.objects.filter(
-            tender_type="procurement",
-            tender_id=int(tender.id),
-            tender_position_id=position_id,
-        ).select_related("supplier_company", "created_by")
-        serializer = TenderBidHistorySerializer(qs, many=True)
-        return Response(serializer.data)
+        return _tender_bid_history_response(request=request, tender=tender, is_sales=False)
 
     @action(detail=True, methods=["get"], url_path="chat/threads")
     def chat_threads(self, request, pk=None):
@@ -8242,6 +9030,7 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
                     tender=tender,
                     winner_proposal_id__in=touched_ids,
                 ).update(winner_proposal=None)
+                refresh_tender_participation_states("procurement", [tender.id])
         qs = TenderProposal.objects.filter(tender=tender).select_related("supplier_company", "disqualified_by").prefetch_related(
             "position_values__tender_position__nomenclature__unit"
         )
@@ -8301,6 +9090,8 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
                     if pos and proposal:
                         pos.winner_proposal_id = prop_id
                         pos.save()
+            schedule_tender_journal_summary_refresh("procurement", [tender.id])
+            refresh_tender_participation_states("procurement", [tender.id])
             tender.stage = "approval"
             tender.save(update_fields=["stage"])
             _start_approval_stage_cycle_if_needed(tender=tender, is_sales=False)
@@ -8314,6 +9105,8 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
             return Response({"stage": "approval", "id": tender.id})
         if mode == "cancel":
             ProcurementTenderPosition.objects.filter(tender=tender).update(winner_proposal=None)
+            schedule_tender_journal_summary_refresh("procurement", [tender.id])
+            refresh_tender_participation_states("procurement", [tender.id])
             tender.stage = "approval"
             tender.save(update_fields=["stage"])
             _start_approval_stage_cycle_if_needed(tender=tender, is_sales=False)
@@ -8420,88 +9213,13 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
             proposal_ids_raw = request.query_params.get("ids")
         proposal_ids = _parse_int_list_param(proposal_ids_raw)
         if view_mode == "status":
-            throttled_response, rate_limit_remaining = _enforce_status_sync_rate_limit(
+            return _proposal_status_sync_response(
                 request=request,
-                kind="procurement",
-                tender_id=int(tender.id),
-            )
-            if throttled_response is not None:
-                return throttled_response
-            use_delta_cache = updated_since is not None and not proposal_ids
-            cache_key = None
-            if use_delta_cache and request.user and request.user.is_authenticated:
-                cache_key = _build_status_sync_cache_key(
-                    kind="procurement",
-                    tender_id=int(tender.id),
-                    user_id=int(request.user.id),
-                    updated_since=updated_since,
-                )
-                cached_data = cache.get(cache_key)
-                if cached_data is not None:
-                    response = Response(cached_data)
-                    response["X-Status-Sync-Cache"] = "HIT"
-                    if rate_limit_remaining is not None:
-                        response["X-Status-Sync-RateLimit-Limit"] = str(
-                            STATUS_SYNC_THROTTLE_PER_MINUTE
-                        )
-                        response["X-Status-Sync-RateLimit-Remaining"] = str(
-                            rate_limit_remaining
-                        )
-                    _status_sync_log(
-                        "cache_hit",
-                        kind="procurement",
-                        tender_id=int(tender.id),
-                        user_id=int(request.user.id),
-                        rows=len(cached_data),
-                    )
-                    return response
-            qs = TenderProposal.objects.filter(tender=tender).select_related(
-                "supplier_company", "disqualified_by"
-            )
-            if updated_since is not None:
-                qs = qs.filter(status_updated_at__gt=updated_since)
-            if proposal_ids:
-                qs = qs.filter(id__in=proposal_ids)
-            elif "ids" in request.query_params:
-                return Response([])
-            qs, _ = _filter_tender_proposals_for_user(qs=qs, tender=tender, user=request.user)
-            serializer = TenderProposalStatusSerializer(qs, many=True)
-            data = list(serializer.data)
-            if cache_key:
-                cache.set(cache_key, data, STATUS_SYNC_CACHE_TTL_SECONDS)
-                response = Response(data)
-                response["X-Status-Sync-Cache"] = "MISS"
-                if rate_limit_remaining is not None:
-                    response["X-Status-Sync-RateLimit-Limit"] = str(
-                        STATUS_SYNC_THROTTLE_PER_MINUTE
-                    )
-                    response["X-Status-Sync-RateLimit-Remaining"] = str(
-                        rate_limit_remaining
-                    )
-                _status_sync_log(
-                    "cache_miss",
-                    kind="procurement",
-                    tender_id=int(tender.id),
-                    user_id=int(request.user.id) if request.user and request.user.is_authenticated else None,
-                    rows=len(data),
-                )
-                return response
-            response = Response(data)
-            if rate_limit_remaining is not None:
-                response["X-Status-Sync-RateLimit-Limit"] = str(
-                    STATUS_SYNC_THROTTLE_PER_MINUTE
-                )
-                response["X-Status-Sync-RateLimit-Remaining"] = str(
-                    rate_limit_remaining
-                )
-            _status_sync_log(
-                "no_cache",
-                kind="procurement",
-                tender_id=int(tender.id),
-                user_id=int(request.user.id) if request.user and request.user.is_authenticated else None,
-                rows=len(data),
+                tender=tender,
+                is_sales=False,
+                updated_since=updated_since,
+                proposal_ids=proposal_ids,
             )
-            return response
         qs = TenderProposal.objects.filter(tender=tender).select_related(
             "supplier_company", "disqualified_by"
         ).prefetch_related(
@@ -8539,24 +9257,35 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
     @extend_schema(request=TenderProposalPositionUpdateSerializer)
-    @action(detail=True, methods=["post", "patch"], url_path=r"proposals/(?P<proposal_id>[^/.]+)/position-values")
+    @action(
+        detail=True,
+        methods=["post", "patch"],
+        url_path=r"proposals/(?P<proposal_id>[^/.]+)/position-values",
+        throttle_classes=BID_THROTTLE_CLASSES,
+    )
+    @_idempotent_request
     def proposal_position_values(self, request, pk=None, proposal_id=None):
         """Оновити значення по позиціях пропозиції (ціна + критерії)."""
+        # Компанії користувача читаються один раз на ставку.
+        user_company_ids = _user_company_ids(request.user)
         tender = _get_tender_for_owner_or_participant(
             user=request.user,
             tender_id=pk,
             is_sales=False,
+            user_company_ids=user_company_ids,
         )
         if not tender:
             return Response({"detail": "Тендер не знайдено."}, status=status.HTTP_404_NOT_FOUND)
+        # Значення позицій читає пакетний шлях запису — без prefetch усієї пропозиції.
         proposal_qs = TenderProposal.objects.filter(
             tender=tender,
             id=proposal_id,
-        ).prefetch_related("position_values__tender_position")
+        )
         proposal_qs, actor_represents_owner = _filter_tender_proposals_for_user(
             qs=proposal_qs,
             tender=tender,
             user=request.user,
+            user_company_ids=user_company_ids,
         )
         proposal = proposal_qs.first()
         if not proposal:
@@ -8572,76 +9301,44 @@ class ProcurementTenderViewSet(viewsets.ModelViewSet):
         if not payload.is_valid():
             return Response(payload.errors, status=status.HTTP_400_BAD_REQUEST)
         position_values_data = payload.validated_data.get("position_values") or []
-        changed_position_ids: set[int] = set()
-        for item in position_values_data:
-            tp_id = item.get("tender_position_id")
-            if not tp_id:
-                continue
-            pos = ProcurementTenderPosition.objects.filter(
-                tender=tender, id=tp_id
-            ).first()
-            if not pos:
-                continue
-            if "price" in item:
-                price_validation_error = _validate_online_auction_position_price(
+        with transaction.atomic():
+            error_response, changed_position_values, leaderboard_position_ids = _apply_proposal_position_values(
+                tender=tender,
+                is_sales=False,
+                proposal=proposal,
+                items=position_values_data,
+                actor=request.user,
+                actor_represents_owner=actor_represents_owner,
+            )
+            if error_response:
+                return error_response
+            if leaderboard_position_ids:
+                leaderboard_payload = _build_auction_leaderboard_payload(
                     tender=tender,
-                    position=pos,
+                    is_sales=False,
+                    position_ids=leaderboard_position_ids,
                     proposal_position_model=TenderProposalPosition,
-                    new_price=item.get("price"),
-                    is_procurement=True,
                 )
-                if price_validation_error:
-                    return Response(
-                        {"detail": price_validation_error, "tender_position_id": tp_id},
-                        status=status.HTTP_400_BAD_REQUEST,
+                transaction.on_commit(
+                    lambda: publish_tender_event(
+                        "procurement",
+                        int(tender.id),
+                        AUCTION_LEADERBOARD_EVENT,
+                        leaderboard_payload,
                     )
-            pv, _ = TenderProposalPosition.objects.get_or_create(
-                proposal=proposal, tender_position=pos,
-                defaults={"price": None, "criterion_values": {}},
-            )
-            previous_price = pv.price
-            previous_criterion_values = pycopy.deepcopy(pv.criterion_values or {})
-            has_changes = False
-            if "price" in item:
-                next_price = item["price"]
-                if pv.price != next_price:
-                    pv.price = next_price
-                    has_changes = True
-            if "criterion_values" in item:
-                next_criterion_values = item["criterion_values"] or {}
-                if (pv.criterion_values or {}) != next_criterion_values:
-                    pv.criterion_values = next_criterion_values
-                    has_changes = True
-            if not has_changes:
-                continue
-            pv.save()
-            changed_position_ids.add(int(tp_id))
-            if "price" in item and previous_price != pv.price:
-                _record_tender_bid_history(
-                    tender=tender,
-                    is_sales=False,
-                    proposal=proposal,
-                    tender_position_id=tp_id,
-                    price=pv.price,
-                    actor=request.user,
                 )
-            if actor_represents_owner and tender.stage == ProcurementTender.Stage.DECISION:
-                _record_tender_proposal_change_log(
-                    tender=tender,
-                    is_sales=False,
+        if changed_position_values:
+            payload_for_ws = _attach_realtime_delta(
+                {
+                    "proposal_id": proposal.id,
+                    "position_ids": sorted(changed_position_values),
+                },
+                _build_proposal_position_values_delta(
                     proposal=proposal,
-                    tender_position_id=tp_id,
-                    original_price=previous_price,
-                    original_criterion_values=previous_criterion_values,
-                    current_price=pv.price,
-                    current_criterion_values=pv.criterion_values or {},
-                    actor=request.user,
-                )
-        if changed_position_ids:
-            payload_for_ws = {
-                "proposal_id": proposal.id,
-                "position_ids": sorted(changed_position_ids),
-            }
+                    position_values=list(changed_position_values.values()),
+                    is_sales=False,
+                ),
+            )
             transaction.on_commit(
                 lambda: publish_tender_event(
                     "procurement",
@@ -8824,6 +9521,9 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         parameters=[
             OpenApiParameter(name="page", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY),
             OpenApiParameter(name="page_size", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="cursor_mode", type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY, description="Use cursor pagination"),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Opaque cursor token from previous page"),
+            OpenApiParameter(name="with_count", type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY, description="Include count in cursor mode"),
             OpenApiParameter(
                 name="search",
                 type=OpenApiTypes.STR,
@@ -9246,14 +9946,6 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         cpv_ids = _parse_int_list_param(request.query_params.getlist("cpv_ids"))
         expanded_cpv_ids = _expand_cpv_ids_with_descendants(cpv_ids)
 
-        proposal_subquery = SalesTenderProposal.objects.filter(
-            tender_id=OuterRef("pk"),
-            supplier_company_id__in=user_company_ids,
-        )
-        submitted_proposal_subquery = proposal_subquery.filter(submitted_at__isnull=False)
-        position_proposal_subquery = proposal_subquery.filter(position_values__isnull=False)
-        won_proposal_subquery = proposal_subquery.filter(won_positions__isnull=False)
-
         qs = (
             SalesTender.objects.filter(
                 ~Q(company_id__in=user_company_ids),
@@ -9264,43 +9956,27 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
                 "company",
             )
             .prefetch_related("cpv_categories")
-            .annotate(
-                current_user_has_proposal=Exists(proposal_subquery),
-                current_user_has_submitted_proposal=Exists(submitted_proposal_subquery),
-                current_user_has_position_proposal=Exists(position_proposal_subquery),
-                current_user_has_win=Exists(won_proposal_subquery),
-            )
         )
         qs = _filter_participation_qs_by_publication_type(
             qs=qs,
             user_company_ids=user_company_ids,
         )
         qs = _filter_participation_qs_by_tab(qs, tab)
-        participated_filter_field = (
-            "current_user_has_position_proposal"
-            if tab == "journal"
-            else "current_user_has_submitted_proposal"
+        # Прапорці участі беруться з TenderParticipationState через індекс компанії.
+        participated_flag = "has_position_values" if tab == "journal" else "is_submitted"
+        participated_tender_ids = participating_tender_ids(
+            "sales", user_company_ids, **{participated_flag: True}
         )
         if tab == "active" and reception_started:
             qs = qs.filter(start_at__isnull=False, start_at__lte=timezone.now())
         if conduct_type in ("rfx", "online_auction"):
             qs = qs.filter(conduct_type=conduct_type)
-        if submitted_only:
-            qs = qs.filter(**{participated_filter_field: True})
+        if submitted_only or participation_result in ("win", "participation"):
+            qs = qs.filter(id__in=participated_tender_ids)
         if participation_result == "win":
-            qs = qs.filter(
-                **{
-                    participated_filter_field: True,
-                    "current_user_has_win": True,
-                }
-            )
+            qs = qs.filter(id__in=participating_tender_ids("sales", user_company_ids, is_winner=True))
         elif participation_result == "participation":
-            qs = qs.filter(
-                **{
-                    participated_filter_field: True,
-                    "current_user_has_win": False,
-                }
-            )
+            qs = qs.exclude(id__in=participating_tender_ids("sales", user_company_ids, is_winner=True))
         if company_id:
             qs = qs.filter(company_id=company_id)
         if tender_number:
@@ -9340,6 +10016,7 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
                 cursor=cursor_token,
                 page_size=page_size,
             )
+            attach_participation_flags(rows, tender_type="sales", company_ids=user_company_ids)
             serializer = SalesParticipationTenderListSerializer(
                 rows, many=True, context={"request": request}
             )
@@ -9359,10 +10036,11 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         total_pages = (total + page_size - 1) // page_size
         start = (page - 1) * page_size
         end = start + page_size
-        paged_qs = qs.order_by("-updated_at")[start:end]
+        rows = list(qs.order_by("-updated_at")[start:end])
+        attach_participation_flags(rows, tender_type="sales", company_ids=user_company_ids)
 
         serializer = SalesParticipationTenderListSerializer(
-            paged_qs, many=True, context={"request": request}
+            rows, many=True, context={"request": request}
         )
         return Response({
             "count": total,
@@ -9454,6 +10132,7 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
 
     @extend_schema(responses=SalesTenderProposalSerializer)
     @action(detail=True, methods=["post"], url_path="submit-proposal")
+    @_idempotent_request
     def submit_proposal(self, request, pk=None):
         """Подати пропозицію (фіксує подачу для компанії поточного користувача)."""
         tender = SalesTender.objects.filter(pk=pk).first()
@@ -9526,10 +10205,13 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
                 supplier_company_id=supplier_company_id,
                 defaults={"source": CompanySupplier.Source.PARTICIPATION},
             )
-        payload_for_ws = {
-            "proposal_id": proposal.id,
-            "submitted_at": proposal.submitted_at.isoformat() if proposal.submitted_at else None,
-        }
+        payload_for_ws = _attach_realtime_delta(
+            {
+                "proposal_id": proposal.id,
+                "submitted_at": proposal.submitted_at.isoformat() if proposal.submitted_at else None,
+            },
+            _build_proposal_status_delta(proposal=proposal, is_sales=True),
+        )
         transaction.on_commit(
             lambda: publish_tender_event(
                 "sales",
@@ -9602,10 +10284,13 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         proposal.submitted_at = None
         proposal.status_updated_at = timezone.now()
         proposal.save(update_fields=["submitted_at", "status_updated_at"])
-        payload_for_ws = {
-            "proposal_id": proposal.id,
-            "submitted_at": None,
-        }
+        payload_for_ws = _attach_realtime_delta(
+            {
+                "proposal_id": proposal.id,
+                "submitted_at": None,
+            },
+            _build_proposal_status_delta(proposal=proposal, is_sales=True),
+        )
         transaction.on_commit(
             lambda: publish_tender_event(
                 "sales",
@@ -9736,19 +10421,7 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="bid-history")
     def bid_history(self, request, pk=None):
         tender = self.get_object()
-        position_id = _parse_int_param(request.query_params.get("tender_position_id"), min_value=1)
-        if not position_id:
-            return Response(
-                {"detail": "Передайте tender_position_id."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        qs = TenderBidHistory.objects.filter(
-            tender_type="sales",
-            tender_id=int(tender.id),
-            tender_position_id=position_id,
-        ).select_related("supplier_company", "created_by")
-        serializer = TenderBidHistorySerializer(qs, many=True)
-        return Response(serializer.data)
+        return _tender_bid_history_response(request=request, tender=tender, is_sales=True)
 
     @action(detail=True, methods=["get"], url_path="chat/threads")
     def chat_threads(self, request, pk=None):
@@ -9914,6 +10587,7 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
                     tender=tender,
                     winner_proposal_id__in=touched_ids,
                 ).update(winner_proposal=None)
+                refresh_tender_participation_states("sales", [tender.id])
         qs = SalesTenderProposal.objects.filter(tender=tender).select_related("supplier_company", "disqualified_by").prefetch_related(
             "position_values__tender_position__nomenclature__unit"
         )
@@ -9984,6 +10658,8 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
                     if pos and proposal:
                         pos.winner_proposal_id = prop_id
                         pos.save()
+            schedule_tender_journal_summary_refresh("sales", [tender.id])
+            refresh_tender_participation_states("sales", [tender.id])
             tender.stage = "approval"
             tender.save(update_fields=["stage"])
             _start_approval_stage_cycle_if_needed(tender=tender, is_sales=True)
@@ -9997,6 +10673,8 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
             return Response({"stage": "approval", "id": tender.id})
         if mode == "cancel":
             SalesTenderPosition.objects.filter(tender=tender).update(winner_proposal=None)
+            schedule_tender_journal_summary_refresh("sales", [tender.id])
+            refresh_tender_participation_states("sales", [tender.id])
             tender.stage = "approval"
             tender.save(update_fields=["stage"])
             _start_approval_stage_cycle_if_needed(tender=tender, is_sales=True)
@@ -10103,88 +10781,13 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
             proposal_ids_raw = request.query_params.get("ids")
         proposal_ids = _parse_int_list_param(proposal_ids_raw)
         if view_mode == "status":
-            throttled_response, rate_limit_remaining = _enforce_status_sync_rate_limit(
+            return _proposal_status_sync_response(
                 request=request,
-                kind="sales",
-                tender_id=int(tender.id),
-            )
-            if throttled_response is not None:
-                return throttled_response
-            use_delta_cache = updated_since is not None and not proposal_ids
-            cache_key = None
-            if use_delta_cache and request.user and request.user.is_authenticated:
-                cache_key = _build_status_sync_cache_key(
-                    kind="sales",
-                    tender_id=int(tender.id),
-                    user_id=int(request.user.id),
-                    updated_since=updated_since,
-                )
-                cached_data = cache.get(cache_key)
-                if cached_data is not None:
-                    response = Response(cached_data)
-                    response["X-Status-Sync-Cache"] = "HIT"
-                    if rate_limit_remaining is not None:
-                        response["X-Status-Sync-RateLimit-Limit"] = str(
-                            STATUS_SYNC_THROTTLE_PER_MINUTE
-                        )
-                        response["X-Status-Sync-RateLimit-Remaining"] = str(
-                            rate_limit_remaining
-                        )
-                    _status_sync_log(
-                        "cache_hit",
-                        kind="sales",
-                        tender_id=int(tender.id),
-                        user_id=int(request.user.id),
-                        rows=len(cached_data),
-                    )
-                    return response
-            qs = SalesTenderProposal.objects.filter(tender=tender).select_related(
-                "supplier_company", "disqualified_by"
-            )
-            if updated_since is not None:
-                qs = qs.filter(status_updated_at__gt=updated_since)
-            if proposal_ids:
-                qs = qs.filter(id__in=proposal_ids)
-            elif "ids" in request.query_params:
-                return Response([])
-            qs, _ = _filter_tender_proposals_for_user(qs=qs, tender=tender, user=request.user)
-            serializer = SalesTenderProposalStatusSerializer(qs, many=True)
-            data = list(serializer.data)
-            if cache_key:
-                cache.set(cache_key, data, STATUS_SYNC_CACHE_TTL_SECONDS)
-                response = Response(data)
-                response["X-Status-Sync-Cache"] = "MISS"
-                if rate_limit_remaining is not None:
-                    response["X-Status-Sync-RateLimit-Limit"] = str(
-                        STATUS_SYNC_THROTTLE_PER_MINUTE
-                    )
-                    response["X-Status-Sync-RateLimit-Remaining"] = str(
-                        rate_limit_remaining
-                    )
-                _status_sync_log(
-                    "cache_miss",
-                    kind="sales",
-                    tender_id=int(tender.id),
-                    user_id=int(request.user.id) if request.user and request.user.is_authenticated else None,
-                    rows=len(data),
-                )
-                return response
-            response = Response(data)
-            if rate_limit_remaining is not None:
-                response["X-Status-Sync-RateLimit-Limit"] = str(
-                    STATUS_SYNC_THROTTLE_PER_MINUTE
-                )
-                response["X-Status-Sync-RateLimit-Remaining"] = str(
-                    rate_limit_remaining
-                )
-            _status_sync_log(
-                "no_cache",
-                kind="sales",
-                tender_id=int(tender.id),
-                user_id=int(request.user.id) if request.user and request.user.is_authenticated else None,
-                rows=len(data),
+                tender=tender,
+                is_sales=True,
+                updated_since=updated_since,
+                proposal_ids=proposal_ids,
             )
-            return response
         qs = SalesTenderProposal.objects.filter(tender=tender).select_related(
             "supplier_company", "disqualified_by"
         ).prefetch_related(
@@ -10222,24 +10825,35 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
     @extend_schema(request=TenderProposalPositionUpdateSerializer)
-    @action(detail=True, methods=["post", "patch"], url_path=r"proposals/(?P<proposal_id>[^/.]+)/position-values")
+    @action(
+        detail=True,
+        methods=["post", "patch"],
+        url_path=r"proposals/(?P<proposal_id>[^/.]+)/position-values",
+        throttle_classes=BID_THROTTLE_CLASSES,
+    )
+    @_idempotent_request
     def proposal_position_values(self, request, pk=None, proposal_id=None):
         """Оновити значення по позиціях пропозиції."""
+        # Компанії користувача читаються один раз на ставку.
+        user_company_ids = _user_company_ids(request.user)
         tender = _get_tender_for_owner_or_participant(
             user=request.user,
             tender_id=pk,
             is_sales=True,
+            user_company_ids=user_company_ids,
         )
         if not tender:
             return Response({"detail": "Тендер не знайдено."}, status=status.HTTP_404_NOT_FOUND)
+        # Значення позицій читає пакетний шлях запису — без prefetch усієї пропозиції.
         proposal_qs = SalesTenderProposal.objects.filter(
             tender=tender,
             id=proposal_id,
-        ).prefetch_related("position_values__tender_position")
+        )
         proposal_qs, actor_represents_owner = _filter_tender_proposals_for_user(
             qs=proposal_qs,
             tender=tender,
             user=request.user,
+            user_company_ids=user_company_ids,
         )
         proposal = proposal_qs.first()
         if not proposal:
@@ -10255,74 +10869,44 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
         if not payload.is_valid():
             return Response(payload.errors, status=status.HTTP_400_BAD_REQUEST)
         position_values_data = payload.validated_data.get("position_values") or []
-        changed_position_ids: set[int] = set()
-        for item in position_values_data:
-            tp_id = item.get("tender_position_id")
-            if not tp_id:
-                continue
-            pos = SalesTenderPosition.objects.filter(tender=tender, id=tp_id).first()
-            if not pos:
-                continue
-            if "price" in item:
-                price_validation_error = _validate_online_auction_position_price(
+        with transaction.atomic():
+            error_response, changed_position_values, leaderboard_position_ids = _apply_proposal_position_values(
+                tender=tender,
+                is_sales=True,
+                proposal=proposal,
+                items=position_values_data,
+                actor=request.user,
+                actor_represents_owner=actor_represents_owner,
+            )
+            if error_response:
+                return error_response
+            if leaderboard_position_ids:
+                leaderboard_payload = _build_auction_leaderboard_payload(
                     tender=tender,
-                    position=pos,
+                    is_sales=True,
+                    position_ids=leaderboard_position_ids,
                     proposal_position_model=SalesTenderProposalPosition,
-                    new_price=item.get("price"),
-                    is_procurement=False,
                 )
-                if price_validation_error:
-                    return Response(
-                        {"detail": price_validation_error, "tender_position_id": tp_id},
-                        status=status.HTTP_400_BAD_REQUEST,
+                transaction.on_commit(
+                    lambda: publish_tender_event(
+                        "sales",
+                        int(tender.id),
+                        AUCTION_LEADERBOARD_EVENT,
+                        leaderboard_payload,
                     )
-            pv, _ = SalesTenderProposalPosition.objects.get_or_create(
-                proposal=proposal, tender_position=pos,
-                defaults={"price": None, "criterion_values": {}},
-            )
-            previous_price = pv.price
-            previous_criterion_values = pycopy.deepcopy(pv.criterion_values or {})
-            has_changes = False
-            if "price" in item:
-                next_price = item["price"]
-                if pv.price != next_price:
-                    pv.price = next_price
-                    has_changes = True
-            if "criterion_values" in item:
-                next_criterion_values = item["criterion_values"] or {}
-                if (pv.criterion_values or {}) != next_criterion_values:
-                    pv.criterion_values = next_criterion_values
-                    has_changes = True
-            if not has_changes:
-                continue
-            pv.save()
-            changed_position_ids.add(int(tp_id))
-            if "price" in item and previous_price != pv.price:
-                _record_tender_bid_history(
-                    tender=tender,
-                    is_sales=True,
-                    proposal=proposal,
-                    tender_position_id=tp_id,
-                    price=pv.price,
-                    actor=request.user,
                 )
-            if actor_represents_owner and tender.stage == SalesTender.Stage.DECISION:
-                _record_tender_proposal_change_log(
-                    tender=tender,
-                    is_sales=True,
+        if changed_position_values:
+            payload_for_ws = _attach_realtime_delta(
+                {
+                    "proposal_id": proposal.id,
+                    "position_ids": sorted(changed_position_values),
+                },
+                _build_proposal_position_values_delta(
                     proposal=proposal,
-                    tender_position_id=tp_id,
-                    original_price=previous_price,
-                    original_criterion_values=previous_criterion_values,
-                    current_price=pv.price,
-                    current_criterion_values=pv.criterion_values or {},
-                    actor=request.user,
-                )
-        if changed_position_ids:
-            payload_for_ws = {
-                "proposal_id": proposal.id,
-                "position_ids": sorted(changed_position_ids),
-            }
+                    position_values=list(changed_position_values.values()),
+                    is_sales=True,
+                ),
+            )
             transaction.on_commit(
                 lambda: publish_tender_event(
                     "sales",
@@ -10456,3 +11040,348 @@ class SalesTenderViewSet(viewsets.ModelViewSet):
             obj.save(update_fields=["visible_to_participants"])
         serializer = SalesTenderFileSerializer(obj, context={"request": request})
         return Response(serializer.data)
+
+
+def _status_sync_long_poll_wait(request):
+    """Скільки секунд тримати ``proposals?view=status&wait=N``; None — звичайний запит."""
+    if request.method != "GET":
+        return None
+    if str(request.GET.get("view") or "").strip().lower() != "status":
+        return None
+    try:
+        wait = float(request.GET.get("wait") or 0)
+    except (TypeError, ValueError):
+        return None
+    if wait != wait or wait <= 0:
+        return None
+    return min(wait, STATUS_SYNC_LONG_POLL_MAX_SECONDS) or None
+
+
+def _status_sync_response_is_empty(request, response) -> bool:
+    """Чи немає у відповіді status-sync нічого нового для клієнта (варто чекати далі)."""
+    if response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return True
+    return (
+        response.status_code == status.HTTP_200_OK
+        and bool(request.GET.get("updated_since"))
+        and getattr(response, "data", None) == []
+    )
+
+
+async def _status_sync_long_poll(request, *, kind, tender_id, wait, check):
+    """
+    Long-poll ``proposals?view=status&wait=N``: поки відповідь порожня (304 або []
+    для ``updated_since``), чекати подію тендера (до ``wait`` секунд) і перевіряти
+    знову. ``check(recheck)`` — корутина, що повертає відповідь status-sync.
+    """
+    deadline = time.monotonic() + wait
+    # Підписка до першого читання: подія між читанням і очікуванням не губиться.
+    async with TenderEventWaiter(kind, tender_id) as waiter:
+        first_response = response = await check(False)
+        while _status_sync_response_is_empty(request, response):
+            if not await waiter.wait(deadline - time.monotonic()):
+                break
+            response = await check(True)
+    for header in ("X-Status-Sync-RateLimit-Limit", "X-Status-Sync-RateLimit-Remaining"):
+        if header in first_response and header not in response:
+            response[header] = first_response[header]
+    return response
+
+
+async def _aauthenticate_request(request):
+    """
+    Користувач для async-шляху або None. None (немає чи невалідний токен)
+    означає синхронний DRF-шлях, який і сформує стандартну 401-відповідь.
+    """
+    # Як rest_framework.request.Request: APIClient.force_authenticate у тестах.
+    forced_user = getattr(request, "_force_auth_user", None)
+    if forced_user is not None:
+        return forced_user
+    try:
+        result = await CachedJWTAuthentication().aauthenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def _auser_company_ids(user):
+    async def load():
+        return [
+            company_id
+            async for company_id in CompanyUser.objects.filter(
+                user_id=int(user.id),
+                status=CompanyUser.Status.APPROVED,
+            ).values_list("company_id", flat=True)
+        ]
+
+    return await aget_cached_user_company_ids(int(user.id), load)
+
+
+async def _aget_tender_for_owner_or_participant(*, tender_id, is_sales, company_ids, queryset=None):
+    """Async-варіант _get_tender_for_owner_or_participant з тими самими правилами доступу."""
+    tender_model = SalesTender if is_sales else ProcurementTender
+    if queryset is None:
+        queryset = tender_model.objects.only("id", "company_id", "publication_type")
+    tender = await queryset.filter(pk=int(tender_id)).afirst()
+    if tender is None or not company_ids:
+        return None
+    if int(tender.company_id) in company_ids:
+        return tender
+    if getattr(tender, "publication_type", "") != "closed":
+        return tender
+    supplier_company_ids = list(company_ids)
+    if await _get_tender_invitation_model(is_sales=is_sales).objects.filter(
+        tender_id=int(tender.id),
+        supplier_company_id__in=supplier_company_ids,
+    ).aexists():
+        return tender
+    if await _get_tender_proposal_model(is_sales=is_sales).objects.filter(
+        tender_id=int(tender.id),
+        supplier_company_id__in=supplier_company_ids,
+    ).aexists():
+        return tender
+    return None
+
+
+def _default_throttles_response(request):
+    """
+    Глобальні DRF-тротли (DEFAULT_THROTTLE_CLASSES) для async-шляху: None, якщо
+    запит пропущено, інакше стандартна 429-відповідь DRF. Після цієї перевірки
+    синхронний action викликається без тротлів, щоб бюджет не витрачався двічі.
+    """
+    view = APIView()
+    try:
+        view.check_throttles(request)
+    except Throttled as exc:
+        return drf_exception_handler(exc, {"view": view, "request": request})
+    return None
+
+
+def _tender_not_found_response():
+    return Response({"detail": "Tender not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+async def _astatus_sync_response(request, *, user, tender, is_sales, company_ids, recheck):
+    """_proposal_status_sync_response для async-шляху: кеш, ліміт і ORM без пулу потоків."""
+    kind = _tender_kind(is_sales)
+    tender_id = int(tender.id)
+    rate_limit_remaining = None
+    if not recheck:
+        throttled_response, rate_limit_remaining = await arun_steps(
+            _status_sync_rate_limit_steps(
+                request=request,
+                user=user,
+                kind=kind,
+                tender_id=tender_id,
+            )
+        )
+        if throttled_response is not None:
+            return throttled_response
+    proposal_ids_raw = request.GET.getlist("ids") or request.GET.get("ids")
+    proposal_ids = _parse_int_list_param(proposal_ids_raw)
+    if not proposal_ids and "ids" in request.GET:
+        return Response([])
+    rows, cache_state = await arun_steps(_status_sync_rows_steps(tender_id=tender_id, is_sales=is_sales))
+    return _status_sync_rows_response(
+        request=request,
+        kind=kind,
+        tender_id=tender_id,
+        tender_company_id=tender.company_id,
+        user_id=int(user.id),
+        company_ids=company_ids,
+        rows=rows,
+        cache_state=cache_state,
+        updated_since=_parse_iso_datetime_param(request.GET.get("updated_since")),
+        proposal_ids=proposal_ids,
+        rate_limit_remaining=rate_limit_remaining,
+    )
+
+
+async def _aproposals_fast_path(request, *, user, tender_id, is_sales):
+    if str(request.GET.get("view") or "").strip().lower() != "status":
+        return None
+    company_ids = await _auser_company_ids(user)
+    tender = await _aget_tender_for_owner_or_participant(
+        tender_id=tender_id,
+        is_sales=is_sales,
+        company_ids=company_ids,
+    )
+    if tender is None:
+        return _tender_not_found_response()
+
+    async def check(recheck):
+        return await _astatus_sync_response(
+            request,
+            user=user,
+            tender=tender,
+            is_sales=is_sales,
+            company_ids=company_ids,
+            recheck=recheck,
+        )
+
+    wait = _status_sync_long_poll_wait(request)
+    if wait is None:
+        return await check(False)
+    return await _status_sync_long_poll(
+        request,
+        kind=_tender_kind(is_sales),
+        tender_id=int(tender.id),
+        wait=wait,
+        check=check,
+    )
+
+
+async def _abid_history_fast_path(request, *, user, tender_id, is_sales):
+    params = request.GET
+    # Агрегований ряд (mode=series) лишається на синхронному шляху.
+    if str(params.get("mode", "")).strip().lower() == "series":
+        return None
+    tender_model = SalesTender if is_sales else ProcurementTender
+    tender = await tender_model.objects.only("id", "company_id").filter(pk=int(tender_id)).afirst()
+    if tender is None:
+        return _tender_not_found_response()
+    if not user.is_superuser and int(tender.company_id) not in await _auser_company_ids(user):
+        # Погоджувачі перевіряються синхронним get_object.
+        return None
+    error_response, qs = _bid_history_request(params=params, tender_id=tender.id, is_sales=is_sales)
+    if error_response is not None:
+        return error_response
+    qs = qs.select_related("supplier_company", "created_by")
+    page_size = _bid_history_page_size(params)
+    since_id = params.get("since_id")
+    if since_id not in (None, ""):
+        since_id = _parse_int_param(since_id, default=0, min_value=0)
+        rows = [row async for row in qs.filter(id__gt=since_id).order_by("id")[: page_size + 1]]
+        return Response(_bid_history_delta_payload(rows, since_id=since_id, page_size=page_size))
+    if _bid_history_is_cursor_mode(params):
+        rows = [
+            row
+            async for row in _updated_cursor_queryset(
+                qs=qs,
+                cursor=(params.get("cursor") or "").strip(),
+                page_size=page_size,
+                time_field="created_at",
+            )
+        ]
+        return Response(_bid_history_cursor_payload(rows, page_size=page_size))
+    rows = [row async for row in qs]
+    return Response(TenderBidHistorySerializer(rows, many=True).data)
+
+
+async def _aparticipant_view_fast_path(request, *, user, tender_id, is_sales):
+    tender = await _aget_tender_for_owner_or_participant(
+        tender_id=tender_id,
+        is_sales=is_sales,
+        company_ids=await _auser_company_ids(user),
+        queryset=_tender_detail_queryset(is_sales=is_sales),
+    )
+    if tender is None:
+        return _tender_not_found_response()
+    serializer_class = SalesTenderSerializer if is_sales else ProcurementTenderSerializer
+    # Серіалізатор тендера читає пов'язані дані сам — це один перехід у синхронний код.
+    data = await sync_to_async(lambda: serializer_class(tender, context={"request": request}).data)()
+    return Response(data)
+
+
+def _render_async_response(response):
+    """
+    Відрендерити DRF Response async-шляху в HttpResponse: Django рендерить
+    відкладені відповіді через sync_to_async, тобто знову в пулі потоків.
+    """
+    content = b""
+    if response.data is not None and response.status_code != status.HTTP_304_NOT_MODIFIED:
+        content = JSONRenderer().render(response.data)
+    rendered = HttpResponse(content, status=response.status_code, content_type="application/json")
+    for header, value in response.items():
+        if header.lower() != "content-type":
+            rendered[header] = value
+    return rendered
+
+
+def _async_tender_read_view(viewset_class, *, action_name, basename, is_sales, fast_path):
+    """
+    Async-вхід для читання тендера з високою частотою запитів (status-sync,
+    bid-history, participant-view). Під ASGI ``fast_path`` обробляє запит async ORM
+    без зайнятого потоку; повертає None, якщо запит має піти синхронним DRF-action
+    (немає JWT, погоджувач, mode=series тощо). ASYNC_READ_FAST_PATH=0 вимикає fast path.
+    """
+    sync_view = sync_to_async(
+        viewset_class.as_view({"get": action_name}, detail=True, basename=basename)
+    )
+    # Для запитів, тротли яких уже перевірено (fast path або перший крок long-poll).
+    unthrottled_sync_view = sync_to_async(
+        viewset_class.as_view({"get": action_name}, detail=True, basename=basename, throttle_classes=[])
+    )
+    kind = _tender_kind(is_sales)
+
+    async def view(request, pk=None):
+        is_tender_get = request.method == "GET" and str(pk or "").isdigit()
+        throttles_checked = False
+        if ASYNC_READ_FAST_PATH and is_tender_get:
+            user = await _aauthenticate_request(request)
+            if user is not None:
+                request.user = user
+                throttled_response = await sync_to_async(_default_throttles_response)(request)
+                if throttled_response is not None:
+                    return _render_async_response(throttled_response)
+                throttles_checked = True
+                response = await fast_path(request, user=user, tender_id=int(pk), is_sales=is_sales)
+                if response is not None:
+                    return _render_async_response(response)
+        first_view = unthrottled_sync_view if throttles_checked else sync_view
+        wait = _status_sync_long_poll_wait(request) if action_name == "proposals_list" else None
+        if wait is None or not is_tender_get:
+            return await first_view(request, pk=pk)
+
+        async def check(recheck):
+            request.status_sync_recheck = recheck
+            return await (unthrottled_sync_view if recheck else first_view)(request, pk=pk)
+
+        return await _status_sync_long_poll(request, kind=kind, tender_id=int(pk), wait=wait, check=check)
+
+    view.csrf_exempt = True
+    return view
+
+
+procurement_tender_proposals_list = _async_tender_read_view(
+    ProcurementTenderViewSet,
+    action_name="proposals_list",
+    basename="procurement-tender",
+    is_sales=False,
+    fast_path=_aproposals_fast_path,
+)
+sales_tender_proposals_list = _async_tender_read_view(
+    SalesTenderViewSet,
+    action_name="proposals_list",
+    basename="sales-tender",
+    is_sales=True,
+    fast_path=_aproposals_fast_path,
+)
+procurement_tender_bid_history = _async_tender_read_view(
+    ProcurementTenderViewSet,
+    action_name="bid_history",
+    basename="procurement-tender",
+    is_sales=False,
+    fast_path=_abid_history_fast_path,
+)
+sales_tender_bid_history = _async_tender_read_view(
+    SalesTenderViewSet,
+    action_name="bid_history",
+    basename="sales-tender",
+    is_sales=True,
+    fast_path=_abid_history_fast_path,
+)
+procurement_tender_participant_view = _async_tender_read_view(
+    ProcurementTenderViewSet,
+    action_name="participant_view",
+    basename="procurement-tender",
+    is_sales=False,
+    fast_path=_aparticipant_view_fast_path,
+)
+sales_tender_participant_view = _async_tender_read_view(
+    SalesTenderViewSet,
+    action_name="participant_view",
+    basename="sales-tender",
+    is_sales=True,
+    fast_path=_aparticipant_view_fast_path,
+)
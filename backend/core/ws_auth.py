@@ -6,12 +6,13 @@ from http.cookies import SimpleCookie
 from channels.db import database_sync_to_async
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .authentication import CachedJWTAuthentication
 
 
 @database_sync_to_async
 def _get_user_for_token(raw_token: str):
-    authenticator = JWTAuthentication()
+    authenticator = CachedJWTAuthentication()
     validated = authenticator.get_validated_token(raw_token)
     return authenticator.get_user(validated)
 
@@ -104,4 +104,5 @@ out.to_sql("cpv_dictionary", conn, if_exists="append", index=False)
 conn.commit()
 conn.close()
 
-print("✅ cpv_dictionary створена і заповнена (cpv_code, name_ua, name_en).")
\ No newline at end of file
+print("✅ cpv_dictionary створена і заповнена (cpv_code, name_ua, name_en).")
+print("ℹ️  Перебудуйте замикання CPV: python manage.py rebuild_cpv_closure")
\ No newline at end of file
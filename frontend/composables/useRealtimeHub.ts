@@ -0,0 +1,221 @@
+type TenderRealtimeKind = "procurement" | "sales";
+
+export type RealtimeHubMessage = {
+  event?: string;
+  kind?: TenderRealtimeKind;
+  tender_id?: number;
+  payload?: Record<string, unknown>;
+  sent_at?: string;
+  seq?: number;
+  merged_seqs?: number[];
+  replayed?: boolean;
+};
+
+type HubListener = (message: RealtimeHubMessage) => void;
+
+type HubSubscription = {
+  kind: TenderRealtimeKind;
+  tenderId: number;
+  deltaPayloads: boolean;
+  listeners: Set<HubListener>;
+  lastSeq: number | null;
+  seenSeqs: Set<number>;
+};
+
+const SEEN_SEQ_LIMIT = 500;
+const RESYNC_CLOSE_CODE = 4409;
+
+// One /ws/realtime/ socket per browser tab, shared by every tender subscription.
+const subscriptions = new Map<string, HubSubscription>();
+const isConnected = ref(false);
+let socket: WebSocket | null = null;
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+let reconnectAttempt = 0;
+
+const subscriptionKey = (kind: string, tenderId: number) => `${kind}:${tenderId}`;
+
+const subscribeItem = (sub: HubSubscription) => ({
+  kind: sub.kind,
+  tender_id: sub.tenderId,
+  ...(sub.deltaPayloads ? { payload: "delta" } : {}),
+  ...(sub.lastSeq !== null ? { since_seq: sub.lastSeq } : {}),
+});
+
+const sendJson = (data: Record<string, unknown>) => {
+  if (socket && socket.readyState === WebSocket.OPEN) {
+    socket.send(JSON.stringify(data));
+  }
+};
+
+// Returns false for duplicates (live events interleaved with a replay).
+const trackSeq = (sub: HubSubscription, message: RealtimeHubMessage) => {
+  if (message.event === "resync.required") {
+    const seq = Number(message.payload?.seq);
+    sub.lastSeq = Number.isInteger(seq) ? seq : null;
+    sub.seenSeqs.clear();
+    return true;
+  }
+  const seq = Number(message.seq);
+  if (!Number.isInteger(seq) || seq <= 0) return true;
+  if (sub.seenSeqs.has(seq)) return false;
+  const covered = (message.merged_seqs || []).filter((item) => Number.isInteger(item));
+  for (const item of [...covered, seq]) {
+    sub.seenSeqs.add(item);
+    if (sub.seenSeqs.size > SEEN_SEQ_LIMIT) {
+      const oldest = sub.seenSeqs.values().next().value;
+      if (oldest !== undefined) sub.seenSeqs.delete(oldest);
+    }
+  }
+  const firstSeq = covered.length ? Math.min(...covered) : seq;
+  if (sub.lastSeq !== null && firstSeq > sub.lastSeq + 1 && !message.replayed) {
+    sendJson({
+      event: "replay",
+      kind: sub.kind,
+      tender_id: sub.tenderId,
+      since_seq: sub.lastSeq,
+    });
+  }
+  sub.lastSeq = sub.lastSeq === null ? seq : Math.max(sub.lastSeq, seq);
+  return true;
+};
+
+const handleMessage = (message: RealtimeHubMessage) => {
+  if (message.event === "subscribed") {
+    const tenders = (message.payload?.tenders || []) as {
+      kind: string;
+      tender_id: number;
+      seq?: number;
+    }[];
+    for (const item of tenders) {
+      const sub = subscriptions.get(subscriptionKey(item.kind, item.tender_id));
+      if (!sub) continue;
+      if (sub.lastSeq === null && Number.isInteger(item.seq)) sub.lastSeq = Number(item.seq);
+      sub.listeners.forEach((listener) =>
+        listener({ event: "connected", kind: sub.kind, tender_id: sub.tenderId, payload: item }),
+      );
+    }
+    return;
+  }
+  if (!message.kind || !message.tender_id) return;
+  const sub = subscriptions.get(subscriptionKey(message.kind, message.tender_id));
+  if (!sub || !trackSeq(sub, message)) return;
+  sub.listeners.forEach((listener) => listener(message));
+};
+
+export const useRealtimeHub = () => {
+  const { accessToken } = useAuth();
+  const config = useRuntimeConfig();
+
+  const getWsBase = () => {
+    const apiBase = String(config.public.apiBase || "");
+    const apiRoot = apiBase.replace(/\/api\/?$/, "");
+    return apiRoot.replace(/^http/i, "ws");
+  };
+
+  const clearReconnectTimer = () => {
+    if (reconnectTimer) {
+      clearTimeout(reconnectTimer);
+      reconnectTimer = null;
+    }
+  };
+
+  const closeSocket = () => {
+    if (socket) {
+      socket.onopen = null;
+      socket.onclose = null;
+      socket.onerror = null;
+      socket.onmessage = null;
+      socket.close();
+      socket = null;
+    }
+    isConnected.value = false;
+  };
+
+  const ensureSocket = () => {
+    if (!import.meta.client || socket || !accessToken.value) return;
+    clearReconnectTimer();
+    const ws = new WebSocket(`${getWsBase()}/ws/realtime/`);
+    socket = ws;
+
+    ws.onopen = () => {
+      reconnectAttempt = 0;
+      isConnected.value = true;
+      if (subscriptions.size) {
+        sendJson({ event: "subscribe", tenders: [...subscriptions.values()].map(subscribeItem) });
+      }
+    };
+
+    ws.onmessage = (event) => {
+      try {
+        handleMessage(JSON.parse(String(event.data)) as RealtimeHubMessage);
+      } catch {
+        // ignore malformed messages
+      }
+    };
+
+    ws.onerror = () => {
+      isConnected.value = false;
+    };
+
+    ws.onclose = (event) => {
+      isConnected.value = false;
+      socket = null;
+      if (event.code === RESYNC_CLOSE_CODE) {
+        subscriptions.forEach((sub) => {
+          sub.lastSeq = null;
+          sub.seenSeqs.clear();
+          sub.listeners.forEach((listener) =>
+            listener({ event: "resync.required", kind: sub.kind, tender_id: sub.tenderId, payload: {} }),
+          );
+        });
+      }
+      if (!subscriptions.size) return;
+      const delay = Math.min(10000, 500 * 2 ** reconnectAttempt);
+      reconnectAttempt += 1;
+      reconnectTimer = setTimeout(ensureSocket, delay);
+    };
+  };
+
+  // Returns an unsubscribe function; the socket closes with the last subscription.
+  const subscribe = (
+    kind: TenderRealtimeKind,
+    tenderId: number,
+    listener: HubListener,
+    opts: { deltaPayloads?: boolean } = {},
+  ) => {
+    const key = subscriptionKey(kind, tenderId);
+    let sub = subscriptions.get(key);
+    if (!sub) {
+      sub = {
+        kind,
+        tenderId,
+        deltaPayloads: Boolean(opts.deltaPayloads),
+        listeners: new Set(),
+        lastSeq: null,
+        seenSeqs: new Set(),
+      };
+      subscriptions.set(key, sub);
+      sendJson({ event: "subscribe", tenders: [subscribeItem(sub)] });
+    }
+    sub.listeners.add(listener);
+    ensureSocket();
+
+    return () => {
+      const current = subscriptions.get(key);
+      if (!current) return;
+      current.listeners.delete(listener);
+      if (current.listeners.size) return;
+      subscriptions.delete(key);
+      sendJson({ event: "unsubscribe", tenders: [{ kind, tender_id: tenderId }] });
+      if (!subscriptions.size) {
+        clearReconnectTimer();
+        closeSocket();
+      }
+    };
+  };
+
+  return {
+    subscribe,
+    isConnected: readonly(isConnected),
+  };
+};
@@ -7,6 +7,20 @@ type UseTenderProposalsRealtimeOptions = {
   reload: (changedProposalIds: number[]) => Promise<void>;
   eventNames?: readonly string[];
   onEvent?: (message: RealtimeMessage) => boolean | void;
+  // Receive status rows / position values inside proposal events; return true
+  // from applyDeltas when they were applied so no reload is queued.
+  deltaPayloads?: boolean;
+  applyDeltas?: (
+    deltas: Record<string, unknown>[],
+    message: RealtimeMessage,
+  ) => boolean | void;
+  // Online auctions: best price / bid count per position with the viewer's own rank.
+  onLeaderboard?: (
+    positions: AuctionLeaderboardRow[],
+    message: RealtimeMessage,
+  ) => void;
+  // Subscribe over the shared per-user socket instead of a per-tender one.
+  multiplexed?: boolean;
   participantMinSyncMs?: number | Readonly<Ref<number>>;
   organizerMinSyncMs?: number | Readonly<Ref<number>>;
   organizerBurstMinSyncMs?: number | Readonly<Ref<number>>;
@@ -18,6 +32,15 @@ type UseTenderProposalsRealtimeOptions = {
   syncJitterRatio?: number | Readonly<Ref<number>>;
 };
 
+export type AuctionLeaderboardRow = {
+  position_id: number;
+  best_price: string | null;
+  bid_count: number;
+  my_rank: number | null;
+  // Organizer only.
+  ranks?: { supplier_company_id: number; rank: number }[];
+};
+
 type RealtimeMessage = {
   event?: string;
   payload?: Record<string, unknown>;
@@ -307,8 +330,22 @@ export function useTenderProposalsRealtime(
       tenderRealtime.connect({
         kind,
         tenderId,
+        deltaPayloads: options.deltaPayloads,
+        multiplexed: options.multiplexed,
         onEvent: (message: RealtimeMessage) => {
           const eventName = String(message?.event || "");
+          if (eventName === "resync.required") {
+            // Missed events are no longer replayable: fall back to a full reload.
+            queueSync();
+            return;
+          }
+          if (eventName === "leaderboard.updated") {
+            const positions = Array.isArray(message?.payload?.positions)
+              ? (message.payload.positions as AuctionLeaderboardRow[])
+              : [];
+            options.onLeaderboard?.(positions, message);
+            return;
+          }
           if (!eventName.startsWith("proposal.")) return;
           const allowedEvents = options.eventNames;
           if (
@@ -320,6 +357,16 @@ export function useTenderProposalsRealtime(
           }
           const handledLocally = options.onEvent?.(message);
           if (handledLocally === true) return;
+          if (
+            options.deltaPayloads &&
+            message?.payload?.delta_complete === true &&
+            options.applyDeltas
+          ) {
+            const deltas = Array.isArray(message.payload.deltas)
+              ? (message.payload.deltas as Record<string, unknown>[])
+              : [];
+            if (options.applyDeltas(deltas, message) === true) return;
+          }
           const proposalIds = Array.isArray(message?.payload?.proposal_ids)
             ? message.payload.proposal_ids
                 .map((proposalId) => Number(proposalId))
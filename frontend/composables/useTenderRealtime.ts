@@ -4,17 +4,30 @@ type TenderRealtimeEvent = {
   event?: string;
   payload?: Record<string, unknown>;
   sent_at?: string;
+  seq?: number;
+  // Sequence numbers folded into this message by server-side backpressure.
+  merged_seqs?: number[];
+  replayed?: boolean;
 };
 
+const SEEN_SEQ_LIMIT = 500;
+// Server closed a connection that fell too far behind: reload state, reconnect fresh.
+const RESYNC_CLOSE_CODE = 4409;
+
 type ConnectOptions = {
   kind: TenderRealtimeKind;
   tenderId: number;
+  // Opt in to self-contained proposal deltas (?payload=delta).
+  deltaPayloads?: boolean;
+  // Share one per-user /ws/realtime/ socket with other tender subscriptions.
+  multiplexed?: boolean;
   onEvent?: (message: TenderRealtimeEvent) => void;
 };
 
 export const useTenderRealtime = () => {
   const { accessToken } = useAuth();
   const config = useRuntimeConfig();
+  const hub = useRealtimeHub();
 
   const socket = ref<WebSocket | null>(null);
   const isConnected = ref(false);
@@ -23,6 +36,12 @@ export const useTenderRealtime = () => {
   let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
   let shouldReconnect = false;
   let currentConnect: ConnectOptions | null = null;
+  let unsubscribeHub: (() => void) | null = null;
+  const usingHub = ref(false);
+  // Last stream sequence seen for the current target; sent as ?since_seq on reconnect.
+  let lastSeq: number | null = null;
+  let lastSeqTarget: string | null = null;
+  const seenSeqs = new Set<number>();
 
   const getWsBase = () => {
     const apiBase = String(config.public.apiBase || "");
@@ -37,8 +56,52 @@ export const useTenderRealtime = () => {
     }
   };
 
+  const targetKey = (opts: ConnectOptions) => `${opts.kind}:${opts.tenderId}`;
+
   const buildUrl = (opts: ConnectOptions) => {
-    return `${getWsBase()}/ws/tenders/${opts.kind}/${opts.tenderId}/`;
+    const url = `${getWsBase()}/ws/tenders/${opts.kind}/${opts.tenderId}/`;
+    const params = new URLSearchParams();
+    if (opts.deltaPayloads) params.set("payload", "delta");
+    if (lastSeq !== null && lastSeqTarget === targetKey(opts)) {
+      params.set("since_seq", String(lastSeq));
+    }
+    const query = params.toString();
+    return query ? `${url}?${query}` : url;
+  };
+
+  const rememberSeq = (seq: number) => {
+    seenSeqs.add(seq);
+    if (seenSeqs.size > SEEN_SEQ_LIMIT) {
+      const oldest = seenSeqs.values().next().value;
+      if (oldest !== undefined) seenSeqs.delete(oldest);
+    }
+  };
+
+  // Returns false for duplicates (live events interleaved with a replay).
+  const trackSeq = (ws: WebSocket, message: TenderRealtimeEvent) => {
+    if (message.event === "connected") {
+      const seq = Number(message.payload?.seq);
+      if (lastSeq === null && Number.isInteger(seq)) lastSeq = seq;
+      return true;
+    }
+    if (message.event === "resync.required") {
+      const seq = Number(message.payload?.seq);
+      lastSeq = Number.isInteger(seq) ? seq : null;
+      seenSeqs.clear();
+      return true;
+    }
+    const seq = Number(message.seq);
+    if (!Number.isInteger(seq) || seq <= 0) return true;
+    if (seenSeqs.has(seq)) return false;
+    const covered = (message.merged_seqs || []).filter((item) => Number.isInteger(item));
+    covered.forEach(rememberSeq);
+    rememberSeq(seq);
+    const firstSeq = covered.length ? Math.min(...covered) : seq;
+    if (lastSeq !== null && firstSeq > lastSeq + 1 && !message.replayed) {
+      ws.send(JSON.stringify({ event: "replay", since_seq: lastSeq }));
+    }
+    lastSeq = lastSeq === null ? seq : Math.max(lastSeq, seq);
+    return true;
   };
 
   const closeSocket = () => {
@@ -53,13 +116,32 @@ export const useTenderRealtime = () => {
     isConnected.value = false;
   };
 
+  const releaseHub = () => {
+    unsubscribeHub?.();
+    unsubscribeHub = null;
+    usingHub.value = false;
+  };
+
   const connect = (opts: ConnectOptions) => {
     if (!import.meta.client) return;
     currentConnect = opts;
     shouldReconnect = true;
     clearReconnectTimer();
     closeSocket();
+    releaseHub();
     if (!accessToken.value) return;
+    if (opts.multiplexed) {
+      unsubscribeHub = hub.subscribe(opts.kind, opts.tenderId, (message) => opts.onEvent?.(message), {
+        deltaPayloads: opts.deltaPayloads,
+      });
+      usingHub.value = true;
+      return;
+    }
+    if (lastSeqTarget !== targetKey(opts)) {
+      lastSeq = null;
+      lastSeqTarget = targetKey(opts);
+      seenSeqs.clear();
+    }
 
     const ws = new WebSocket(buildUrl(opts));
     socket.value = ws;
@@ -70,10 +152,10 @@ export const useTenderRealtime = () => {
     };
 
     ws.onmessage = (event) => {
-      if (!opts.onEvent) return;
       try {
         const parsed = JSON.parse(String(event.data)) as TenderRealtimeEvent;
-        opts.onEvent(parsed);
+        if (!trackSeq(ws, parsed)) return;
+        opts.onEvent?.(parsed);
       } catch {
         // ignore malformed messages
       }
@@ -83,9 +165,14 @@ export const useTenderRealtime = () => {
       isConnected.value = false;
     };
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
       isConnected.value = false;
       socket.value = null;
+      if (event.code === RESYNC_CLOSE_CODE) {
+        lastSeq = null;
+        seenSeqs.clear();
+        opts.onEvent?.({ event: "resync.required", payload: {} });
+      }
       if (!shouldReconnect || !currentConnect) return;
       const delay = Math.min(10000, 500 * 2 ** reconnectAttempt.value);
       reconnectAttempt.value += 1;
@@ -95,13 +182,19 @@ export const useTenderRealtime = () => {
 
   const disconnect = () => {
     shouldReconnect = false;
+    lastSeq = null;
+    lastSeqTarget = null;
+    seenSeqs.clear();
     clearReconnectTimer();
     closeSocket();
+    releaseHub();
   };
 
   return {
     connect,
     disconnect,
-    isConnected: readonly(isConnected),
+    isConnected: computed(() =>
+      usingHub.value ? hub.isConnected.value : isConnected.value,
+    ),
   };
 };
@@ -16,6 +16,8 @@ import type {
 
 const PROCUREMENT_PREFIX = '/procurement-tenders'
 const SALES_PREFIX = '/sales-tenders'
+// Як BID_HISTORY_MAX_PAGE_SIZE у backend (core/views.py).
+export const BID_HISTORY_MAX_PAGE_SIZE = 500
 
 function listEndpoint(isSales: boolean) {
   return isSales ? `${SALES_PREFIX}/` : `${PROCUREMENT_PREFIX}/`
@@ -546,6 +548,27 @@ export async function getProposalPositionValues(
   return request<unknown[]>(`${prefix}/${tenderId}/proposals/${proposalId}/position-values/`)
 }
 
+/**
+ * Випадковий ключ ідемпотентності. crypto.randomUUID є лише в безпечному контексті
+ * (HTTPS або localhost), тож на plain-HTTP ключ складається з getRandomValues
+ * або, без Web Crypto, з часу та Math.random.
+ */
+function newIdempotencyKey(): string {
+  const webCrypto = globalThis.crypto
+  if (typeof webCrypto?.randomUUID === 'function') return webCrypto.randomUUID()
+  if (typeof webCrypto?.getRandomValues === 'function') {
+    return Array.from(webCrypto.getRandomValues(new Uint8Array(16)), (byte) =>
+      byte.toString(16).padStart(2, '0')
+    ).join('')
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`
+}
+
+/** Ключ для повторів запиту (бекенд повертає збережену відповідь замість повторного запису). */
+function idempotencyHeaders(): Record<string, string> {
+  return { 'Idempotency-Key': newIdempotencyKey() }
+}
+
 export async function patchProposalPositionValues(
   request: RequestFn,
   tenderId: number,
@@ -558,13 +581,17 @@ export async function patchProposalPositionValues(
   return request<unknown>(`${prefix}/${tenderId}/proposals/${proposalId}/position-values/`, {
     method: 'PATCH',
     body,
+    headers: idempotencyHeaders(),
     skipLoader: options?.skipLoader
   })
 }
 
 export async function submitProposal(request: RequestFn, tenderId: number, isSales: boolean) {
   const prefix = isSales ? SALES_PREFIX : PROCUREMENT_PREFIX
-  return request<TenderProposal>(`${prefix}/${tenderId}/submit-proposal/`, { method: 'POST' })
+  return request<TenderProposal>(`${prefix}/${tenderId}/submit-proposal/`, {
+    method: 'POST',
+    headers: idempotencyHeaders()
+  })
 }
 
 export async function withdrawProposal(request: RequestFn, tenderId: number, isSales: boolean) {
@@ -636,11 +663,20 @@ export async function getTenderBidHistory(
   request: RequestFn,
   tenderId: number,
   isSales: boolean,
-  tenderPositionId: number
+  tenderPositionId: number,
+  options?: { cursor?: string; pageSize?: number }
 ) {
   const prefix = isSales ? SALES_PREFIX : PROCUREMENT_PREFIX
-  const query = new URLSearchParams({ tender_position_id: String(tenderPositionId) })
-  return request<unknown[]>(`${prefix}/${tenderId}/bid-history/?${query.toString()}`)
+  // Сторінка ставок (від нових до старих); наступна — за next_cursor, поки has_more.
+  const query = new URLSearchParams({
+    tender_position_id: String(tenderPositionId),
+    cursor_mode: '1',
+    ...(options?.pageSize ? { page_size: String(options.pageSize) } : {}),
+    ...(options?.cursor ? { cursor: options.cursor } : {})
+  })
+  return request<{ results: unknown[]; next_cursor: string | null; has_more: boolean; last_id: number | null }>(
+    `${prefix}/${tenderId}/bid-history/?${query.toString()}`
+  )
 }
 
 export async function getTenderChatThreads(
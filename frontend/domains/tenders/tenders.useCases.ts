@@ -177,8 +177,20 @@ export function useTendersUseCases() {
     isSales: boolean,
     tenderPositionId: number
   ) {
-    const { data, error } = await tendersApi.getTenderBidHistory(fetch, id, isSales, tenderPositionId)
-    return { data: Array.isArray(data) ? data : [], error }
+    // Таблиця ставок показує всю історію позиції: сторінки дочитуються за next_cursor,
+    // тож позиція з понад 100 (BID_HISTORY_PAGE_SIZE) ставками не обрізається.
+    const rows: unknown[] = []
+    let cursor: string | undefined
+    for (;;) {
+      const { data, error } = await tendersApi.getTenderBidHistory(fetch, id, isSales, tenderPositionId, {
+        cursor,
+        pageSize: tendersApi.BID_HISTORY_MAX_PAGE_SIZE
+      })
+      if (error) return { data: rows, error }
+      if (Array.isArray(data?.results)) rows.push(...data.results)
+      if (!data?.has_more || !data.next_cursor) return { data: rows, error }
+      cursor = data.next_cursor
+    }
   }
 
   async function getTenderChatThreads(id: number, isSales: boolean) {